@@ -0,0 +1,18 @@
+"""
+Пакетная компиляция файлов и каталогов в байткод (см. src/Сompiler/batch_compiler.py).
+Запуск: python batch_compile.py [-j процессов] [-o каталог] файлы_или_каталоги
+"""
+import os
+import sys
+
+_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+# Модули проекта импортируются без пакетов, поэтому добавляем их каталоги в sys.path.
+for _dir in ('AST', 'Semantics', 'VM', 'Сompiler'):
+    _path = os.path.join(_SRC, _dir)
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from batch_compiler import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,13 @@
+"""
+Бенчмарки компилятора и виртуальной машины.
+Запуск из корня репозитория: python -m benchmarks.<имя_модуля>
+"""
+import os
+import sys
+
+_SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src')
+# Модули проекта импортируются без пакетов, поэтому добавляем их каталоги в sys.path.
+for _dir in ('AST', 'Semantics', 'VM', 'Сompiler'):
+    _path = os.path.join(_SRC, _dir)
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
@@ -0,0 +1,69 @@
+"""
+Память, которую занимает абстрактное синтаксическое дерево большой программы: байт на узел и пиковый
+размер резидентной памяти процесса (RSS) после разбора.
+Запуск: python -m benchmarks.ast_memory [количество инструкций]
+"""
+import resource
+import sys
+import time
+import tracemalloc
+from collections import Counter
+
+from pyparsing import ParseResults
+from Nodes import TreeNode
+from Parser import Parser
+from benchmarks.parse_bench import source
+from tests.fixtures import fields
+
+
+def nodes(root: TreeNode):
+    """Все узлы дерева, включая узлы, которые не входят в children (например, ident объявления функции)."""
+    stack = [root]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, TreeNode):
+            yield value
+            stack.extend(getattr(value, name) for name in fields(value))
+        elif isinstance(value, (tuple, list, ParseResults)):
+            stack.extend(value)
+
+
+def node_size(node: TreeNode) -> int:
+    """Размер самого узла вместе со словарём атрибутов, если он есть, без вложенных объектов."""
+    size = sys.getsizeof(node)
+    if hasattr(node, '__dict__'):
+        size += sys.getsizeof(node.__dict__)
+    return size
+
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 25000
+    parser = Parser(backend='recursive')
+
+    # Объём памяти на узел измеряется на программе меньшего размера: tracemalloc замедляет разбор.
+    code = source(statements // 10)
+    tracemalloc.start()
+    root = parser.parse(code)
+    traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    all_nodes = list(nodes(root))
+    count = len(all_nodes)
+    print('узлов: {}, по типам: {}'.format(count, ', '.join(
+        '{} {}'.format(name, n) for name, n in Counter(type(node).__name__ for node in all_nodes).most_common())))
+    print('  размер узла: {:.1f} байт'.format(sum(map(node_size, all_nodes)) / count))
+    print('  всё дерево вместе с кортежами, строками и числами: {:.1f} байт на узел'.format(traced / count))
+    del root, all_nodes
+
+    code = source(statements)
+    start = time.perf_counter()
+    root = parser.parse(code)
+    elapsed = time.perf_counter() - start
+    count = sum(1 for _ in nodes(root))
+    # ru_maxrss в Linux измеряется в килобайтах.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 10
+    print('исходный код {:.1f} МБ: узлов {}, разбор {:.2f} с, пиковый RSS {:.0f} МБ'.format(
+        len(code.encode('utf-8')) / 2 ** 20, count, elapsed, rss))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Масштабирование пакетной компиляции (см. batch_compiler) с количеством процессов.
+Запуск: python -m benchmarks.batch_scaling [количество файлов]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from batch_compiler import compile_files
+from benchmarks.suite import generated
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    cpus = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as directory:
+        sources = os.path.join(directory, 'src')
+        os.makedirs(sources)
+        for i in range(files):
+            with open(os.path.join(sources, 'script{}.js'.format(i)), 'w', encoding='utf-8') as file:
+                file.write(generated(20 + i % 5))
+        print('файлов: {}, ядер: {}'.format(files, cpus))
+        base = None
+        jobs = 1
+        while True:
+            start = time.perf_counter()
+            results = list(compile_files([sources], os.path.join(directory, 'out{}'.format(jobs)), jobs))
+            elapsed = time.perf_counter() - start
+            assert all(not result['diagnostics'] for result in results)
+            base = base or elapsed
+            print('  процессов {}: {:.2f} с, ускорение {:.2f}'.format(jobs, elapsed, base / elapsed))
+            if jobs >= cpus:
+                break
+            jobs = min(jobs * 2, cpus)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+Время выполнения цикла с вызовами встроенных функций (команда CBLTN).
+Запуск: python -m benchmarks.builtin_calls
+"""
+import time
+
+from Parser import Parser
+from code_generator import CodeGenerator
+from VirtualMachine import VirtualMachine
+
+PROG = '''
+    var total = 0;
+    for (var i = 0; i < 100000; i++) {
+        total = total + sqrt(i) + rnd();
+    }
+'''
+
+
+def main(repeat=3):
+    lines = CodeGenerator(Parser().parse(PROG)).lines
+    calls = 2 * 100000
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        VirtualMachine(lines).run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print('вызовов встроенных функций: {}, лучшее время {:.3f} с, {:.2f} мкс на вызов вместе с циклом'.format(
+        calls, best, best / calls * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Сравнение памяти и скорости: список CodeLine и компактное представление Bytecode."""
+import time
+import tracemalloc
+
+from Parser import Parser
+from code_generator import CodeGenerator, CodeLine
+from Bytecode import Bytecode
+from VirtualMachine import VirtualMachine
+from benchmarks.vm_dispatch import PROG
+
+# Фрагмент, который повторяется для получения большой программы.
+CHUNK = '''
+    var a = 1;
+    var b = "str";
+    a = a * 2 + 3;
+    if (a > 10) { b = b + a; } else { a = a - 1; }
+    while (a < 100) { a++; }
+'''
+
+
+def measure(build):
+    """Возвращает объект, созданный функцией build, и объём выделенной при этом памяти в байтах."""
+    tracemalloc.start()
+    obj = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, size
+
+
+def best_time(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(copies=200):
+    lines = CodeGenerator(Parser().parse(CHUNK)).lines * copies
+    lines, lines_size = measure(lambda: [CodeLine(line.cmd, line.value) for line in lines])
+    bytecode, bytecode_size = measure(lambda: Bytecode.from_lines(lines))
+    print('команд: {}'.format(len(lines)))
+    print('память, список CodeLine: {} байт ({:.1f} на команду)'.format(lines_size, lines_size / len(lines)))
+    print('память, Bytecode: {} байт ({:.1f} на команду)'.format(bytecode_size, bytecode_size / len(lines)))
+
+    loop = CodeGenerator(Parser().parse(PROG))
+    loop_lines, loop_bytecode = loop.lines, loop.bytecode()
+    print('выполнение, список CodeLine: {:.3f} с'.format(best_time(lambda: VirtualMachine(loop_lines).run())))
+    print('выполнение, Bytecode: {:.3f} с'.format(best_time(lambda: VirtualMachine(loop_bytecode).run())))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Зависимость времени генерации кода от размера программы.
+Деревья строятся напрямую из узлов Nodes.py, чтобы измерять только CodeGenerator.
+Сборщик мусора на время замеров отключается: его паузы зависят от числа живых объектов, а не от генератора.
+"""
+import gc
+import sys
+import time
+
+from Nodes import *
+from Operators import Operators
+from code_generator import CodeGenerator
+
+
+def statement(i):
+    """x = x + i;"""
+    return BinExprNode(i, 0, Operators.ASSIGN, IdentNode(i, 0, 'x'),
+                       BinExprNode(i, 0, Operators.ADD, IdentNode(i, 0, 'x'), LiteralNode(i, 0, i)))
+
+
+def loop(i, body):
+    """while (x < i) { body }"""
+    test = BinExprNode(i, 0, Operators.LT, IdentNode(i, 0, 'x'), LiteralNode(i, 0, i))
+    return WhileNode(i, 0, test, BlockStatementNode(i, 0, *body))
+
+
+def flat_program(size):
+    """size инструкций, сгруппированных в циклы по 10 инструкций."""
+    return BlockStatementNode(0, 0, *(loop(i, [statement(i + j) for j in range(10)]) for i in range(0, size, 10)))
+
+
+def nested_program(size):
+    """size инструкций внутри size / 200 вложенных циклов: глубина вложенности растёт вместе с программой."""
+    depth = size // 200
+    body = [statement(i) for i in range(size // depth)]
+    for level in range(depth):
+        body = [loop(level, body)] + [statement(i) for i in range(size // depth)]
+    return BlockStatementNode(0, 0, *body)
+
+
+def best_time(func, repeat=3):
+    gc.collect()
+    gc.disable()
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    gc.enable()
+    return best
+
+
+def main(sizes=(1000, 10000, 100000)):
+    # Генератор кода рекурсивно обходит вложенные циклы.
+    sys.setrecursionlimit(10000)
+    for name, build in (('плоская', flat_program), ('вложенная', nested_program)):
+        for size in sizes:
+            ast = build(size)
+            elapsed = best_time(lambda: CodeGenerator(ast))
+            print('{} программа, {} инструкций: {:.3f} с, {:.2f} мкс на инструкцию'.format(
+                name, size, elapsed, elapsed / size * 1e6))
+
+
+if __name__ == '__main__':
+    main()
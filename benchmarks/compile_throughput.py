@@ -0,0 +1,30 @@
+"""Скорость семантического анализа и генерации кода на больших деревьях, в узлах в секунду."""
+
+from Nodes import *
+from semantic_analyzer import Analyzer
+from code_generator import CodeGenerator
+from benchmarks.codegen_scaling import flat_program, best_time
+
+
+def count_nodes(node):
+    return 1 + sum(count_nodes(child) for child in node.children if isinstance(child, TreeNode))
+
+
+def program(size):
+    """Объявление переменной x и size инструкций, работающих с ней."""
+    decl = VarDeclarationNode(0, 0, DeclaratorNode(0, 0, IdentNode(0, 0, 'x'), LiteralNode(0, 0, 0)))
+    return BlockStatementNode(0, 0, decl, *flat_program(size).nodes)
+
+
+def main(size=100000):
+    ast = program(size)
+    nodes = count_nodes(ast)
+    analyze = best_time(lambda: Analyzer().analyze(ast))
+    generate = best_time(lambda: CodeGenerator(ast))
+    print('узлов: {}'.format(nodes))
+    print('Analyzer: {:.3f} с, {:.0f} узлов в секунду'.format(analyze, nodes / analyze))
+    print('CodeGenerator: {:.3f} с, {:.0f} узлов в секунду'.format(generate, nodes / generate))
+
+
+if __name__ == '__main__':
+    main()
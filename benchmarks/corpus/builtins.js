@@ -0,0 +1,8 @@
+var sum = 0;
+for (var i = 0; i < 5000; i++) {
+    sum = sum + sqrt(i) * rnd();
+    if (sum > 1000) {
+        sum = sqrt(sum);
+    }
+}
+logprint(sum > 0);
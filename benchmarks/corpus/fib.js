@@ -0,0 +1,17 @@
+function fib(n) {
+    if (n < 2) {
+        return n;
+    }
+    return fib(n - 1) + fib(n - 2);
+}
+function fact(n) {
+    if (n <= 1) {
+        return 1;
+    }
+    return n * fact(n - 1);
+}
+var f = fib(17);
+var g = 0;
+for (var i = 0; i < 200; i++) {
+    g = g + fact(20);
+}
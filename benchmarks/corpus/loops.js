@@ -0,0 +1,15 @@
+var total = 0;
+for (var i = 0; i < 3000; i++) {
+    var j = 0;
+    while (j < 10) {
+        total = total + i * j - j / 2;
+        j++;
+    }
+}
+var k = 20000;
+do {
+    k--;
+    if (k < 10000) {
+        total = total - 1;
+    }
+} while (k > 0)
@@ -0,0 +1,22 @@
+var s = "";
+var words = 0;
+for (var i = 0; i < 3000; i++) {
+    s = s + "w" + i;
+    if (words > 100) {
+        words = 0;
+        s = "";
+    }
+    words = words + 1;
+}
+var line = "line";
+var parts = 0;
+var n = 0;
+while (n < 2000) {
+    line = "x" + n + ", " + line;
+    parts++;
+    if (parts >= 50) {
+        parts = 0;
+        line = "";
+    }
+    n++;
+}
@@ -0,0 +1,50 @@
+"""
+Выполнение функций интерпретатором и после компиляции горячих функций (см. FunctionCompiler): рекурсивная
+функция, функция с циклами и программа fib.js из каталога benchmarks/corpus.
+Запуск: python -m benchmarks.function_tier
+"""
+import os
+
+from pipeline import Pipeline
+from FunctionCompiler import FunctionCompiler
+from VirtualMachine import VirtualMachine
+from benchmarks.parse_bench import best_time
+from benchmarks.suite import CORPUS
+
+FIB = """
+function fib(n) {
+    if (n < 2) { return n; }
+    return fib(n - 1) + fib(n - 2);
+}
+var f = fib(20);
+"""
+
+LOOPS = """
+function work(n) {
+    var s = 0;
+    for (var i = 0; i < n; i++) {
+        var j = 0;
+        while (j < 10) { s = s + i * j - j / 2; j++; }
+    }
+    return s;
+}
+var total = 0;
+for (var k = 0; k < 500; k++) { total = total + work(10); }
+"""
+
+
+def main():
+    with open(os.path.join(CORPUS, 'fib.js'), encoding='utf-8') as file:
+        corpus_fib = file.read()
+    pipeline = Pipeline(optimize=True, superinstructions=True)
+    compiler = FunctionCompiler()
+    for name, code in (('fib', FIB), ('loops', LOOPS), ('corpus/fib', corpus_fib)):
+        bytecode = pipeline.compile(code)
+        interpreted = best_time(lambda: VirtualMachine(bytecode).run())
+        compiled = best_time(lambda: VirtualMachine(bytecode, compiler=compiler).run())
+        print('{}: интерпретатор {:.3f} с, с компиляцией функций {:.3f} с (x{:.2f})'.format(
+            name, interpreted, compiled, interpreted / compiled))
+
+
+if __name__ == '__main__':
+    main()
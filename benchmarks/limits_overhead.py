@@ -0,0 +1,22 @@
+"""
+Затраты на проверку ограничений ресурсов (см. Limits) на программе с вложенными циклами.
+Запуск: python -m benchmarks.limits_overhead
+"""
+from pipeline import Pipeline
+from Limits import Limits
+from VirtualMachine import VirtualMachine
+from benchmarks.parse_bench import best_time
+from benchmarks.vm_dispatch import PROG
+
+
+def main():
+    bytecode = Pipeline(optimize=True).compile(PROG)
+    limits = Limits(instructions=10 ** 9, call_depth=1000, stack_size=10000, time=3600)
+    plain = best_time(lambda: VirtualMachine(bytecode).run())
+    limited = best_time(lambda: VirtualMachine(bytecode, limits=limits).run())
+    print('без ограничений: {:.3f} с, со всеми ограничениями: {:.3f} с ({:+.1%})'.format(
+        plain, limited, limited / plain - 1))
+
+
+if __name__ == '__main__':
+    main()
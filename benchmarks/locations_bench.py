@@ -0,0 +1,65 @@
+"""
+Память и время вычисления позиций узлов для исходного кода размером в несколько мегабайт:
+посимвольный список позиций (как раньше в Parser.parse) в сравнении с индексом строк LineIndex.
+"""
+import random
+import time
+import tracemalloc
+
+from Locations import LineIndex
+from Parser import Parser
+from benchmarks.parse_bench import source
+
+
+def char_locations(code):
+    """Прежний способ: строка и символ для каждого символа кода."""
+    row, col, locs = 0, 0, []
+    for ch in code:
+        if ch == '\n':
+            row += 1
+            col = 0
+        elif ch == '\r':
+            pass
+        else:
+            col += 1
+        locs.append((row, col))
+    return locs
+
+
+def measure(func):
+    """Время выполнения и пиковый объём выделенной памяти. Память измеряется отдельным запуском:
+    tracemalloc замедляет выполнение."""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    del result
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    for statements in (25000, 100000):
+        code = source(statements)
+        mb = len(code.encode('utf-8')) / 2 ** 20
+        print('исходный код: {:.1f} МБ, {} строк'.format(mb, code.count('\n') + 1))
+        _, elapsed, peak = measure(lambda: char_locations(code))
+        print('  список позиций: {:.3f} с, {:.1f} МБ'.format(elapsed, peak / 2 ** 20))
+        lines, elapsed, peak = measure(lambda: LineIndex(code))
+        print('  LineIndex:      {:.3f} с, {:.2f} МБ'.format(elapsed, peak / 2 ** 20))
+        positions = [random.randrange(len(code)) for _ in range(100000)]
+        start = time.perf_counter()
+        for loc in positions:
+            lines.location(loc)
+        print('  LineIndex.location: {:.2f} мкс'.format((time.perf_counter() - start) / len(positions) * 1e6))
+    code = source(25000)
+    mb = len(code.encode('utf-8')) / 2 ** 20
+    _, elapsed, peak = measure(lambda: Parser(backend='recursive').parse(code))
+    print('разбор recursive, {:.1f} МБ: {:.2f} с, {:.2f} МБ/с, пик памяти {:.0f} МБ'.format(
+        mb, elapsed, mb / elapsed, peak / 2 ** 20))
+
+
+if __name__ == '__main__':
+    main()
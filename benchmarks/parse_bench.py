@@ -0,0 +1,47 @@
+"""Скорость разбора исходного кода с большим количеством выражений."""
+import time
+
+from Parser import Parser, set_packrat
+
+
+def source(statements=300):
+    """Программа из вложенных арифметических и логических выражений и вызовов функций."""
+    lines = ['var a = 1, b = 2, c = 3;', 'function f(x, y) { return x * y + (x - y) / 2; }']
+    for i in range(statements):
+        lines.append('a = (a + {0}) * (b - {0}) / (c + f(a, b)) % 7 ** 2;'.format(i))
+        lines.append('if (a >= b && b < c || a == {0} && c != b) {{ b = f(b, (c + a) * {0}); }}'.format(i))
+    return '\n'.join(lines)
+
+
+def best_time(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def report(title, code, **kwargs):
+    size = len(code.encode('utf-8'))
+    parse = best_time(lambda: Parser(**kwargs).parse(code))
+    print('{}: {:.3f} с, {:.3f} МБ/с'.format(title, parse, size / parse / 2 ** 20))
+
+
+def main():
+    code = source()
+    construct = best_time(Parser)
+    print('размер исходного кода: {} байт'.format(len(code.encode('utf-8'))))
+    print('создание Parser: {:.4f} с'.format(construct))
+    report('разбор pyparsing', code)
+    set_packrat(True)
+    report('разбор pyparsing, packrat', code)
+    set_packrat(False)
+    report('разбор recursive', code, backend='recursive')
+    # Рекурсивный спуск проверяется и на исходном коде большего размера.
+    report('разбор recursive, в 30 раз больше кода', source(9000), backend='recursive')
+
+
+if __name__ == '__main__':
+    main()
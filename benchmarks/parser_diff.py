@@ -0,0 +1,41 @@
+"""
+Сравнение способов разбора Parser: 'recursive' должен строить те же деревья, что и 'pyparsing', включая позиции узлов,
+и отвергать те же программы с той же позицией ошибки. Проверяются примеры из списка SAMPLES и случайные программы,
+а также случайные искажения этих программ (см. tests/fixtures.py). Тот же набор с фиксированным seed проверяется
+в tests/test_parser_diff.py.
+Запуск: python -m benchmarks.parser_diff [количество случайных программ] [seed]
+"""
+import random
+import sys
+
+from tests.fixtures import Generator, SAMPLES, PARSERS, parse
+
+
+def compare(code: str) -> bool:
+    expected = parse(PARSERS['pyparsing'], code)
+    actual = parse(PARSERS['recursive'], code)
+    if expected != actual:
+        print('РАСХОЖДЕНИЕ:', repr(code))
+        print('  pyparsing:', expected)
+        print('  recursive:', actual)
+        return False
+    return True
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    gen = Generator(random.Random(seed))
+    programs = list(SAMPLES)
+    for _ in range(count):
+        code = gen.program()
+        programs.append(code)
+        programs.append(gen.mutate(code))
+    failed = sum(not compare(code) for code in programs)
+    parsed = sum(parse(PARSERS['recursive'], code)[0] != 'ошибка' for code in programs)
+    print('программ: {}, из них разобрано: {}, расхождений: {}'.format(len(programs), parsed, failed))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Планировщик виртуальных машин (см. Scheduler): время выполнения множества программ последовательно и
+с чередованием по quantum команд, а также время завершения коротких программ, запущенных вместе с долгой.
+Запуск: python -m benchmarks.scheduler_bench [количество программ]
+"""
+import asyncio
+import sys
+import time
+
+from pipeline import Pipeline
+from Scheduler import Scheduler
+from VirtualMachine import VirtualMachine
+from benchmarks.vm_dispatch import PROG
+
+SHORT = '''
+    var s = 0;
+    for (var i = 0; i < 200; i++) { s = s + i * 2; }
+'''
+
+
+async def finish_times(scheduler, vms):
+    """Время от запуска до завершения каждой машины."""
+    start = time.perf_counter()
+
+    async def timed(vm):
+        await scheduler.execute(vm)
+        return time.perf_counter() - start
+    return await asyncio.gather(*(timed(vm) for vm in vms))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    pipeline = Pipeline(optimize=True)
+    short, long = pipeline.compile(SHORT), pipeline.compile(PROG)
+
+    start = time.perf_counter()
+    for _ in range(count):
+        VirtualMachine(short).run()
+    sequential = time.perf_counter() - start
+    for quantum in (100, 1000, 10000):
+        start = time.perf_counter()
+        Scheduler(quantum).run([VirtualMachine(short) for _ in range(count)])
+        print('{} программ, quantum {}: {:.3f} с (последовательно {:.3f} с)'.format(
+            count, quantum, time.perf_counter() - start, sequential))
+
+    # Долгая программа запускается первой. Без чередования короткие ждали бы её завершения.
+    start = time.perf_counter()
+    VirtualMachine(long).run()
+    alone = time.perf_counter() - start
+    times = asyncio.run(finish_times(Scheduler(1000), [VirtualMachine(long)] + [VirtualMachine(short)
+                                                                               for _ in range(100)]))
+    print('долгая программа отдельно: {:.3f} с'.format(alone))
+    print('вместе со 100 короткими: долгая завершилась за {:.3f} с, короткие - не позже {:.3f} с'.format(
+        times[0], max(times[1:])))
+
+
+if __name__ == '__main__':
+    main()
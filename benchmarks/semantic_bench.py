@@ -0,0 +1,37 @@
+"""
+Время семантического анализа программ с тысячами переменных и функций. Разбор в измерение не входит.
+Запуск: python -m benchmarks.semantic_bench
+"""
+import time
+
+from Parser import Parser
+from semantic_analyzer import Analyzer
+
+
+def source(variables: int) -> str:
+    """Программа из variables глобальных переменных и variables / 4 функций, которые их используют."""
+    functions = variables // 4
+    lines = ['var v{0} = {0};'.format(i) for i in range(variables)]
+    for i in range(functions):
+        lines.append('function f{0}(a, b) {{ var t = a + b * v{1}; return t - v{2}; }}'.format(
+            i, i, variables - 1 - i))
+    for i in range(variables):
+        lines.append('v{0} = f{1}(v{0}, v{2}) + v{3};'.format(i, i % functions, (i * 7) % variables, i // 2))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = Parser(backend='recursive')
+    for variables in (1000, 2000, 4000, 8000):
+        root = parser.parse(source(variables))
+        start = time.perf_counter()
+        analyzer = Analyzer()
+        analyzer.analyze(root)
+        elapsed = time.perf_counter() - start
+        assert not analyzer.errors, analyzer.errors[0].message
+        print('переменных {}, функций {}: анализ {:.3f} с, {:.2f} мкс на узел'.format(
+            variables, variables // 4, elapsed, elapsed / sum(1 for _ in root.preorder()) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Нагрузочный тест сервиса выполнения (см. ExecutionService): clients потоков-клиентов отправляют программы
+из набора benchmarks/corpus, по requests запросов каждый. Выводятся пропускная способность и задержка запроса
+(p50, p99).
+Запуск: python -m benchmarks.service_load [клиентов] [запросов на клиента]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from pipeline import Pipeline
+from execution_service import ExecutionClient, ExecutionService
+from benchmarks.suite import programs
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    pipeline = Pipeline(optimize=True)
+    compiled = [pipeline.compile(code).to_bytes() for name, code in programs().items() if name != 'generated']
+    latencies, errors = [], []
+    lock = threading.Lock()
+
+    def client(index):
+        with ExecutionClient(path) as connection:
+            for i in range(requests):
+                start = time.perf_counter()
+                result = connection.run_bytes(compiled[(index + i) % len(compiled)])
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    if result['error']:
+                        errors.append(result['error'])
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'service.sock')
+        with ExecutionService(path):
+            threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+    print('процессов: {}, клиентов: {}, запросов: {}, ошибок: {}'.format(
+        os.cpu_count(), clients, len(latencies), len(errors)))
+    print('пропускная способность: {:.1f} запросов/с'.format(len(latencies) / elapsed))
+    print('задержка: p50 {:.1f} мс, p99 {:.1f} мс, среднее {:.1f} мс'.format(
+        percentile(latencies, 50) * 1e3, percentile(latencies, 99) * 1e3, statistics.mean(latencies) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Время и пиковый объём памяти компиляции файла целиком (Pipeline.compile) и потоковой компиляции по инструкциям
+верхнего уровня (Pipeline.compile_file) при чтении файла и при отображении его в память.
+Запуск: python -m benchmarks.streaming_bench [количество инструкций]
+"""
+import os
+import sys
+import tempfile
+
+from pipeline import Pipeline
+from benchmarks.locations_bench import measure
+from benchmarks.parse_bench import source
+
+
+def compile_whole(path):
+    with open(path, encoding='utf-8', newline='') as file:
+        return Pipeline(backend='recursive').compile(file.read())
+
+
+def main():
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'program.js')
+        with open(path, 'w', encoding='utf-8', newline='') as file:
+            file.write(source(statements))
+        mb = os.path.getsize(path) / 2 ** 20
+        print('исходный код: {:.1f} МБ'.format(mb))
+        variants = [
+            ('целиком', lambda: compile_whole(path)),
+            ('потоково, чтение файла', lambda: Pipeline().compile_file(path)),
+            ('потоково, mmap', lambda: Pipeline().compile_file(path, use_mmap=True)),
+        ]
+        for title, func in variants:
+            bytecode, elapsed, peak = measure(func)
+            print('  {}: {:.2f} с, {:.2f} МБ/с, пик памяти {:.1f} МБ, команд {}'.format(
+                title, elapsed, mb / elapsed, peak / 2 ** 20, len(bytecode.code)))
+
+
+if __name__ == '__main__':
+    main()
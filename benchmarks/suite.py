@@ -0,0 +1,159 @@
+"""
+Сквозной бенчмарк всех этапов компиляции и выполнения на наборе программ: каталог benchmarks/corpus и большая
+сгенерированная программа. Этапы Parser.parse, Analyzer.analyze, CodeGenerator и VirtualMachine измеряются
+отдельно, каждый repeat раз после одного прогрева. Для каждого этапа сохраняются минимум, медиана, среднее,
+стандартное отклонение и межквартильный размах времени, а также пиковый объём памяти (отдельным запуском
+под tracemalloc, который замедляет выполнение). Результат записывается в JSON, что позволяет сравнить версии.
+Запуск: python -m benchmarks.suite [-r repeat] [-o результат.json] [--compare прежний.json] [имена программ]
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from Parser import Parser
+from semantic_analyzer import Analyzer
+from code_generator import CodeGenerator
+from VirtualMachine import VirtualMachine
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'corpus')
+PHASES = ('parse', 'analyze', 'codegen', 'vm')
+
+
+def generated(functions=200):
+    """Большая программа из однотипных функций, их вызовов и условных инструкций."""
+    lines = ['var acc = 0;']
+    for i in range(functions):
+        lines.append('function f{0}(a, b) {{ var t = a * {0} + b; if (t > {0}) {{ t = t - b; }} return t; }}'
+                     .format(i))
+    for i in range(functions):
+        lines.append('acc = acc + f{0}(acc, {0});'.format(i))
+        lines.append('if (acc > 100000) {{ acc = acc - 100000 + {0}; }} else {{ acc = acc + 1; }}'.format(i))
+    return '\n'.join(lines)
+
+
+def programs():
+    """Имя программы -> исходный код."""
+    result = {}
+    for name in sorted(os.listdir(CORPUS)):
+        if name.endswith('.js'):
+            with open(os.path.join(CORPUS, name), encoding='utf-8') as file:
+                result[name[:-3]] = file.read()
+    result['generated'] = generated()
+    return result
+
+
+def run_phases(code, parser):
+    """Выполняет все этапы и возвращает функции, каждая из которых повторяет один этап на готовых входных данных."""
+    root = parser.parse(code)
+    analyzer = Analyzer()
+    analyzer.analyze(root)
+    if analyzer.errors:
+        raise ValueError(analyzer.errors[0].message)
+    lines = CodeGenerator(root).lines
+    return {
+        'parse': lambda: parser.parse(code),
+        'analyze': lambda: Analyzer().analyze(root),
+        'codegen': lambda: CodeGenerator(root),
+        'vm': lambda: VirtualMachine(lines).run()
+    }
+
+
+def stats(times):
+    result = {
+        'min': min(times),
+        'median': statistics.median(times),
+        'mean': statistics.mean(times),
+        'stdev': statistics.stdev(times) if len(times) > 1 else 0.0,
+        'iqr': 0.0
+    }
+    if len(times) > 1:
+        quartiles = statistics.quantiles(times, n=4)
+        result['iqr'] = quartiles[2] - quartiles[0]
+    return result
+
+
+def measure(func, repeat):
+    """Статистика времени выполнения func за repeat запусков после прогрева и пиковый объём памяти в байтах."""
+    func()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    result = stats(times)
+    tracemalloc.start()
+    func()
+    result['peak_memory'] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result
+
+
+def run(names, repeat, backend):
+    parser = Parser(backend=backend)
+    results = {}
+    sources = programs()
+    for name in names or sources:
+        code = sources[name]
+        # Программы могут печатать, вывод виртуальной машины в результат не входит.
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            phases = run_phases(code, parser)
+            results[name] = {
+                'size': len(code.encode('utf-8')),
+                'phases': {phase: measure(phases[phase], repeat) for phase in PHASES}
+            }
+        print(name, ', '.join('{} {:.4f} с'.format(phase, results[name]['phases'][phase]['median'])
+                              for phase in PHASES), file=sys.stderr)
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'backend': backend,
+        'repeat': repeat,
+        'programs': results
+    }
+
+
+def compare(result, base):
+    """
+    Выводит в stderr отношение медиан времени и пиковой памяти к прежнему результату base для общих программ
+    и этапов: стандартный вывод может содержать результат в JSON.
+    """
+    for name, program in result['programs'].items():
+        if name not in base['programs']:
+            continue
+        for phase, current in program['phases'].items():
+            previous = base['programs'][name]['phases'].get(phase)
+            if previous:
+                print('{} {}: время x{:.2f}, память x{:.2f}'.format(
+                    name, phase, current['median'] / previous['median'],
+                    current['peak_memory'] / max(previous['peak_memory'], 1)), file=sys.stderr)
+
+
+def main():
+    arguments = argparse.ArgumentParser(description='Бенчмарк этапов компиляции и выполнения.')
+    arguments.add_argument('names', nargs='*', help='имена программ; по умолчанию все')
+    arguments.add_argument('-r', '--repeat', type=int, default=5, help='количество замеров каждого этапа')
+    arguments.add_argument('-b', '--backend', default='pyparsing', help='способ разбора (см. Parser)')
+    arguments.add_argument('-o', '--output', help='файл для результата в JSON; по умолчанию стандартный вывод')
+    arguments.add_argument('--compare', help='прежний результат в JSON для сравнения')
+    args = arguments.parse_args()
+
+    result = run(args.names, args.repeat, args.backend)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(result, file, ensure_ascii=False, indent=2)
+    else:
+        json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            compare(result, json.load(file))
+
+
+if __name__ == '__main__':
+    main()
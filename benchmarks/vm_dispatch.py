@@ -0,0 +1,79 @@
+"""
+Скорость основного цикла VirtualMachine в командах в секунду на программах с циклами, количество выполненных
+команд и время без суперинструкций и с ними (см. SuperinstructionSelector).
+Запуск: python -m benchmarks.vm_dispatch
+"""
+import time
+
+from Parser import Parser
+from code_generator import CodeGenerator
+from optimizer import Optimizer
+from superinstructions import SuperinstructionSelector
+from VirtualMachine import VirtualMachine
+
+PROG = '''
+    var total = 0;
+    for (var i = 0; i < 20000; i++) {
+        var j = 0;
+        while (j < 5) {
+            total = total + j * 2;
+            j++;
+        }
+    }
+'''
+# Цикл с декрементом, арифметикой с константами и сравнением двух переменных.
+COUNTDOWN = '''
+    var n = 100000;
+    var limit = 0;
+    var acc = 0;
+    while (limit < n) {
+        acc = acc + n * 2 - 1;
+        n--;
+    }
+'''
+
+
+class CountingVirtualMachine(VirtualMachine):
+    """Виртуальная машина, подсчитывающая количество выполненных команд."""
+    executed = 0
+
+    def _link(self, code):
+        def counted(handler):
+            def wrapper():
+                CountingVirtualMachine.executed += 1
+                handler()
+            return wrapper
+        return [counted(handler) for handler in super()._link(code)]
+
+
+def run(lines, repeat):
+    """Возвращает количество выполненных команд и лучшее время выполнения программы."""
+    CountingVirtualMachine.executed = 0
+    CountingVirtualMachine(lines).run()
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        VirtualMachine(lines).run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return CountingVirtualMachine.executed, best
+
+
+def main(repeat=3):
+    for title, prog in (('вложенные циклы', PROG), ('обратный отсчёт', COUNTDOWN)):
+        generator = CodeGenerator(Parser().parse(prog))
+        optimized = Optimizer(generator.lines, generator.funcs)
+        fused = SuperinstructionSelector(optimized.lines, optimized.funcs)
+        print('{}:'.format(title))
+        base = None
+        for variant, lines in (('без оптимизации', generator.lines), ('Optimizer', optimized.lines),
+                               ('Optimizer и суперинструкции', fused.lines)):
+            executed, best = run(lines, repeat)
+            base = base or (executed, best)
+            print('  {}: команд в программе {}, выполнено {} ({:.0%}), лучшее время {:.3f} с ({:.0%}), '
+                  'команд в секунду {:.0f}'.format(variant, len(lines), executed, executed / base[0], best,
+                                                  best / base[1], executed / best))
+
+
+if __name__ == '__main__':
+    main()
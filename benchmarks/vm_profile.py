@@ -0,0 +1,55 @@
+"""
+Профилирование программы с циклами и рекурсивной функцией (см. Profiler): самые затратные команды, функции и
+циклы. Отчёт в JSON и стеки в свёрнутом формате для flame graph записываются в файлы <prefix>.json и
+<prefix>.folded, если задан prefix.
+Запуск: python -m benchmarks.vm_profile [prefix]
+"""
+import sys
+import time
+
+from pipeline import Pipeline
+from Profiler import Profiler
+from VirtualMachine import VirtualMachine
+from benchmarks.vm_dispatch import PROG
+
+FIB = '''
+    function fib(n) {
+        if (n < 2) { return n; }
+        return fib(n - 1) + fib(n - 2);
+    }
+    var f = fib(18);
+'''
+
+
+def main():
+    bytecode = Pipeline(optimize=True).compile(PROG + FIB)
+    start = time.perf_counter()
+    VirtualMachine(bytecode).run()
+    plain = time.perf_counter() - start
+    profiler = Profiler()
+    start = time.perf_counter()
+    VirtualMachine(bytecode, profiler=profiler).run()
+    profiled = time.perf_counter() - start
+    print('без профилировщика {:.3f} с, с профилировщиком {:.3f} с'.format(plain, profiled))
+
+    report = profiler.report()
+    print('команды:')
+    for cmd, stats in sorted(report['opcodes'].items(), key=lambda item: item[1]['time'], reverse=True)[:5]:
+        print('  {}: {} раз, {:.3f} с'.format(cmd, stats['count'], stats['time']))
+    print('функции:')
+    for name, stats in report['functions'].items():
+        print('  {}: {} вызовов, {:.3f} с, собственное время {:.3f} с'.format(
+            name, stats['calls'], stats['time'], stats['self_time']))
+    print('циклы:')
+    for loop in report['loops']:
+        print('  команды {}-{}: {} итераций, {:.3f} с'.format(loop['start'], loop['end'], loop['iterations'],
+                                                           loop['time']))
+    if len(sys.argv) > 1:
+        with open(sys.argv[1] + '.json', 'w', encoding='utf-8') as file:
+            profiler.dump_json(file)
+        with open(sys.argv[1] + '.folded', 'w', encoding='utf-8') as file:
+            profiler.dump_collapsed(file)
+
+
+if __name__ == '__main__':
+    main()
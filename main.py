@@ -1,4 +1,3 @@
-import os
 from Parser import *
 from semantic_analyzer import *
 from code_generator import *
@@ -19,7 +18,7 @@ parser = Parser()
 analyzer = Analyzer()
 # в переменной res хранится корень графа, описывающего структуру кода из переменной prog.
 res = parser.parse(prog)
-print(*res.tree, sep=os.linesep)
+res.print_tree()
 
 # вызов метода analyze, который производит семантический анализ
 analyzer.analyze(res)
@@ -31,5 +30,6 @@ else:
     generator = CodeGenerator(res)
     generator.print_bytecode()
     vm = VirtualMachine(generator.lines)
+    vm.run()
 
 
@@ -0,0 +1,18 @@
+"""
+Сервис выполнения скомпилированных программ (см. src/Сompiler/execution_service.py).
+Запуск: python run_service.py [-j процессов] путь_к_сокету
+"""
+import os
+import sys
+
+_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+# Модули проекта импортируются без пакетов, поэтому добавляем их каталоги в sys.path.
+for _dir in ('AST', 'Semantics', 'VM', 'Сompiler'):
+    _path = os.path.join(_SRC, _dir)
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from execution_service import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+from array import array
+from bisect import bisect_right
+from typing import Tuple
+
+
+class LineIndex:
+    """
+    Индекс строк исходного кода для перевода позиции символа в строку и символ в строке.
+    Хранит только позиции начала строк и символов '\\r', поэтому занимает память пропорционально количеству строк,
+    а не размеру кода. Строка и символ вычисляются двоичным поиском.
+    Правила те же, что и у прежнего посимвольного списка позиций Parser:
+    - строки нумеруются с 0, символ '\\n' относится к следующей строке и имеет номер 0;
+    - символы в строке нумеруются с 1, символы '\\r' не учитываются.
+    Если code - продолжение другого кода, row и col задают строку и количество символов в ней перед началом code
+    (см. origin).
+    """
+    def __init__(self, code: str, row: int = 0, col: int = 0):
+        self.size = len(code)
+        self.row = row
+        self.col = col
+        self.starts = array('q', [0])
+        self.returns = array('q')
+        find = code.find
+        pos = find('\n')
+        while pos != -1:
+            self.starts.append(pos + 1)
+            pos = find('\n', pos + 1)
+        pos = find('\r')
+        while pos != -1:
+            self.returns.append(pos)
+            pos = find('\r', pos + 1)
+
+    def location(self, loc: int) -> Tuple[int, int]:
+        """Возвращает строку и символ для позиции loc. Позиция len(code) - конец кода - тоже допустима."""
+        if loc < 0 or loc > self.size:
+            raise IndexError('Позиция {} за пределами исходного кода'.format(loc))
+        row = bisect_right(self.starts, loc + 1) - 1
+        return self.row + row, self.__column(row, loc + 1)
+
+    def origin(self, loc: int) -> Tuple[int, int]:
+        """Возвращает аргументы row и col для индекса строк кода, который начинается с позиции loc этого кода."""
+        row = bisect_right(self.starts, loc) - 1
+        return self.row + row, self.__column(row, loc)
+
+    def __column(self, row: int, end: int) -> int:
+        """Количество символов строки row, кроме '\\r', до позиции end."""
+        start = self.starts[row]
+        col = end - start
+        if self.returns:
+            col -= bisect_right(self.returns, end - 1) - bisect_right(self.returns, start - 1)
+        return col + self.col if row == 0 else col
+
+    def __len__(self) -> int:
+        return len(self.starts)
@@ -1,36 +1,125 @@
+import sys
 from abc import abstractmethod, ABC
-from typing import Tuple, Callable, Optional
+from typing import Tuple, Callable, Optional, Iterator, TextIO
+
+
+def _child_nodes(node: 'TreeNode') -> Tuple['TreeNode', ...]:
+    """Дочерние элементы, которые являются узлами: пустые части цикла for хранятся как пустые ParseResults."""
+    return tuple(child for child in node.children if isinstance(child, TreeNode))
 
 
 class TreeNode(ABC):
-    """ Базовый класс для всех остальных классов. Используется для вывода дерева в консоль """
+    """
+    Базовый класс для всех остальных классов. Используется для вывода дерева в консоль.
+    Позицию узла можно задать строкой и символом (row, col) или смещением в исходном коде (метод locate),
+    тогда строка и символ вычисляются при первом обращении к ним.
+    Деревья больших программ содержат миллионы узлов, поэтому узлы хранят атрибуты в __slots__, без словаря
+    атрибутов. Каждый подкласс объявляет в __slots__ свои атрибуты.
+    """
+    __slots__ = ('_row', '_col', '_lines')
+
     def __init__(self, row: Optional, col: Optional):
         super().__init__()
-        self.row = row
-        self.col = col
+        self._row = row
+        self._col = col
+        # Индекс строк (Locations.LineIndex), пока позиция не вычислена. В это время _col хранит смещение узла.
+        self._lines = None
+
+    def locate(self, lines, loc: int) -> 'TreeNode':
+        """Задаёт позицию узла смещением loc в исходном коде с индексом строк lines. Возвращает сам узел."""
+        self._lines = lines
+        self._col = loc
+        return self
+
+    def __resolve(self):
+        self._row, self._col = self._lines.location(self._col)
+        self._lines = None
+
+    @property
+    def row(self):
+        if self._lines is not None:
+            self.__resolve()
+        return self._row
+
+    @row.setter
+    def row(self, value):
+        if self._lines is not None:
+            self.__resolve()
+        self._row = value
+
+    @property
+    def col(self):
+        if self._lines is not None:
+            self.__resolve()
+        return self._col
+
+    @col.setter
+    def col(self, value):
+        if self._lines is not None:
+            self.__resolve()
+        self._col = value
 
     @property
     def children(self) -> Tuple['TreeNode', ...]:
         return ()
 
+    def preorder(self) -> Iterator[Tuple['TreeNode', int]]:
+        """
+        Обход дерева в прямом порядке: узел, затем его дочерние узлы. Возвращает пары (узел, глубина),
+        глубина корня - 0. Обход не использует рекурсию, поэтому глубина дерева не ограничена.
+        """
+        stack = [(self, 0)]
+        while stack:
+            node, depth = stack.pop()
+            yield node, depth
+            stack.extend((child, depth + 1) for child in reversed(_child_nodes(node)))
+
+    def postorder(self) -> Iterator[Tuple['TreeNode', int]]:
+        """Обход дерева в обратном порядке: дочерние узлы, затем сам узел. Возвращает пары (узел, глубина)."""
+        # Элемент стека: узел, глубина и признак того, что его дочерние узлы уже в стеке.
+        stack = [(self, 0, False)]
+        while stack:
+            node, depth, expanded = stack.pop()
+            if expanded:
+                yield node, depth
+                continue
+            stack.append((node, depth, True))
+            stack.extend((child, depth + 1, False) for child in reversed(_child_nodes(node)))
+
+    def tree_lines(self) -> Iterator[str]:
+        """Строки изображения дерева, по одной на узел. Строки формируются по мере обхода, без рекурсии."""
+        # Элемент стека: узел, отступ его строки и отступ строк его потомков.
+        stack = [(self, '', '')]
+        while stack:
+            node, first, rest = stack.pop()
+            yield first + str(node)
+            children = _child_nodes(node)
+            last = len(children) - 1
+            for i in range(last, -1, -1):
+                if i == last:
+                    stack.append((children[i], rest + '└ ', rest + '  '))
+                else:
+                    stack.append((children[i], rest + '├ ', rest + '│ '))
+
     @property
     def tree(self) -> [str, ...]:
-        res = [str(self)]
-        children_temp = self.children
-        for i, child in enumerate(children_temp):
-            ch0, ch = '├', '│'
-            if i == len(children_temp) - 1:
-                ch0, ch = '└', ' '
-            res.extend(((ch0 if j == 0 else ch) + ' ' + s for j, s in enumerate(child.tree)))
-        return res
+        return list(self.tree_lines())
+
+    def print_tree(self, file: Optional[TextIO] = None):
+        """Выводит дерево в файл file (по умолчанию - в sys.stdout) построчно, не собирая его в памяти."""
+        file = file if file is not None else sys.stdout
+        for line in self.tree_lines():
+            file.write(line)
+            file.write('\n')
 
     @abstractmethod
     def __str__(self):
         pass
 
     def visit(self, func: Callable[['TreeNode'], None]) -> None:
-        func(self)
-        map(func, self.children)
+        """Вызывает func для каждого узла дерева в прямом порядке."""
+        for node, _ in self.preorder():
+            func(node)
 
     def __getitem__(self, index):
         return self.children[index] if index < len(self.children) else None
@@ -41,7 +130,7 @@ class EvalNode(TreeNode):
     Класс, от которого наследуются классы,
     чьи значения можно привести к конкретному цифровому или буквенному значению.
     """
-    pass
+    __slots__ = ()
 
 
 class ValueNode(EvalNode):
@@ -49,20 +138,22 @@ class ValueNode(EvalNode):
     Класс, от которого наследуются классы LitelarNode и IdentNode,
     то есть те, которые могут содержать какие-либо значения.
     """
-    pass
+    __slots__ = ()
 
 
 class ExprNode(EvalNode):
     """
     Класс, который является родительским для классов, описывающих выражения.
     """
-    pass
+    __slots__ = ()
 
 
 class LiteralNode(ValueNode):
     """
     Класс, содержащий в себе какое-либо значение: число или строку
     """
+    __slots__ = ('value',)
+
     def __init__(self, row, col, value):
         super().__init__(row, col)
         self.value = value
@@ -75,9 +166,12 @@ class IdentNode(ValueNode):
     """
     Класс, описывающий какой-либо идентификатор, то есть название переменной или функции.
     """
+    __slots__ = ('name',)
+
     def __init__(self, row, col,  name):
         super().__init__(row, col)
-        self.name = name
+        # Одинаковые имена хранятся одной строкой: это экономит память и ускоряет поиск имён в областях видимости.
+        self.name = sys.intern(name)
 
     def __str__(self) -> str:
         return str(self.name)
@@ -87,6 +181,8 @@ class BinExprNode(ExprNode):
     """
     Класс, описывающий бинарное выражение, то есть выражение, имеющее левую и правую часть, и оператор.
     """
+    __slots__ = ('left', 'right', 'op')
+
     def __init__(self, row, col, op, left, right):
         super().__init__(row, col)
         self.left = left
@@ -105,6 +201,8 @@ class UnaryExprNode(ExprNode):
     """
     Класс, описывающий унарное выражение, то есть выражение, имеющее левую часть и оператор.
     """
+    __slots__ = ('op', 'argument')
+
     def __init__(self, row, col,  op, argument):
         super().__init__(row, col)
         self.op = op
@@ -122,6 +220,8 @@ class DeclaratorNode(TreeNode):
     """
     Класс, описывающий объявление переменной.
     """
+    __slots__ = ('ident', 'init')
+
     def __init__(self, row, col,  ident: IdentNode, init: EvalNode = None):
         super().__init__(row, col)
         self.ident = ident
@@ -140,6 +240,8 @@ class VarDeclarationNode(TreeNode):
     Класс, описывающий объявления переменных. Содержит переменную declarations,
     в которой хранится множество с экземплярами класса DeclaratorNode.
     """
+    __slots__ = ('declarations',)
+
     def __init__(self, row, col, *declarations: DeclaratorNode):
         super().__init__(row, col)
         self.declarations = declarations
@@ -157,6 +259,8 @@ class BlockStatementNode(TreeNode):
     Класс, содержащий в себе переменную nodes, описывающую множество всех узлов в этом блоке.
     В нашей реализации вся программа является блоком. Функции, if, for, while и do while также содержат в себе блоки.
     """
+    __slots__ = ('nodes',)
+
     def __init__(self, row, col, *nodes: TreeNode):
         super().__init__(row, col)
         self.nodes = nodes
@@ -173,6 +277,8 @@ class ArgsNode(TreeNode):
     """
     Класс, описывающий множество аргументов функции.
     """
+    __slots__ = ('params',)
+
     def __init__(self, row, col, *params: Tuple[IdentNode]):
         super().__init__(row, col)
         self.params = params
@@ -188,6 +294,8 @@ class FuncDeclarationNode(TreeNode):
     params - аргументы функции,
     block - тело функции.
     """
+    __slots__ = ('ident', 'params', 'block')
+
     def __init__(self, row, col, ident: IdentNode, params: Optional[ArgsNode], block: BlockStatementNode):
         super().__init__(row, col)
         self.ident = ident
@@ -209,6 +317,8 @@ class IfNode(TreeNode):
     consequent - выполняется, если test принял истинное значение,
     alternate - выполняется, если test принял отрицательное значение.
     """
+    __slots__ = ('test', 'consequent', 'alternate')
+
     def __init__(self, row, col, test: EvalNode, consequent: BlockStatementNode, alternate: BlockStatementNode = None):
         super().__init__(row, col)
         self.test = test
@@ -231,6 +341,8 @@ class ForNode(TreeNode):
     update - обновление значений переменной-счётчика.
     block - выполняется, если test принял истинное значение.
     """
+    __slots__ = ('init', 'test', 'update', 'block')
+
     def __init__(self, row, col, init: VarDeclarationNode, test: EvalNode, update: EvalNode, block: BlockStatementNode):
         super().__init__(row, col)
         self.init = init
@@ -252,6 +364,8 @@ class WhileNode(TreeNode):
     test - выражение, определяющее дальнейшее поведение, т.е. будет ли исполняться код в block,
     block - выполняется, если test принял истинное значение.
     """
+    __slots__ = ('test', 'block')
+
     def __init__(self, row, col,  test: EvalNode, block: BlockStatementNode):
         super().__init__(row, col)
         self.test = test
@@ -272,6 +386,8 @@ class DoWhileNode(TreeNode):
        block - выполняется, если test принял истинное значение.
        Отличие от while в том, что код в block выполнится как минимум однократно.
        """
+    __slots__ = ('block', 'test')
+
     def __init__(self, row, col, block: BlockStatementNode, test: EvalNode):
         super().__init__(row, col)
         self.block = block
@@ -289,11 +405,16 @@ class CallNode(TreeNode):
     """
     Класс, описывающий вызов функции. ident - название функции, args - аргументы.
     """
+    __slots__ = ('ident', 'args')
+
     def __init__(self, row, col, ident: IdentNode, *args: EvalNode):
         super().__init__(row, col)
         self.ident = ident
         self.args = args
-        self.name = ident.name
+
+    @property
+    def name(self) -> str:
+        return self.ident.name
 
     @property
     def children(self) -> Tuple[IdentNode, EvalNode]:
@@ -307,6 +428,8 @@ class ReturnNode(TreeNode):
     """
     Класс, описывающий оператор return. Переменная argument - возвращаемое значение.
     """
+    __slots__ = ('argument',)
+
     def __init__(self, row, col, argument: EvalNode):
         super().__init__(row, col)
         self.argument = argument
@@ -22,3 +22,4 @@ class Operators(Enum):
     LT = '<'
     LOG_AND = '&&'
     LOG_OR = '||'
+    LOG_NOT = '!'
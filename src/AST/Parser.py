@@ -1,19 +1,80 @@
 import inspect
+import re
+import threading
+from typing import Iterable, Iterator
 from contextlib import suppress
 from Operators import Operators
 import pyparsing as pp
 from pyparsing import pyparsing_common as ppc
 from Nodes import *
+from RecursiveParser import RecursiveParser
+from Locations import LineIndex
+from SourceReader import COMMENT_OR_STRING, statement_chunks
+
+
+def _blank_comment(match) -> str:
+    text = match.group()
+    if text.startswith('"'):
+        return text
+    # Переводы строк и табуляции сохраняются, поэтому позиции всех остальных символов не меняются.
+    return re.sub(r'[^\r\n\t]', ' ', text)
+
+
+def _blank_comments(code: str) -> str:
+    """
+    Заменяет комментарии пробелами. Пропуск комментариев как пробельных символов до разбора
+    эквивалентен их пропуску грамматикой перед каждым элементом, но не требует проверки в каждой позиции.
+    """
+    return COMMENT_OR_STRING.sub(_blank_comment, code)
+
+
+# Состояние разбора текущего потока: индекс строк исходного кода, который разбирается в данный момент.
+# Грамматика общая для всех экземпляров Parser, поэтому действия разбора получают индекс отсюда.
+_state = threading.local()
+
+
+def _node(cls, loc: int, *args) -> TreeNode:
+    """Создаёт узел с позицией loc в разбираемом коде. Строка и символ вычисляются при первом обращении."""
+    return cls(None, None, *args).locate(_state.lines, loc)
+
+
+def set_packrat(enabled: bool, cache_size: int = 128):
+    """
+    Включает или выключает мемоизацию результатов разбора (packrat parsing) с кэшем на cache_size элементов.
+    В pyparsing этот режим действует на весь процесс: на все экземпляры Parser с backend='pyparsing' и на любые
+    другие грамматики pyparsing. На программах этого языка он замедляет разбор (см. benchmarks.parse_bench),
+    поэтому по умолчанию выключен.
+    """
+    if enabled:
+        # В pyparsing 3 методы переименованы, старые имена помечены устаревшими.
+        enable = getattr(pp.ParserElement, 'enable_packrat', None) or pp.ParserElement.enablePackrat
+        enable(cache_size)
+    else:
+        pp.ParserElement.disable_memoization()
 
 
 class Parser:
-    """ Класс, который используется для парсинга кода. """
-    def __init__(self):
-        self.grammar = self.__mk_grammar()
-        self._locs = []
+    """
+    Класс, который используется для парсинга кода.
+    Грамматика создаётся один раз при создании первого экземпляра и используется всеми экземплярами.
+    Мемоизация разбора pyparsing включается для всего процесса функцией set_packrat.
+    backend - способ разбора: 'pyparsing' (грамматика pyparsing) или 'recursive' (RecursiveParser,
+    рекурсивный спуск по той же грамматике). Оба строят одинаковые деревья.
+    """
+    _grammar = None
+    BACKENDS = ('pyparsing', 'recursive')
 
-    def __mk_grammar(self):
-        """ Метод, в котором создаётся описание грамматики, вызывается в конструкторе класса Parser. """
+    def __init__(self, backend: str = 'pyparsing'):
+        if backend not in Parser.BACKENDS:
+            raise ValueError('Неизвестный способ разбора: {}'.format(backend))
+        self.backend = backend
+        if Parser._grammar is None and backend == 'pyparsing':
+            Parser._grammar = Parser.__mk_grammar()
+        self.grammar = Parser._grammar
+
+    @staticmethod
+    def __mk_grammar():
+        """ Метод, в котором создаётся описание грамматики, вызывается при создании первого экземпляра Parser. """
         # Описание LiteralNode и IdentNode
         num = ppc.integer() | ppc.real()
         str_ = pp.QuotedString('"', escChar='\\', unquoteResults=True, convertWhitespaceEscapes=False)
@@ -106,11 +167,14 @@ class Parser:
             # проверка на то, что текущий элемент является экземлпяром класса ParserElement
             if isinstance(value, pp.ParserElement):
                 # вызов метода __set_parse_action
-                self.__set_parse_action(var_name, value)
+                Parser.__set_parse_action(var_name, value)
 
-        return block.ignore(pp.cStyleComment).ignore(pp.dblSlashComment) + pp.stringEnd
+        # Комментарии заменяются пробелами до разбора (см. _blank_comments), поэтому грамматика их не пропускает.
+        # Табуляции не раскрываются, чтобы позиции совпадали с позициями в исходном коде.
+        return (block + pp.stringEnd).parseWithTabs()
 
-    def __set_parse_action(self, rule_name: str, rule: pp.ParserElement):
+    @staticmethod
+    def __set_parse_action(rule_name: str, rule: pp.ParserElement):
         """ Этот метод задаёт то, какой конструктор вызывается при успешном распознавании правила грамматики. """
         # если rule_name написан КАПСОМ, то никаких действий совершать не нужно,
         # потому что КАПСОМ мы обозначили названия переменных, в которых описываются различные операторы.
@@ -132,8 +196,7 @@ class Parser:
                     if not isinstance(secondNode, TreeNode):
                         secondNode = bin_op_parse_action(s, loc, secondNode)
                     # Когда распознана правая часть, создаётся экземпляр класса BinExprNode.
-                    node = BinExprNode(self._locs[loc][0], self._locs[loc][1],
-                                       Operators(toks[i]), node, secondNode)
+                    node = _node(BinExprNode, loc, Operators(toks[i]), node, secondNode)
                 return node
             # Задаётся действие при успешном распознавании текущего правила - вызов функции bin_op_parse_action.
             rule.setParseAction(bin_op_parse_action)
@@ -147,7 +210,7 @@ class Parser:
                     node = un_op_parse_action(s, loc, node)
                 for i in range(1, len(toks)):
                     # Создаётся экземпляр класса UnaryExprNode.
-                    node = UnaryExprNode(self._locs[loc][0], self._locs[loc][1], Operators(toks[i]), node)
+                    node = _node(UnaryExprNode, loc, Operators(toks[i]), node)
                 return node
             # Задаётся действие при успешном распознавании текущего правила - вызов функции un_op_parse_action.
             rule.setParseAction(un_op_parse_action)
@@ -165,7 +228,7 @@ class Parser:
                 if not inspect.isabstract(cls):
                     # Этот метод вернёт экземпляр класса, который соответствует разбираемому правилу.
                     def parse_action(s, loc, toks):
-                        return cls(self._locs[loc][0], self._locs[loc][1], *toks)
+                        return _node(cls, loc, *toks)
                     # Задаётся действие при успешном распознавании текущего правила - вызов функции parse_action.
                     rule.setParseAction(parse_action)
 
@@ -174,15 +237,57 @@ class Parser:
         Функция, принимающая строку,
         в которой парсер по заданным правилам будет распознавать элементы описанного языка.
         """
-        row, col = 0, 0
-        for ch in code:
-            if ch == '\n':
-                row += 1
-                col = 0
-            elif ch == '\r':
-                pass
-            else:
-                col += 1
-            self._locs.append((row, col))
+        code = str(code)
+        lines = LineIndex(code)
+        text = _blank_comments(code)
+        if self.backend == 'recursive':
+            root = RecursiveParser(text, lines).parse()
+        else:
+            _state.lines = lines
+            try:
+                root = self.grammar.parseString(text)[0]
+            finally:
+                _state.lines = None
+        # Позиция корневого блока - первый непробельный символ, даже если это начало комментария:
+        # перед корневым блоком грамматика пропускала только пробельные символы.
+        start = len(code) - len(code.lstrip(' \t\n\r'))
+        if start < len(code):
+            root.locate(lines, start)
+        return root
 
-        return self.grammar.parseString(str(code))[0]
+    def parse_stream(self, blocks: Iterable[str]) -> Iterator[TreeNode]:
+        """
+        Разбирает код, который поступает фрагментами blocks (например, из SourceReader.read_file), и возвращает
+        инструкции верхнего уровня по одной. В памяти хранится только ещё не разобранная часть кода, а не весь код.
+        Позиции узлов - позиции в коде целиком. Разбор всегда выполняется RecursiveParser: он строит те же деревья,
+        что и грамматика pyparsing, и позволяет разбирать код по одной инструкции.
+        """
+        text, row, col = '', 0, 0
+        chunks = statement_chunks(blocks)
+        more = True
+        while more:
+            chunk = next(chunks, None)
+            if chunk is None:
+                more = False
+            else:
+                text += chunk
+            lines = LineIndex(text, row, col)
+            parser = RecursiveParser(_blank_comments(text), lines)
+            start = 0
+            while True:
+                try:
+                    node = parser.statement()
+                except pp.ParseException as error:
+                    # Инструкция может продолжаться в следующей части кода.
+                    if more and parser.incomplete:
+                        break
+                    # Позиция ошибки в части кода переводится в строку и символ в коде целиком.
+                    raise pp.ParseException(error.pstr, error.loc, '{}: строка {}, символ {}'.format(
+                        error.msg, *lines.location(error.loc))) from None
+                # Последняя инструкция части может продолжиться в следующей части: if ... else, do ... while.
+                if node is None or more and parser.incomplete:
+                    break
+                yield node
+                start = parser.position
+            row, col = lines.origin(start)
+            text = text[start:]
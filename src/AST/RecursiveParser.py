@@ -0,0 +1,457 @@
+import re
+from typing import Callable, List, Tuple
+import pyparsing as pp
+from Operators import Operators
+from Nodes import *
+from Locations import LineIndex
+
+
+def _char_class(chars: str) -> str:
+    return '[' + ''.join(re.escape(ch) for ch in chars) + ']'
+
+
+# Символы идентификаторов и ключевых слов те же, что у ppc.identifier и pp.Keyword.
+_IDENT_CHARS = getattr(pp, 'identchars', pp.alphas + '_')
+_IDENT_BODY_CHARS = getattr(pp, 'identbodychars', pp.alphanums + '_')
+_KEYWORD_CHARS = pp.Keyword.DEFAULT_KEYWORD_CHARS
+
+# Виды лексем. Для скобок и операторов видом лексемы служит сам текст лексемы.
+NUM, STR, IDENT, OTHER, END = 'num', 'str', 'ident', 'other', 'end'
+
+# Лексемы распознаются за один проход одним регулярным выражением. Пробельные символы - те же, что пропускает
+# pyparsing, любой другой нераспознанный символ становится отдельной лексемой OTHER.
+_TOKEN = re.compile(
+    r'[ \t\r\n]*(?:'
+    r'(?P<num>[0-9]+)'
+    r'|(?P<ident>' + _char_class(_IDENT_CHARS) + _char_class(_IDENT_BODY_CHARS) + r'*)'
+    r'|(?P<str>"(?:\\.|[^"\n\r\\])*")'
+    r'|(?P<op>\*\*|\+\+|--|>=|<=|==|!=|&&|\|\||[-+*/%<>=(){};,])'
+    r'|(?P<other>[^ \t\r\n]))'
+)
+# Дробное число распознаётся только там, где ожидается литерал, и может начинаться со знака (как ppc.real).
+_REAL = re.compile(r'[+-]?(?:\d+\.\d*|\.\d+)')
+_ESCAPED = re.compile(r'\\(.)')
+
+# Уровни бинарных операторов в порядке возрастания приоритета. Все операторы левоассоциативны.
+_LEVELS = (('||', ), ('&&', ), ('==', '!='), ('>=', '<=', '>', '<'), ('+', '-'), ('**', '*', '/', '%'))
+_OPERATOR_LEVEL = {op: level for level, ops in enumerate(_LEVELS) for op in ops}
+# Уровень сравнений. Узлы уровней сложения и умножения получают позицию выражения этого уровня,
+# как в грамматике pyparsing, где действие разбора задано только для уровней сравнения и ниже по приоритету.
+_COMPARE = 3
+_MUL = len(_LEVELS) - 1
+# '++' и '--' после операнда могут оказаться сложением или вычитанием дробного числа со знаком.
+_OPERATOR_LEVEL['++'] = _OPERATOR_LEVEL['--'] = _COMPARE + 1
+_OPERATORS = {op.value: op for op in Operators}
+
+
+def tokenize(text: str) -> Tuple[List[str], List[str], List[int]]:
+    """
+    Разбивает текст на лексемы. Возвращает три списка одинаковой длины: виды лексем, их текст и позиции начала.
+    Последняя лексема - END в позиции конца текста.
+    """
+    tags, values, starts = [], [], []
+    add_tag, add_value, add_start = tags.append, values.append, starts.append
+    for match in _TOKEN.finditer(text):
+        kind = match.lastgroup
+        value = match.group(kind)
+        add_tag(value if kind == 'op' else kind)
+        add_value(value)
+        add_start(match.start(kind))
+    tags.append(END)
+    values.append('')
+    starts.append(len(text))
+    return tags, values, starts
+
+
+class _Fail(Exception):
+    """Текущая альтернатива не подошла, разбор продолжается со следующей."""
+    pass
+
+
+class RecursiveParser:
+    """
+    Разбор кода рекурсивным спуском с разбором выражений по приоритетам операторов.
+    Повторяет грамматику Parser, включая порядок перебора альтернатив и возврат при неудаче, и строит такое же
+    дерево, в том числе с теми же позициями узлов.
+    text - код без комментариев, lines - индекс строк этого кода.
+    Лексемы выделяются заранее, поэтому ключевое слово, за которым без пробела следует буква не из ASCII
+    (например, varé), считается частью идентификатора, тогда как pp.Keyword распознал бы в нём var.
+    """
+    def __init__(self, text: str, lines: LineIndex):
+        self.__text = text
+        self.__lines = lines
+        self.__tags, self.__values, self.__starts = tokenize(text)
+        self.__pos = 0
+        # Самая дальняя позиция, на которой разбор не удался, - для сообщения об ошибке.
+        self.__furthest = 0
+        self.incomplete = False
+
+    def parse(self) -> BlockStatementNode:
+        try:
+            root = self.__block()
+        except _Fail:
+            root = None
+        if root is None or self.__tags[self.__pos] != END:
+            # Как и грамматика pyparsing (string_end после блока), ошибка указывает на начало первой инструкции,
+            # которую не удалось разобрать.
+            loc = self.__starts[self.__pos]
+            raise pp.ParseException(self.__text, loc, 'Ошибка разбора')
+        return root
+
+    def statement(self) -> TreeNode:
+        """
+        Разбирает очередную инструкцию верхнего уровня вместе с точками с запятой после неё, как это делает
+        блок в parse. В конце кода возвращает None. Если инструкция не распознана, вызывает ParseException.
+        incomplete показывает, дошёл ли разбор инструкции до конца кода, в том числе в отброшенных альтернативах:
+        тогда с продолжением кода инструкция может быть разобрана иначе.
+        """
+        if self.__tags[self.__pos] == END:
+            return None
+        self.__furthest = self.__pos
+        node = self.__attempt(self.__stmt)
+        end = len(self.__tags) - 1
+        self.incomplete = self.__furthest == end
+        if node is None:
+            raise pp.ParseException(self.__text, self.__starts[self.__furthest], 'Ошибка разбора')
+        while self.__tags[self.__pos] == ';':
+            self.__pos += 1
+        self.incomplete = self.incomplete or self.__pos == end
+        return node
+
+    @property
+    def position(self) -> int:
+        """Позиция в коде, с которой продолжится разбор."""
+        return self.__starts[self.__pos]
+
+    def __node(self, cls, loc: int, *args) -> TreeNode:
+        """Создаёт узел с позицией loc, строка и символ которой будут вычислены при первом обращении."""
+        return cls(None, None, *args).locate(self.__lines, loc)
+
+    def __fail(self):
+        self.__furthest = max(self.__furthest, self.__pos)
+        raise _Fail()
+
+    def __expect(self, tag: str):
+        if self.__tags[self.__pos] != tag:
+            self.__fail()
+        self.__pos += 1
+
+    def __keyword(self, word: str) -> bool:
+        """Проверяет, что текущая лексема - ключевое слово word, по тем же правилам, что и pp.Keyword."""
+        pos = self.__pos
+        if self.__tags[pos] != IDENT or self.__values[pos] != word:
+            return False
+        start, end = self.__starts[pos], self.__starts[pos] + len(word)
+        return (start == 0 or self.__text[start - 1] not in _KEYWORD_CHARS) and \
+               (end >= len(self.__text) or self.__text[end] not in _KEYWORD_CHARS)
+
+    def __attempt(self, rule: Callable[[], TreeNode]):
+        """Применяет правило. Если оно не подошло, возвращает позицию разбора назад и возвращает None."""
+        pos = self.__pos
+        try:
+            return rule()
+        except _Fail:
+            self.__pos = pos
+            return None
+
+    def __block(self) -> BlockStatementNode:
+        start = self.__starts[self.__pos]
+        nodes = []
+        tags = self.__tags
+        while True:
+            node = self.__attempt(self.__stmt)
+            if node is None:
+                break
+            nodes.append(node)
+            while tags[self.__pos] == ';':
+                self.__pos += 1
+        return self.__node(BlockStatementNode, start, *nodes)
+
+    def __stmt(self) -> TreeNode:
+        tag = self.__tags[self.__pos]
+        if tag == '{':
+            return self.__br_block()
+        if tag != IDENT:
+            self.__fail()
+        word = self.__values[self.__pos]
+        # Альтернативы перебираются в порядке грамматики: if, for, while, do, var, простая инструкция,
+        # function, return. Ключевое слово может оказаться и началом простой инструкции, например if(x);
+        rule = self.__before_simple.get(word)
+        if rule is not None and self.__keyword(word):
+            node = self.__attempt(lambda: rule(self))
+            if node is not None:
+                return node
+        node = self.__attempt(self.__simple_stmt_semicolon)
+        if node is not None:
+            return node
+        rule = self.__after_simple.get(word)
+        if rule is not None and self.__keyword(word):
+            return rule(self)
+        self.__fail()
+
+    def __simple_stmt_semicolon(self) -> TreeNode:
+        node = self.__simple_stmt()
+        self.__expect(';')
+        return node
+
+    def __var_semicolon(self) -> VarDeclarationNode:
+        node = self.__var()
+        self.__expect(';')
+        return node
+
+    def __simple_stmt(self) -> TreeNode:
+        """Присваивание, вызов функции, инкремент или декремент. Альтернативы различаются второй лексемой."""
+        pos = self.__pos
+        if self.__tags[pos] != IDENT:
+            self.__fail()
+        following = self.__tags[pos + 1]
+        if following == '(':
+            return self.__call()
+        start = self.__starts[pos]
+        if following == '=':
+            ident = self.__ident()
+            self.__pos += 1
+            right = self.__expr()
+            return self.__node(BinExprNode, start, Operators.ASSIGN, ident, right)
+        if following in ('++', '--'):
+            ident = self.__ident()
+            self.__pos += 1
+            return self.__node(UnaryExprNode, start, _OPERATORS[following], ident)
+        self.__fail()
+
+    def __br_block(self) -> BlockStatementNode:
+        self.__expect('{')
+        block = self.__block()
+        self.__expect('}')
+        return block
+
+    def __if(self) -> IfNode:
+        start = self.__starts[self.__pos]
+        self.__pos += 1
+        self.__expect('(')
+        test = self.__expr()
+        self.__expect(')')
+        consequent = self.__stmt()
+        if self.__keyword('else'):
+            pos = self.__pos
+            self.__pos += 1
+            alternate = self.__attempt(self.__stmt)
+            if alternate is not None:
+                return self.__node(IfNode, start, test, consequent, alternate)
+            self.__pos = pos
+        return self.__node(IfNode, start, test, consequent)
+
+    def __for(self) -> ForNode:
+        start = self.__starts[self.__pos]
+        self.__pos += 1
+        self.__expect('(')
+        init = self.__for_statement()
+        self.__expect(';')
+        # Пустое условие - пустая группа, как в Parser.
+        test = self.__attempt(self.__expr)
+        if test is None:
+            test = pp.ParseResults([])
+        self.__expect(';')
+        update = self.__for_statement()
+        self.__expect(')')
+        if self.__tags[self.__pos] == ';':
+            # Пустое тело цикла - тоже пустая группа.
+            self.__pos += 1
+            block = pp.ParseResults([])
+        else:
+            block = self.__stmt()
+        return self.__node(ForNode, start, init, test, update, block)
+
+    def __for_statement(self) -> TreeNode:
+        if self.__keyword('var'):
+            node = self.__attempt(self.__var)
+            if node is not None:
+                return node
+        start = self.__starts[self.__pos]
+        nodes = self.__separated(self.__simple_stmt, optional=True)
+        return self.__node(BlockStatementNode, start, *nodes)
+
+    def __while(self) -> WhileNode:
+        start = self.__starts[self.__pos]
+        self.__pos += 1
+        self.__expect('(')
+        test = self.__expr()
+        self.__expect(')')
+        block = self.__stmt()
+        return self.__node(WhileNode, start, test, block)
+
+    def __do_while(self) -> DoWhileNode:
+        start = self.__starts[self.__pos]
+        self.__pos += 1
+        block = self.__stmt()
+        if not self.__keyword('while'):
+            self.__fail()
+        self.__pos += 1
+        self.__expect('(')
+        test = self.__expr()
+        self.__expect(')')
+        return self.__node(DoWhileNode, start, block, test)
+
+    def __var(self) -> VarDeclarationNode:
+        start = self.__starts[self.__pos]
+        self.__pos += 1
+        declarations = [self.__declarator(start)]
+        while self.__tags[self.__pos] == ',':
+            # Объявление после запятой получает позицию запятой.
+            pos = self.__pos
+            self.__pos += 1
+            declarator = self.__attempt(lambda: self.__declarator(self.__starts[pos]))
+            if declarator is None:
+                self.__pos = pos
+                break
+            declarations.append(declarator)
+        return self.__node(VarDeclarationNode, start, *declarations)
+
+    def __declarator(self, start: int) -> DeclaratorNode:
+        ident = self.__ident()
+        if self.__tags[self.__pos] == '=':
+            pos = self.__pos
+            self.__pos += 1
+            init = self.__attempt(self.__expr)
+            if init is not None:
+                return self.__node(DeclaratorNode, start, ident, init)
+            self.__pos = pos
+        return self.__node(DeclaratorNode, start, ident)
+
+    def __func_decl(self) -> FuncDeclarationNode:
+        start = self.__starts[self.__pos]
+        self.__pos += 1
+        ident = self.__ident()
+        self.__expect('(')
+        # Список параметров тоже получает позицию сразу за скобкой, без пропуска пробелов.
+        args_start = self.__starts[self.__pos - 1] + 1
+        params = self.__separated(self.__expr, optional=True)
+        if not params:
+            params = [pp.ParseResults([])]
+        args = self.__node(ArgsNode, args_start, *params)
+        self.__expect(')')
+        block = self.__br_block()
+        return self.__node(FuncDeclarationNode, start, ident, args, block)
+
+    def __return(self) -> ReturnNode:
+        start = self.__starts[self.__pos]
+        self.__pos += 1
+        argument = self.__expr()
+        return self.__node(ReturnNode, start, argument)
+
+    # Правила инструкций, начинающихся с ключевого слова: до и после альтернативы "простая инструкция".
+    __before_simple = {'if': __if, 'for': __for, 'while': __while, 'do': __do_while, 'var': __var_semicolon}
+    __after_simple = {'function': __func_decl, 'return': __return}
+
+    def __separated(self, rule: Callable[[], TreeNode], optional: bool = False) -> list:
+        """Список элементов через запятую. Если первый элемент не подошёл и optional, возвращает пустой список."""
+        first = self.__attempt(rule) if optional else rule()
+        if first is None:
+            return []
+        nodes = [first]
+        while self.__tags[self.__pos] == ',':
+            pos = self.__pos
+            self.__pos += 1
+            node = self.__attempt(rule)
+            if node is None:
+                self.__pos = pos
+                break
+            nodes.append(node)
+        return nodes
+
+    def __expr(self) -> TreeNode:
+        return self.__binary(0, 0)
+
+    def __binary(self, min_level: int, loc: int, first: TreeNode = None) -> TreeNode:
+        """
+        Разбор бинарного выражения методом подъёма по приоритетам: в выражение входят операторы уровня min_level
+        и выше. loc - позиция выражения уровня сравнений, она используется для узлов уровней сложения и умножения.
+        first - уже разобранный первый операнд.
+        """
+        start = self.__starts[self.__pos]
+        if min_level <= _COMPARE:
+            loc = start
+        node = first if first is not None else self.__group()
+        tags = self.__tags
+        while True:
+            pos = self.__pos
+            tag = tags[pos]
+            level = _OPERATOR_LEVEL.get(tag)
+            if level is None or level < min_level:
+                break
+            if tag in ('++', '--'):
+                # pp.Literal('+') распознаёт первый символ '++', поэтому a ++1.5 - это сумма a и +1.5.
+                match = _REAL.match(self.__text, self.__starts[pos] + 1)
+                if match is None:
+                    break
+                self.__pos = self.__skip_to(match.end())
+                right = self.__binary(level + 1, loc, self.__node(LiteralNode, match.start(), float(match.group())))
+                tag = tag[0]
+            else:
+                self.__pos += 1
+                try:
+                    # Литерал после оператора умножения получает позицию сразу за оператором, без пропуска
+                    # пробелов: в грамматике Parser между ними только альтернативы, которые не пропускают пробелы.
+                    right = self.__group(self.__starts[pos] + len(tag)) if level == _MUL \
+                        else self.__binary(level + 1, loc)
+                except _Fail:
+                    self.__pos = pos
+                    break
+            # Узел получает позицию начала выражения своего уровня, как в действиях разбора Parser.
+            node = self.__node(BinExprNode, start if level <= _COMPARE else loc, _OPERATORS[tag], node, right)
+        return node
+
+    def __group(self, literal_loc: int = None) -> TreeNode:
+        """Литерал, вызов функции, идентификатор или выражение в скобках. literal_loc - позиция литерала,
+        если она не совпадает с началом лексемы."""
+        pos = self.__pos
+        tag = self.__tags[pos]
+        start = self.__starts[pos]
+        value = self.__values[pos]
+        if literal_loc is None:
+            literal_loc = start
+        if tag == NUM:
+            self.__pos += 1
+            return self.__node(LiteralNode, literal_loc, int(value))
+        if tag == STR:
+            self.__pos += 1
+            return self.__node(LiteralNode, literal_loc, _ESCAPED.sub(r'\1', value[1:-1]))
+        if tag == IDENT:
+            if self.__tags[pos + 1] == '(':
+                node = self.__attempt(self.__call)
+                if node is not None:
+                    return node
+            return self.__ident()
+        if tag == '(':
+            self.__pos += 1
+            node = self.__expr()
+            self.__expect(')')
+            return node
+        if value[:1] in ('+', '-', '.'):
+            match = _REAL.match(self.__text, start)
+            if match is not None:
+                self.__pos = self.__skip_to(match.end())
+                return self.__node(LiteralNode, literal_loc, float(match.group()))
+        self.__fail()
+
+    def __skip_to(self, end: int) -> int:
+        """Возвращает номер первой лексемы, которая начинается не раньше позиции end."""
+        pos = self.__pos
+        while self.__starts[pos] < end:
+            pos += 1
+        return pos
+
+    def __call(self) -> CallNode:
+        start = self.__starts[self.__pos]
+        ident = self.__ident()
+        self.__expect('(')
+        args = self.__separated(self.__expr, optional=True) if self.__tags[self.__pos] != ')' else []
+        self.__expect(')')
+        return self.__node(CallNode, start, ident, *args)
+
+    def __ident(self) -> IdentNode:
+        pos = self.__pos
+        if self.__tags[pos] != IDENT:
+            self.__fail()
+        self.__pos += 1
+        return self.__node(IdentNode, self.__starts[pos], self.__values[pos])
@@ -0,0 +1,90 @@
+import codecs
+import mmap
+import re
+from typing import Iterable, Iterator
+
+# Строковый литерал или комментарий в стиле C/C++. Строки распознаются, чтобы не принять их содержимое
+# за комментарий.
+COMMENT_OR_STRING = re.compile(r'"(?:[^"\n\r\\]|\\.)*"|/\*(?:[^*]|\*(?!/))*\*/|//(?:\\\n|[^\n])*')
+
+# При поиске границ инструкций, кроме строк и комментариев, нужны скобки и точки с запятой, а также начала строк
+# и комментариев, которые не удалось распознать целиком: они могут закончиться в ещё не прочитанном фрагменте.
+_SCAN = re.compile(r'(?P<skip>' + COMMENT_OR_STRING.pattern + r')|(?P<open>[({])|(?P<close>[)}])|(?P<end>;)'
+                   r'|(?P<start>"|/\*)')
+
+_LINE_END = re.compile(r'[\r\n]')
+
+BLOCK_SIZE = 1 << 16
+
+
+def read_file(path: str, block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """Читает текстовый файл фрагментами по block_size символов. Переводы строк не преобразуются."""
+    with open(path, encoding='utf-8', newline='') as file:
+        while True:
+            block = file.read(block_size)
+            if not block:
+                return
+            yield block
+
+
+def read_mmap(path: str, block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """
+    Читает файл, отображённый в память, фрагментами по block_size байт. Фрагменты декодируются по мере чтения,
+    поэтому в памяти процесса оказывается только текущий фрагмент.
+    """
+    with open(path, 'rb') as file:
+        if file.seek(0, 2) == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            decoder = codecs.getincrementaldecoder('utf-8')()
+            for offset in range(0, len(data), block_size):
+                text = decoder.decode(data[offset:offset + block_size])
+                if text:
+                    yield text
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+
+
+def statement_chunks(blocks: Iterable[str], size: int = BLOCK_SIZE) -> Iterator[str]:
+    """
+    Собирает фрагменты кода blocks в части не меньше size символов, которые заканчиваются точкой с запятой
+    или закрывающей фигурной скобкой вне скобок, строк и комментариев, то есть на границе инструкций
+    верхнего уровня. Последняя часть - остаток кода. Разбиение не учитывает else и while после инструкции:
+    инструкция может продолжиться в следующей части (см. Parser.parse_stream).
+    """
+    buffer, scanned, depth, cut = '', 0, 0, 0
+    blocks = iter(blocks)
+    more = True
+    while more:
+        block = next(blocks, None)
+        if block is None:
+            more = False
+        else:
+            buffer += block
+        for match in _SCAN.finditer(buffer, scanned):
+            kind = match.lastgroup
+            if kind == 'start' and match.group() == '"' and _LINE_END.search(buffer, match.end()):
+                # Строка не может занимать несколько строк кода, значит, это одиночная кавычка.
+                kind = None
+            if more and (kind == 'start' or kind == 'skip' and match.end() == len(buffer)):
+                # Строка или комментарий могут продолжаться в следующем фрагменте.
+                break
+            scanned = match.end()
+            if kind == 'open':
+                depth += 1
+            elif kind == 'close':
+                depth = max(depth - 1, 0)
+                if depth == 0 and match.group() == '}':
+                    cut = scanned
+            elif kind == 'end' and depth == 0:
+                cut = scanned
+        else:
+            # Косая черта в конце может оказаться началом комментария.
+            scanned = len(buffer) - 1 if more and buffer.endswith('/') else len(buffer)
+        if cut >= size or not more and buffer:
+            end = cut if more else len(buffer)
+            yield buffer[:end]
+            buffer = buffer[end:]
+            scanned -= end
+            cut = 0
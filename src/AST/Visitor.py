@@ -0,0 +1,39 @@
+from typing import Callable, Dict
+
+
+class NodeVisitor:
+    """
+    Базовый класс для обхода абстрактного синтаксического дерева.
+    Для узла вызывается метод visit_<имя класса узла>, а если такого нет - метод для ближайшего
+    родительского класса узла или generic_visit. Выбранный метод запоминается в таблице класса обходчика
+    по типу узла, поэтому поиск выполняется один раз для каждого типа.
+    """
+    _dispatch: Dict[type, Callable] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # У каждого класса обходчика своя таблица, так как набор методов visit_ у них разный.
+        cls._dispatch = {}
+
+    def visit(self, node):
+        try:
+            method = self._dispatch[node.__class__]
+        except KeyError:
+            method = self._resolve(node.__class__)
+        return method(self, node)
+
+    @classmethod
+    def _resolve(cls, node_type: type) -> Callable:
+        """Находит метод обхода для типа узла и сохраняет его в таблице."""
+        for klass in node_type.__mro__:
+            method = getattr(cls, 'visit_' + klass.__name__, None)
+            if method is not None:
+                break
+        else:
+            method = cls.generic_visit
+        cls._dispatch[node_type] = method
+        return method
+
+    def generic_visit(self, node):
+        """Вызывается для узлов, у которых нет своего метода обхода (в том числе для None)."""
+        return None
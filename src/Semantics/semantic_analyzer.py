@@ -1,24 +1,28 @@
-import inspect
+from typing import Dict
 
 from pyparsing import ParseResults
 
-import custom_builtins
+from custom_builtins import BUILTINS
 from semantic_components import *
 from Nodes import *
+from Visitor import NodeVisitor
 
-builtin_funcs = [f for f in dir(custom_builtins) if inspect.isfunction(getattr(custom_builtins, f))]
 
-
-class Analyzer:
-    """Класс, производящий семантический анализ."""
+class Analyzer(NodeVisitor):
+    """
+    Класс, производящий семантический анализ.
+    symbols - результат разрешения имён для следующих этапов компиляции: узел идентификатора или вызова
+    функции -> элемент области видимости (Label), на который он ссылается. Тип элемента - label_type,
+    область видимости, в которой он объявлен, - scope.
+    """
 
     def __init__(self):
         self.root_scope = Scope(None)
         self.__current_scope = self.root_scope
-        for func in builtin_funcs:
-            self.__current_scope.add_label(Label(LabelType.FUNC, str(func),
-                                                 len(inspect.signature(getattr(custom_builtins, func)).parameters)), [])
+        for name, (_, argc) in BUILTINS.items():
+            self.__current_scope.add_label(Label(LabelType.FUNC, name, argc), [])
         self.errors = []
+        self.symbols: Dict[TreeNode, Label] = {}
 
     def analyze(self, root_node: TreeNode):
         """Метод, производящий семантический анализ абстрактного синтаксичесткого дерева."""
@@ -28,38 +32,50 @@ class Analyzer:
     def analyze_node(self, node):
         """Метод, производящий семантический анализ узла дерева."""
         try:
-            # Проверяем различные типы узлов АСД и проверяем необходимые условия.
-            if node.__class__.__name__ in ["VarDeclarationNode"]:
-                for decl in node.children:
-                    if decl.init.__class__.__name__ in ["LiteralNode"]:
-                        self.__current_scope.add_label(Label(LabelType.VAR, decl.ident.name, decl.init.value),
-                                                       [decl.row, decl.col])
-                    else:
-                        self.__current_scope.add_label(Label(LabelType.VAR, decl.ident.name, None),
-                                                       [decl.row, decl.col])
-                        self.analyze_node(decl.init)
-            elif node.__class__.__name__ in ["IdentNode"]:
-                self.__current_scope.get_label(node.name, [node.row, node.col])
-            elif node.__class__.__name__ in ["FuncDeclarationNode"]:
-                self.__current_scope.add_label(Label(LabelType.FUNC, node.ident.name,
-                                                     0 if isinstance(node.params.params[0], ParseResults) else len(
-                                                         node.params.params)), [node.row, node.col])
-                newScope = Scope(self.__current_scope)
-                self.__current_scope.children_scopes.append(newScope)
-                self.__current_scope = newScope
-                for param in node.params.params:
-                    if param.__class__.__name__ in ["IdentNode"]:
-                        self.__current_scope.add_label(Label(LabelType.VAR, param.name, None), [param.row, param.col])
-                self.analyze(node.block)
-                self.__current_scope = newScope.prev_scope
-            elif node.__class__.__name__ in ["CallNode"]:
-                lbl = self.__current_scope.get_label(node.ident.name, [node.row, node.col])
-                req_args = len(node.args)
-                if lbl.val != req_args:
-                    raise SemanticException("Неверное количество аргументов функции. "
-                                            "Передано {}, необходимо {}".format(req_args, lbl.val),
-                                            node.row, node.col)
-            elif node.__class__.__name__ not in ["NoneType"]:
-                self.analyze(node)
+            # Проверка выполняется методом visit_ для типа узла.
+            self.visit(node)
         except SemanticException as e:
             self.errors.append(e)
+
+    def visit_VarDeclarationNode(self, node: VarDeclarationNode):
+        for decl in node.children:
+            if decl.init.__class__.__name__ in ["LiteralNode"]:
+                self.__declare(decl.ident, Label(LabelType.VAR, decl.ident.name, decl.init.value),
+                               [decl.row, decl.col])
+            else:
+                self.__declare(decl.ident, Label(LabelType.VAR, decl.ident.name, None), [decl.row, decl.col])
+                self.analyze_node(decl.init)
+
+    def visit_IdentNode(self, node: IdentNode):
+        self.symbols[node] = self.__current_scope.get_label(node.name, [node.row, node.col])
+
+    def visit_FuncDeclarationNode(self, node: FuncDeclarationNode):
+        self.__declare(node.ident, Label(LabelType.FUNC, node.ident.name,
+                                         0 if isinstance(node.params.params[0], ParseResults) else len(
+                                             node.params.params)), [node.row, node.col])
+        newScope = Scope(self.__current_scope)
+        self.__current_scope.children_scopes.append(newScope)
+        self.__current_scope = newScope
+        for param in node.params.params:
+            if param.__class__.__name__ in ["IdentNode"]:
+                self.__declare(param, Label(LabelType.VAR, param.name, None), [param.row, param.col])
+        self.analyze(node.block)
+        self.__current_scope = newScope.prev_scope
+
+    def visit_CallNode(self, node: CallNode):
+        lbl = self.__current_scope.get_label(node.ident.name, [node.row, node.col])
+        self.symbols[node] = self.symbols[node.ident] = lbl
+        req_args = len(node.args)
+        if lbl.val != req_args:
+            raise SemanticException("Неверное количество аргументов функции. "
+                                    "Передано {}, необходимо {}".format(req_args, lbl.val),
+                                    node.row, node.col)
+
+    def __declare(self, ident: IdentNode, label: Label, loc):
+        """Добавляет элемент в текущую область видимости и запоминает его для идентификатора объявления."""
+        self.__current_scope.add_label(label, loc)
+        self.symbols[ident] = label
+
+    def visit_TreeNode(self, node: TreeNode):
+        # Остальные узлы проверяются через их дочерние узлы.
+        self.analyze(node)
@@ -1,4 +1,6 @@
+import sys
 from enum import Enum
+from typing import Dict
 
 
 class LabelType(Enum):
@@ -8,50 +10,57 @@ class LabelType(Enum):
 
 
 class Label:
-    """Класс, описывающий элемент области видимости."""
+    """
+    Класс, описывающий элемент области видимости. Имя интернируется, поэтому поиск по одинаковым именам
+    сравнивает строки по ссылке. scope - область видимости, в которой объявлен элемент (задаётся add_label).
+    """
+    __slots__ = ('label_type', 'name', 'val', 'scope')
+
     def __init__(self, label_type: LabelType, name, val):
         self.label_type = label_type
-        self.name = name
+        self.name = sys.intern(name)
         self.val = val
+        self.scope = None
 
 
 class Scope:
-    """Класс, описывающий область видимости."""
+    """
+    Класс, описывающий область видимости. Элементы хранятся в словаре по имени, поэтому добавление и поиск
+    в одной области выполняются за постоянное время. depth - уровень вложенности, у глобальной области 0.
+    """
     def __init__(self, prev_scope):
-        self._labels = []
+        self._labels: Dict[str, Label] = {}
         self.children_scopes = []
         self.prev_scope = prev_scope
+        self.depth = prev_scope.depth + 1 if prev_scope is not None else 0
 
     def add_label(self, label: Label, loc):
         """Этот метод добавляет функцию или переменную."""
-        label_names = [lbl.name for lbl in self._labels]
+        existing = self._labels.get(label.name)
         # Если эл-т не существует в области видимости, мы его добавляем в неё
-        if label.name not in label_names:
-            self._labels.append(label)
+        if existing is None:
+            label.scope = self
+            self._labels[label.name] = label
             return True
-        else:
-            # В противном случае мы проверяем, не существует ли функции с таким же именем.
-            index = label_names.index(label)
-            if label.label_type is LabelType.FUNC or self._labels[index].label_type is LabelType.FUNC:
-                # Если она существует, выводим ошибку.
-                raise SemanticException("Объект с именем {} уже существует.".format(label.name), loc[0], loc[1])
-            else:
-                # Если существует переменная с таким же именем, мы переопределяем её значение.
-                self._labels[index] = label
+        # В противном случае мы проверяем, не существует ли функции с таким же именем.
+        if label.label_type is LabelType.FUNC or existing.label_type is LabelType.FUNC:
+            # Если она существует, выводим ошибку.
+            raise SemanticException("Объект с именем {} уже существует.".format(label.name), loc[0], loc[1])
+        # Если существует переменная с таким же именем, мы переопределяем её значение.
+        label.scope = self
+        self._labels[label.name] = label
 
     def get_label(self, name, loc):
         """Метод, возвращающий переменную из текущей области видимости или из её родительской области видимости."""
-        result = [lbl for lbl in self._labels if lbl.name == name]
-        if len(result) > 0:
-            # Если переменная или функция с таким именем существует, возвращаем её.
-            return result[0]
-        else:
-            if self.prev_scope is not None:
-                # Если она не существует в текущей области видимости, ищем её в родительской области видимости.
-                return self.prev_scope.get_label(name, loc)
-            else:
-                # Если такой переменной или функции нет, то выводим ошибку.
-                raise SemanticException("Объекта с именем {} не существует. ".format(name), loc[0], loc[1])
+        scope = self
+        # Области видимости просматриваются от текущей к глобальной без рекурсии.
+        while scope is not None:
+            label = scope._labels.get(name)
+            if label is not None:
+                return label
+            scope = scope.prev_scope
+        # Если такой переменной или функции нет, то выводим ошибку.
+        raise SemanticException("Объекта с именем {} не существует. ".format(name), loc[0], loc[1])
 
 
 class SemanticException(Exception):
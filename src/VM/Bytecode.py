@@ -0,0 +1,111 @@
+import marshal
+import sys
+from array import array
+from typing import List, Optional, Dict
+from Instructions import *
+
+# Версия формата сериализации. Увеличивается при любом изменении раскладки данных в to_bytes().
+FORMAT_VERSION = 1
+
+
+class Bytecode:
+    """
+    Компактное представление программы.
+    code - целочисленные коды команд (см. OPCODES в Instructions.py),
+    args - операнды команд: индекс в таблице констант, индекс в таблице имён, адрес команды
+           или номер ячейки переменной,
+    consts - таблица констант команды PUSH без повторов,
+    names - таблица имён переменных и встроенных функций,
+    funcs - таблица функций: имя функции -> адрес её первой команды.
+    """
+    def __init__(self, code: array, args: array, consts: list, names: List[str], funcs: Dict[str, int] = None):
+        self.code = code
+        self.args = args
+        self.consts = consts
+        self.names = names
+        self.funcs = funcs if funcs is not None else {}
+        # Индексы таблиц констант и имён для extend, создаются при первом вызове.
+        self.__const_ids = None
+        self.__name_ids = None
+
+    @classmethod
+    def from_lines(cls, lines, funcs: Dict[str, int] = None) -> 'Bytecode':
+        """Кодирует список экземпляров CodeLine."""
+        bytecode = cls(array('B'), array('i'), [], [], funcs)
+        bytecode.extend(lines)
+        return bytecode
+
+    def extend(self, lines):
+        """Кодирует и добавляет в конец программы экземпляры CodeLine, что позволяет собирать программу по частям."""
+        if self.__const_ids is None:
+            self.__const_ids = {(type(value), value): i for i, value in enumerate(self.consts)}
+            self.__name_ids = {name: i for i, name in enumerate(self.names)}
+        code, args = self.code, self.args
+        consts, names = self.consts, self.names
+        const_ids, name_ids = self.__const_ids, self.__name_ids
+        for line in lines:
+            code.append(OPCODE_IDS[line.cmd])
+            if line.cmd in CONST_ARG:
+                # Ключ включает тип, чтобы 1, 1.0 и True не считались одной константой.
+                key = (type(line.value), line.value)
+                if key not in const_ids:
+                    const_ids[key] = len(consts)
+                    consts.append(line.value)
+                args.append(const_ids[key])
+            elif line.cmd in NAME_ARG:
+                if line.value not in name_ids:
+                    name_ids[line.value] = len(names)
+                    names.append(line.value)
+                args.append(name_ids[line.value])
+            elif line.cmd in ADDRESS_ARG or line.cmd in SLOT_ARG:
+                args.append(line.value)
+            else:
+                args.append(0)
+
+    def to_bytes(self) -> bytes:
+        """Сериализует программу. Операнды всегда записываются в порядке байтов little-endian."""
+        args = self.args
+        if sys.byteorder == 'big':
+            args = array('i', args)
+            args.byteswap()
+        return marshal.dumps((FORMAT_VERSION, self.code.tobytes(), args.tobytes(), self.consts, self.names,
+                              self.funcs))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Bytecode':
+        """Восстанавливает программу, сериализованную методом to_bytes()."""
+        try:
+            version, code, args, consts, names, funcs = marshal.loads(data)
+        except (EOFError, ValueError, TypeError):
+            raise ValueError("Повреждённые данные байткода")
+        if version != FORMAT_VERSION:
+            raise ValueError("Неподдерживаемая версия формата байткода: {}".format(version))
+        code_arr, args_arr = array('B'), array('i')
+        code_arr.frombytes(code)
+        args_arr.frombytes(args)
+        if sys.byteorder == 'big':
+            args_arr.byteswap()
+        return cls(code_arr, args_arr, consts, names, funcs)
+
+    def operand(self, index: int) -> Optional:
+        """Возвращает операнд команды с номером index в том виде, в котором он был в CodeLine."""
+        cmd = OPCODES[self.code[index]]
+        if cmd in CONST_ARG:
+            return self.consts[self.args[index]]
+        elif cmd in NAME_ARG:
+            return self.names[self.args[index]]
+        elif cmd in ADDRESS_ARG or cmd in SLOT_ARG:
+            return self.args[index]
+        return None
+
+    def to_lines(self) -> list:
+        """Декодирует программу обратно в список экземпляров CodeLine."""
+        return [self[i] for i in range(len(self))]
+
+    def __len__(self):
+        return len(self.code)
+
+    def __getitem__(self, index):
+        # Импорт внутри метода, так как code_generator сам импортирует этот модуль.
+        from code_generator import CodeLine
+        return CodeLine(OPCODES[self.code[index]], self.operand(index))
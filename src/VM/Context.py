@@ -1,6 +1,10 @@
 class Context:
-    def __init__(self, line):
+    def __init__(self, line, size=0, function=0):
         self._variables = {}
+        # Адрес первой команды функции, которая выполняется в контексте (0 - основная программа).
+        self.function = function
+        # Ячейки переменных, номера которых назначены при компиляции (команды LOAD_FAST и STORE_FAST).
+        self.slots = [None] * size
         self._return_line = line
 
     def get_variable(self, name):
@@ -12,5 +16,13 @@ class Context:
     def set_variable(self, name, value):
         self._variables[name] = value
 
+    def snapshot(self):
+        """Копии переменных и ячеек переменных контекста."""
+        return dict(self._variables), list(self.slots)
+
+    def named_variables(self):
+        """Копия переменных, доступных по имени (команды LOAD и STORE), или None, если их нет."""
+        return dict(self._variables) if self._variables else None
+
     def get_return_address(self):
         return self._return_line
@@ -0,0 +1,319 @@
+import asyncio
+from functools import partial
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from Instructions import *
+from Context import Context
+from custom_builtins import BUILTINS
+import Operations as operations
+
+# Наибольшая вложенность вызовов скомпилированных функций. Каждый такой вызов занимает кадры стека Python,
+# поэтому более глубокие вызовы выполняет интерпретатор, и глубокая рекурсия не приводит к RecursionError.
+NATIVE_DEPTH = 200
+
+# Значения, которые записываются в исходный код литералами; остальные константы передаются в функцию.
+_LITERALS = (bool, int, str, type(None))
+
+_CONST_OPERATION = {cmd: op for op, cmd in WITH_CONST.items()}
+_JZ_COMPARE = {cmd: op for op, cmd in COMPARE_JZ.items()}
+# Команды, которые можно перевести в код Python. HALT и неизвестные команды выполняет только интерпретатор.
+_SUPPORTED = {POP, DUP, PUSH, JMP, JNZ, JZ, LOAD, STORE, CALL, CBLTN, LOAD_FAST, STORE_FAST, INC_FAST, DEC_FAST,
+              RET, *operations.BINARY, *operations.UNARY, *_CONST_OPERATION, *_JZ_COMPARE}
+
+
+class FunctionCompiler:
+    """
+    Второй уровень выполнения: VirtualMachine(code, compiler=FunctionCompiler(...)). Функция программы (адрес
+    команды CALL), вызванная threshold раз, переводится в исходный код на Python, который компилируется функцией
+    compile(). После этого команды CALL этой функции вызывают скомпилированный код вместо интерпретации её команд.
+    Скомпилированная функция выполняет те же операции (Operations), что и интерпретатор, со стеком и контекстами
+    машины, поэтому результат не отличается, в том числе для 'NaN' и сравнения значений разных типов.
+    Компилируется только функция, которая не содержит HALT и вызовов асинхронных или неизвестных встроенных
+    функций и вызывает только такие же функции: она компилируется вместе со всеми функциями, которые вызывает.
+    Вызов скомпилированной функции выполняется как одна команда, поэтому step(n) может выполнить больше команд
+    программы, чем n. Один объект FunctionCompiler можно передавать нескольким машинам: скомпилированный код
+    связан с машиной и хранится в ней.
+    """
+    def __init__(self, threshold: int = 50):
+        self.threshold = threshold
+
+    def instrument(self, vm, code, program: List[Callable[[], None]]) -> List[Callable[[], None]]:
+        """Возвращает обработчики программы code, связанные машиной vm, со счётчиками вызовов функций."""
+        return _Tier(self.threshold, vm, code, program).program
+
+
+class _Tier:
+    """Скомпилированные функции одной машины."""
+    def __init__(self, threshold: int, vm, code, program: List[Callable[[], None]]):
+        self.threshold = threshold
+        self.vm = vm
+        self.code = code
+        self.interpreted = program
+        # Адрес функции -> номера команд CALL, которые её вызывают.
+        self.callers: Dict[int, List[int]] = {}
+        for index in range(len(code)):
+            line = code[index]
+            if line.cmd == CALL:
+                self.callers.setdefault(line.value, []).append(index)
+        self.counts = dict.fromkeys(self.callers, 0)
+        # Адрес функции -> адреса её команд и адреса вызываемых ею функций или None, если её нельзя компилировать.
+        self.bodies: Dict[int, Optional[Tuple[List[int], Set[int]]]] = {}
+        self.compiled: Dict[int, Callable[[], None]] = {}
+        self.depth = 0
+        # Обработчики заменяются в этом списке во время выполнения, машина выполняет именно его.
+        self.program = list(program)
+        for address, indexes in self.callers.items():
+            for index in indexes:
+                self.program[index] = partial(self.counted, address, program[index])
+
+    def counted(self, address: int, handler: Callable[[], None]):
+        self.counts[address] += 1
+        if self.counts[address] >= self.threshold:
+            self.promote(address)
+        handler()
+
+    def promote(self, address: int):
+        """Компилирует функцию address вместе с вызываемыми ею функциями и связывает с ними их команды CALL."""
+        group = self.group(address)
+        if group is None:
+            # Функция остаётся интерпретируемой, подсчёт вызовов больше не нужен.
+            for index in self.callers[address]:
+                self.program[index] = self.interpreted[index]
+            return
+        for function in group:
+            if function not in self.compiled:
+                self.compiled[function] = self.build(function)
+            for index in self.callers.get(function, ()):
+                self.program[index] = partial(self.enter, function, self.interpreted[index])
+
+    def group(self, address: int) -> Optional[Set[int]]:
+        """Функция address и все функции, которые она вызывает, или None, если какую-то из них нельзя компилировать."""
+        group, work = set(), [address]
+        while work:
+            function = work.pop()
+            if function in group:
+                continue
+            if function not in self.bodies:
+                self.bodies[function] = self.body(function)
+            if self.bodies[function] is None:
+                return None
+            group.add(function)
+            work.extend(self.bodies[function][1])
+        return group
+
+    def body(self, entry: int) -> Optional[Tuple[List[int], Set[int]]]:
+        """Адреса команд, достижимых из начала функции entry до команд RET, и адреса вызываемых функций."""
+        reached, callees, work = set(), set(), [entry]
+        while work:
+            index = work.pop()
+            if index in reached:
+                continue
+            if index < 0 or index >= len(self.code):
+                return None
+            reached.add(index)
+            line = self.code[index]
+            if line.cmd not in _SUPPORTED:
+                return None
+            if line.cmd == CBLTN:
+                if line.value not in BUILTINS or asyncio.iscoroutinefunction(BUILTINS[line.value][0]):
+                    return None
+            elif line.cmd == CALL:
+                callees.add(line.value)
+            if line.cmd in JUMPS:
+                work.append(line.value)
+            if line.cmd not in (JMP, RET):
+                work.append(index + 1)
+        return sorted(reached), callees
+
+    def build(self, entry: int) -> Callable[[], None]:
+        generator = _Generator(self.code, entry, self.bodies[entry][0])
+        namespace = {}
+        exec(compile(generator.source, '<function {}>'.format(entry), 'exec'), namespace)
+        vm = self.vm
+        return namespace['factory'](vm, vm._stack, vm._contexts, Context, vm._frame_sizes[entry], self.invoke,
+                                    generator.values)
+
+    def enter(self, address: int, handler: Callable[[], None]):
+        """Вызов скомпилированной функции из интерпретатора; handler - обработчик команды CALL интерпретатора."""
+        if self.depth >= NATIVE_DEPTH:
+            handler()
+        else:
+            self.native(address)
+
+    def invoke(self, address: int):
+        """Вызов функции из скомпилированного кода."""
+        if self.depth >= NATIVE_DEPTH:
+            self.nested(address)
+        else:
+            self.native(address)
+
+    def native(self, address: int):
+        self.depth += 1
+        try:
+            self.compiled[address]()
+        except IndexError:
+            # Скомпилированный код снимает значения со стека без проверок.
+            raise RuntimeError("Стек пустой")
+        finally:
+            self.depth -= 1
+
+    def nested(self, address: int):
+        """Выполняет функцию интерпретатором до возврата из неё и восстанавливает адрес текущей команды машины."""
+        vm = self.vm
+        line = vm._cur_line_id
+        depth = len(vm._contexts)
+        vm.call(address)
+        while len(vm._contexts) > depth:
+            handler = self.program[vm._cur_line_id]
+            vm._cur_line_id += 1
+            handler()
+        vm._cur_line_id = line
+
+
+class _Generator:
+    """
+    Переводит функцию в исходный код на Python. Команды группируются в линейные участки, значения стека внутри
+    участка хранятся в локальных переменных и переносятся в стек машины только в конце участка, перед вызовами
+    функций и при возврате. Номер следующего участка хранится в переменной label: переход вперёд пропускает
+    участки до нужного, переход назад начинает новую итерацию цикла.
+    """
+    def __init__(self, code, entry: int, addresses: List[int]):
+        self.code = code
+        # Значения, которые передаются в скомпилированную функцию, и их имена в исходном коде.
+        self.values = []
+        self.names = {}
+        self.lines = []
+        # Значения стека, ещё не перенесённые в стек машины: литералы и имена локальных переменных.
+        self.stack = []
+        self.temps = 0
+        body = set(addresses)
+        leaders = {entry}
+        for index in addresses:
+            line = code[index]
+            if line.cmd in JUMPS:
+                leaders.add(line.value)
+            if line.cmd in JUMPS or line.cmd == RET:
+                leaders.add(index + 1)
+        self.emit(2, 'context = Context(0, frame_size, {})'.format(entry))
+        self.emit(2, 'contexts.append(context)')
+        self.emit(2, 'slots = context.slots')
+        self.emit(2, 'label = {}'.format(entry))
+        self.emit(2, 'while True:')
+        start = None
+        for index in addresses:
+            if index in leaders:
+                start = index
+                self.emit(3, 'if label == {}:'.format(index))
+            self.instruction(index, code[index], start)
+            following = index + 1
+            if following in leaders and following in body and code[index].cmd not in JUMPS | {RET}:
+                self.flush()
+                self.emit(4, 'label = {}'.format(following))
+        prologue = ['def factory(vm, stack, contexts, Context, frame_size, invoke, values):']
+        prologue += ['    {} = values[{}]'.format(name, i) for i, name in enumerate(self.names.values())]
+        prologue += ['    def function():']
+        self.source = '\n'.join(prologue + self.lines + ['    return function', ''])
+
+    def emit(self, indent: int, line: str):
+        self.lines.append('    ' * indent + line)
+
+    def value(self, obj) -> str:
+        """Имя значения obj, переданного в скомпилированную функцию."""
+        if id(obj) not in self.names:
+            self.names[id(obj)] = 'v{}'.format(len(self.values))
+            self.values.append(obj)
+        return self.names[id(obj)]
+
+    def const(self, value) -> str:
+        return repr(value) if type(value) in _LITERALS else self.value(value)
+
+    def temp(self, expression: str) -> str:
+        """Вычисляет выражение сразу, чтобы порядок операций не отличался от интерпретатора."""
+        name = 't{}'.format(self.temps)
+        self.temps += 1
+        self.emit(4, '{} = {}'.format(name, expression))
+        return name
+
+    def pop(self) -> str:
+        return self.stack.pop() if self.stack else self.temp('stack.pop()')
+
+    def flush(self):
+        for item in self.stack:
+            self.emit(4, 'stack.append({})'.format(item))
+        self.stack = []
+
+    def jump(self, indent: int, address: int, start: int):
+        self.emit(indent, 'label = {}'.format(address))
+        if address <= start:
+            self.emit(indent, 'continue')
+
+    def branch(self, condition: str, address: int, index: int, start: int):
+        self.flush()
+        self.emit(4, 'if {}:'.format(condition))
+        self.jump(5, address, start)
+        self.emit(4, 'else:')
+        self.emit(5, 'label = {}'.format(index + 1))
+
+    def instruction(self, index: int, line, start: int):
+        cmd, value = line.cmd, line.value
+        if cmd == PUSH:
+            self.stack.append(self.const(value))
+        elif cmd == POP:
+            if self.stack:
+                self.stack.pop()
+            else:
+                self.emit(4, 'stack.pop()')
+        elif cmd == DUP:
+            item = self.pop()
+            self.stack += [item, item]
+        elif cmd in operations.BINARY:
+            right = self.pop()
+            left = self.pop()
+            self.stack.append(self.temp('{}({}, {})'.format(self.value(operations.BINARY[cmd]), left, right)))
+        elif cmd in operations.UNARY:
+            self.stack.append(self.temp('{}({})'.format(self.value(operations.UNARY[cmd]), self.pop())))
+        elif cmd in _CONST_OPERATION:
+            operation = self.value(operations.BINARY[_CONST_OPERATION[cmd]])
+            self.stack.append(self.temp('{}({}, {})'.format(operation, self.pop(), self.const(value))))
+        elif cmd == LOAD_FAST:
+            self.stack.append(self.temp('slots[{}]'.format(value)))
+        elif cmd == STORE_FAST:
+            self.emit(4, 'slots[{}] = {}'.format(value, self.pop()))
+        elif cmd == INC_FAST:
+            self.emit(4, 'slots[{0}] = {1}(1, slots[{0}])'.format(value, self.value(operations.add)))
+        elif cmd == DEC_FAST:
+            self.emit(4, 'slots[{0}] = {1}(slots[{0}], 1)'.format(value, self.value(operations.sub)))
+        elif cmd == LOAD:
+            self.stack.append(self.temp('context.get_variable({!r})'.format(value)))
+        elif cmd == STORE:
+            self.emit(4, 'context.set_variable({!r}, {})'.format(value, self.pop()))
+        elif cmd == CALL:
+            # Вызванная функция снимает параметры со стека машины и оставляет в нём результат.
+            self.flush()
+            self.emit(4, 'invoke({})'.format(value))
+        elif cmd == CBLTN:
+            func, argc = BUILTINS[value]
+            # Первый параметр снимается с вершины стека.
+            args = [self.pop() for _ in range(argc)]
+            self.flush()
+            result = self.temp('{}({})'.format(self.value(func), ', '.join(args)))
+            self.emit(4, 'if {} is not None:'.format(result))
+            self.emit(5, 'stack.append({})'.format(result))
+        elif cmd == JMP:
+            self.flush()
+            self.jump(4, value, start)
+        elif cmd == JNZ:
+            condition = self.pop()
+            self.branch(condition, value, index, start)
+        elif cmd == JZ:
+            condition = self.pop()
+            self.branch('{}({})'.format(self.value(operations.not_), condition), value, index, start)
+        elif cmd in _JZ_COMPARE:
+            right = self.pop()
+            left = self.pop()
+            compare = self.value(operations.BINARY[_JZ_COMPARE[cmd]])
+            self.branch('not {}({}, {})'.format(compare, left, right), value, index, start)
+        elif cmd == RET:
+            self.flush()
+            self.emit(4, 'contexts.pop()')
+            self.emit(4, 'vm._slots = contexts[-1].slots')
+            self.emit(4, 'return')
@@ -24,3 +24,44 @@ CALL = 'CALL'
 CBLTN = 'CBLTN'
 RET = 'RET'
 PWR = 'PWR'
+LOAD_FAST = 'LOAD_FAST'
+STORE_FAST = 'STORE_FAST'
+JZ = 'JZ'
+
+# Суперинструкции - команды, заменяющие частые последовательности (см. superinstructions.py).
+INC_FAST = 'INC_FAST'
+DEC_FAST = 'DEC_FAST'
+ADD_CONST = 'ADD_CONST'
+SUB_CONST = 'SUB_CONST'
+MUL_CONST = 'MUL_CONST'
+DIV_CONST = 'DIV_CONST'
+MOD_CONST = 'MOD_CONST'
+PWR_CONST = 'PWR_CONST'
+JZ_EQ = 'JZ_EQ'
+JZ_NEQ = 'JZ_NEQ'
+JZ_GT = 'JZ_GT'
+JZ_LT = 'JZ_LT'
+JZ_GE = 'JZ_GE'
+JZ_LE = 'JZ_LE'
+
+# Операция с константой: PUSH c, <операция> -> <операция>_CONST c.
+WITH_CONST = {ADD: ADD_CONST, SUB: SUB_CONST, MUL: MUL_CONST, DIV: DIV_CONST, MOD: MOD_CONST, PWR: PWR_CONST}
+# Сравнение и переход, если оно ложно: <сравнение>, JZ a -> JZ_<сравнение> a.
+COMPARE_JZ = {EQ: JZ_EQ, NEQ: JZ_NEQ, GT: JZ_GT, LT: JZ_LT, GE: JZ_GE, LE: JZ_LE}
+
+# Целочисленные коды команд для компактного представления программы (см. Bytecode.py).
+# Номер команды - её индекс в списке, поэтому новые команды добавляются только в конец.
+OPCODES = [HALT, PUSH, POP, DUP, ADD, SUB, MUL, DIV, MOD, NOT, AND, OR, EQ, GT, LT, GE, LE, NEQ,
+           JMP, JNZ, LOAD, STORE, CALL, CBLTN, RET, PWR, LOAD_FAST, STORE_FAST, JZ,
+           INC_FAST, DEC_FAST, ADD_CONST, SUB_CONST, MUL_CONST, DIV_CONST, MOD_CONST, PWR_CONST,
+           JZ_EQ, JZ_NEQ, JZ_GT, JZ_LT, JZ_GE, JZ_LE]
+OPCODE_IDS = {cmd: i for i, cmd in enumerate(OPCODES)}
+
+# Команды, операнд которых хранится в таблице констант, в таблице имён, является адресом команды
+# или номером ячейки переменной в контексте.
+CONST_ARG = {PUSH, *WITH_CONST.values()}
+NAME_ARG = {LOAD, STORE, CBLTN}
+ADDRESS_ARG = {JMP, JNZ, CALL, JZ, *COMPARE_JZ.values()}
+SLOT_ARG = {LOAD_FAST, STORE_FAST, INC_FAST, DEC_FAST}
+# Переходы внутри функции. Переход назад по адресу образует цикл.
+JUMPS = {JMP, JNZ, JZ, *COMPARE_JZ.values()}
@@ -0,0 +1,103 @@
+from time import perf_counter
+from typing import Callable, List, Optional
+from Instructions import *
+
+# Время выполнения проверяется не в каждой контрольной точке, а в одной из CLOCK_INTERVAL.
+CLOCK_INTERVAL = 256
+
+
+class LimitExceeded(RuntimeError):
+    """Превышено ограничение ресурсов виртуальной машины (см. Limits)."""
+
+
+class InstructionLimitExceeded(LimitExceeded):
+    pass
+
+
+class CallDepthExceeded(LimitExceeded):
+    pass
+
+
+class StackLimitExceeded(LimitExceeded):
+    pass
+
+
+class TimeLimitExceeded(LimitExceeded):
+    pass
+
+
+class Limits:
+    """
+    Ограничения ресурсов программы: VirtualMachine(code, limits=Limits(...)). None - без ограничения.
+    instructions - количество выполненных команд, call_depth - глубина вызовов функций, stack_size - размер стека
+    операндов, time - время выполнения в секундах, которое отсчитывается от первой контрольной точки.
+    Ограничения проверяются не в каждой команде, а только в контрольных точках: после переходов назад (циклы),
+    вызовов функций и возвратов из них. Бесконечное выполнение или рост стека невозможны без циклов и вызовов,
+    поэтому между контрольными точками выполняется не больше команд, чем есть в программе. Машина без ограничений
+    не выполняет проверок совсем.
+    Количество команд считается по адресам: между контрольными точками выполнение идёт только вперёд, и расстояние
+    между адресами - верхняя оценка количества выполненных команд (точная, если не было переходов вперёд).
+    Один объект Limits можно передавать нескольким машинам: счётчики хранятся в самой машине.
+    """
+    def __init__(self, instructions: Optional[int] = None, call_depth: Optional[int] = None,
+                 stack_size: Optional[int] = None, time: Optional[float] = None):
+        self.instructions = instructions
+        self.call_depth = call_depth
+        self.stack_size = stack_size
+        self.time = time
+
+    @property
+    def enabled(self) -> bool:
+        """Задано хотя бы одно ограничение."""
+        return any(limit is not None for limit in (self.instructions, self.call_depth, self.stack_size, self.time))
+
+    def instrument(self, vm, code, program: List[Callable[[], None]]) -> List[Callable[[], None]]:
+        """Возвращает обработчики программы code, связанные машиной vm, с проверками в контрольных точках."""
+        if not self.enabled:
+            return program
+        meter = _Meter(self, vm)
+        result = list(program)
+        for index in range(len(program)):
+            line = code[index]
+            if line.cmd in (CALL, RET) or line.cmd in JUMPS and line.value <= index:
+                result[index] = meter.checkpoint(index, program[index], line.cmd == CALL)
+        return result
+
+
+class _Meter:
+    """Счётчики одной машины."""
+    def __init__(self, limits: Limits, vm):
+        self.limits = limits
+        self.vm = vm
+        self.fuel = limits.instructions
+        # Адрес, с которого началось выполнение после предыдущей контрольной точки.
+        self.segment = 0
+        self.deadline = None
+        self.checks = 0
+
+    def checkpoint(self, index: int, handler: Callable[[], None], call: bool) -> Callable[[], None]:
+        limits, vm = self.limits, self.vm
+
+        def checked():
+            handler()
+            if self.fuel is not None:
+                self.fuel -= index + 1 - self.segment
+                if self.fuel < 0:
+                    raise InstructionLimitExceeded(
+                        "Превышено количество выполненных команд: {}".format(limits.instructions))
+            self.segment = vm._cur_line_id
+            if call and limits.call_depth is not None and len(vm._contexts) - 1 > limits.call_depth:
+                raise CallDepthExceeded("Превышена глубина вызовов функций: {}".format(limits.call_depth))
+            if limits.stack_size is not None and len(vm._stack) > limits.stack_size:
+                raise StackLimitExceeded("Превышен размер стека: {}".format(limits.stack_size))
+            if limits.time is not None:
+                self.check_time()
+        return checked
+
+    def check_time(self):
+        if self.deadline is None:
+            self.deadline = perf_counter() + self.limits.time
+            return
+        self.checks += 1
+        if self.checks % CLOCK_INTERVAL == 0 and perf_counter() > self.deadline:
+            raise TimeLimitExceeded("Превышено время выполнения: {} с".format(self.limits.time))
@@ -0,0 +1,110 @@
+"""
+Операции виртуальной машины над значениями. Функции не зависят от состояния машины,
+поэтому используются и при выполнении команд, и при вычислении констант во время компиляции.
+"""
+from Instructions import *
+
+
+def is_none_or_str(left, right) -> bool:
+    return isinstance(right, str) or isinstance(left, str) or left is None or right is None
+
+
+def is_type_mismatch(left, right) -> bool:
+    """Сравнение строки с не-строкой всегда ложно."""
+    return isinstance(right, str) != isinstance(left, str)
+
+
+def add(left, right):
+    if isinstance(right, str) or isinstance(left, str):
+        left = str(left)
+        right = str(right)
+    if left is None or right is None:
+        return 'NaN'
+    return left + right
+
+
+def sub(left, right):
+    return 'NaN' if is_none_or_str(left, right) else left - right
+
+
+def mul(left, right):
+    return 'NaN' if is_none_or_str(left, right) else left * right
+
+
+def div(left, right):
+    return 'NaN' if is_none_or_str(left, right) else left / right
+
+
+def mod(left, right):
+    return 'NaN' if is_none_or_str(left, right) else right % left
+
+
+def pwr(left, right):
+    return 'NaN' if isinstance(right, str) or isinstance(left, str) else left ** right
+
+
+def not_(value):
+    return False if isinstance(value, str) else int(not value)
+
+
+def and_(left, right):
+    if isinstance(left, bool) and isinstance(right, bool):
+        return left and right
+    elif isinstance(left, bool):
+        return left
+    return right
+
+
+def or_(left, right):
+    if isinstance(left, bool) and isinstance(right, bool):
+        return left or right
+    elif isinstance(left, bool):
+        return right
+    return left
+
+
+def eq(left, right):
+    return False if is_type_mismatch(left, right) else left == right
+
+
+def neq(left, right):
+    return not eq(left, right)
+
+
+def gt(left, right):
+    return False if is_type_mismatch(left, right) else left > right
+
+
+def lt(left, right):
+    return False if is_type_mismatch(left, right) else left < right
+
+
+def ge(left, right):
+    return False if is_type_mismatch(left, right) else left >= right
+
+
+def le(left, right):
+    return False if is_type_mismatch(left, right) else left <= right
+
+
+# Команды, которые снимают со стека два значения и кладут результат операции.
+BINARY = {
+    ADD: add,
+    SUB: sub,
+    MUL: mul,
+    DIV: div,
+    MOD: mod,
+    PWR: pwr,
+    AND: and_,
+    OR: or_,
+    EQ: eq,
+    NEQ: neq,
+    GT: gt,
+    LT: lt,
+    GE: ge,
+    LE: le
+}
+# Команды, которые снимают со стека одно значение и кладут результат операции.
+UNARY = {
+    NOT: not_
+}
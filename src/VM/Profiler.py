@@ -0,0 +1,145 @@
+import json
+from collections import defaultdict
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, TextIO
+from Instructions import *
+
+# Имя кадра основной программы в стеках вызовов.
+MAIN = 'main'
+
+
+class Profiler:
+    """
+    Профилировщик виртуальной машины: VirtualMachine(code, profiler=Profiler()). При загрузке программы обработчик
+    каждой команды оборачивается замером времени. Без профилировщика обработчики не оборачиваются, поэтому
+    основной цикл машины не выполняет лишней работы.
+    counts, times - количество выполнений и суммарное время команды по её адресу,
+    calls, inclusive - количество вызовов функции (адреса команды CALL) и время её выполнения вместе с вложенными
+    вызовами,
+    stacks - собственное время команд для каждого стека вызовов (main, функция, ...),
+    loops - количество выполненных обратных переходов (адрес начала цикла, адрес перехода) -> итераций.
+    funcs - таблица функций программы (имя -> адрес) для имён в отчёте. Для Bytecode берётся из самой программы.
+    """
+    def __init__(self, funcs: Optional[Dict[str, int]] = None):
+        self.funcs = dict(funcs) if funcs else {}
+        self.code: List[tuple] = []
+        self.counts: List[int] = []
+        self.times: List[float] = []
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.inclusive: Dict[str, float] = defaultdict(float)
+        self.stacks: Dict[tuple, float] = defaultdict(float)
+        self.loops: Dict[tuple, int] = defaultdict(int)
+        # Открытые вызовы функций: (имя, время начала).
+        self.__frames = []
+        self.__path = (MAIN,)
+
+    def instrument(self, vm, code, program: List[Callable[[], None]]) -> List[Callable[[], None]]:
+        """Возвращает обработчики программы code, связанные машиной vm, с замером времени."""
+        if not self.funcs and getattr(code, 'funcs', None):
+            self.funcs = dict(code.funcs)
+        self.code = [(line.cmd, line.value) for line in (code[i] for i in range(len(code)))]
+        self.counts = [0] * len(program)
+        self.times = [0.0] * len(program)
+        return [self.__wrap(vm, index, handler) for index, handler in enumerate(program)]
+
+    def __wrap(self, vm, index: int, handler: Callable[[], None]) -> Callable[[], None]:
+        cmd, value = self.code[index]
+        counts, times, stacks = self.counts, self.times, self.stacks
+
+        def profiled():
+            path = self.__path
+            start = perf_counter()
+            handler()
+            elapsed = perf_counter() - start
+            counts[index] += 1
+            times[index] += elapsed
+            stacks[path] += elapsed
+
+        if cmd == CALL:
+            name = self.function_name(value)
+
+            def call():
+                profiled()
+                self.__enter(name)
+            return call
+        if cmd == RET:
+            def ret():
+                profiled()
+                self.__leave()
+            return ret
+        if cmd in JUMPS and value <= index:
+            loop = (value, index)
+
+            def jump():
+                profiled()
+                # Машина уже перешла к следующей команде, если переход не выполнен.
+                if vm._cur_line_id == value:
+                    self.loops[loop] += 1
+            return jump
+        return profiled
+
+    def __enter(self, name: str):
+        self.calls[name] += 1
+        self.__frames.append((name, perf_counter()))
+        self.__path = self.__path + (name,)
+
+    def __leave(self):
+        if not self.__frames:
+            return
+        name, start = self.__frames.pop()
+        self.__path = self.__path[:-1]
+        # Время рекурсивной функции учитывается один раз, во внешнем вызове.
+        if name not in self.__path:
+            self.inclusive[name] += perf_counter() - start
+
+    def function_name(self, address: int) -> str:
+        for name, func_address in self.funcs.items():
+            if func_address == address:
+                return name
+        return 'func@{}'.format(address)
+
+    def opcodes(self) -> Dict[str, dict]:
+        """Количество выполнений и суммарное время по командам."""
+        result = {}
+        for (cmd, _), count, time in zip(self.code, self.counts, self.times):
+            stats = result.setdefault(cmd, {'count': 0, 'time': 0.0})
+            stats['count'] += count
+            stats['time'] += time
+        return result
+
+    def functions(self) -> Dict[str, dict]:
+        """Количество вызовов, время вместе с вложенными вызовами и собственное время команд по функциям."""
+        result = {name: {'calls': calls, 'time': self.inclusive[name], 'self_time': 0.0}
+                  for name, calls in self.calls.items()}
+        for path, time in self.stacks.items():
+            if path[-1] in result:
+                result[path[-1]]['self_time'] += time
+        return result
+
+    def hot_loops(self) -> List[dict]:
+        """Циклы по убыванию количества итераций. time - суммарное время команд от начала цикла до перехода."""
+        loops = [{'start': start, 'end': end, 'iterations': iterations, 'time': sum(self.times[start:end + 1])}
+                 for (start, end), iterations in self.loops.items()]
+        return sorted(loops, key=lambda loop: loop['iterations'], reverse=True)
+
+    def report(self) -> dict:
+        """Отчёт профилирования в виде словаря, который можно сериализовать в JSON."""
+        return {
+            'opcodes': self.opcodes(),
+            'addresses': [{'address': index, 'cmd': cmd, 'value': value, 'count': count, 'time': time}
+                          for index, ((cmd, value), count, time) in enumerate(zip(self.code, self.counts, self.times))
+                          if count],
+            'functions': self.functions(),
+            'loops': self.hot_loops()
+        }
+
+    def dump_json(self, file: TextIO):
+        json.dump(self.report(), file, ensure_ascii=False, indent=2)
+
+    def dump_collapsed(self, file: TextIO):
+        """
+        Стеки вызовов в свёрнутом формате для построения flame graph (flamegraph.pl, speedscope): в каждой строке
+        кадры через ';' и собственное время команд в микросекундах.
+        """
+        for path, time in sorted(self.stacks.items()):
+            file.write('{} {}\n'.format(';'.join(path), round(time * 1e6)))
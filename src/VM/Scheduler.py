@@ -0,0 +1,36 @@
+import asyncio
+from typing import Iterable, List
+from VirtualMachine import VirtualMachine
+
+
+class Scheduler:
+    """
+    Кооперативный планировщик виртуальных машин в цикле событий asyncio. Каждая машина выполняется своей задачей
+    порциями по quantum команд (см. VirtualMachine.step), после каждой порции управление возвращается циклу
+    событий, поэтому долгая программа не задерживает остальные. Асинхронная встроенная функция приостанавливает
+    только свою машину: задача ожидает её результат, а остальные машины продолжают выполняться.
+    """
+    def __init__(self, quantum: int = 1000):
+        self.quantum = quantum
+
+    async def execute(self, vm: VirtualMachine) -> VirtualMachine:
+        """Выполняет программу машины vm до завершения и возвращает машину."""
+        while True:
+            running = vm.step(self.quantum)
+            if vm.waiting is not None:
+                vm.resume(await vm.waiting)
+            elif not running:
+                return vm
+            else:
+                await asyncio.sleep(0)
+
+    async def execute_all(self, vms: Iterable[VirtualMachine]) -> List:
+        """
+        Выполняет машины vms одновременно. Возвращает список в том же порядке: машину или исключение, которым
+        завершилось выполнение её программы.
+        """
+        return await asyncio.gather(*(self.execute(vm) for vm in vms), return_exceptions=True)
+
+    def run(self, vms: Iterable[VirtualMachine]) -> List:
+        """Запускает цикл событий и выполняет в нём машины vms (см. execute_all)."""
+        return asyncio.run(self.execute_all(vms))
@@ -0,0 +1,57 @@
+import sys
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Dict, List, Optional, TextIO
+from Context import Context
+
+
+class Tracer(ABC):
+    """
+    Трассировщик выполнения: VirtualMachine(code, tracer=...). Машина с трассировщиком выполняет программу
+    отдельным циклом, который вызывает trace перед каждой командой, а при ошибке выполнения - error.
+    Основной цикл машины без трассировщика не меняется.
+    """
+    @abstractmethod
+    def trace(self, address: int, instruction, stack: list, context: Context):
+        """Вызывается перед выполнением команды instruction (CodeLine) с адресом address."""
+
+    def error(self, error: Exception):
+        """Вызывается при любой ошибке выполнения до того, как она будет передана дальше."""
+
+
+class RingBufferTracer(Tracer):
+    """
+    Хранит последние size выполненных команд: адрес, команду, операнд, вершину стека и значения переменных
+    текущего контекста. При ошибке выполнения записывает их в file (по умолчанию sys.stderr).
+    names - имена переменных: адрес начала функции (0 - основная программа) -> имена в порядке номеров ячеек
+    (см. Pipeline.slot_names). Имена подставляются только при записи; без них выводятся номера ячеек.
+    """
+    def __init__(self, size: int = 100, file: Optional[TextIO] = None, names: Optional[Dict[int, List[str]]] = None):
+        self.records = deque(maxlen=size)
+        self.file = file
+        self.names = names or {}
+
+    def trace(self, address: int, instruction, stack: list, context: Context):
+        self.records.append((address, instruction.cmd, instruction.value, stack[-1] if stack else None,
+                             context.function, tuple(context.slots), context.named_variables()))
+
+    def error(self, error: Exception):
+        file = self.file if self.file is not None else sys.stderr
+        file.write('Ошибка выполнения: {}: {}\n'.format(type(error).__name__, error))
+        file.write('Последние выполненные команды ({}):\n'.format(len(self.records)))
+        self.dump(file)
+
+    def variables(self, function: int, slots: tuple, named: Optional[dict]) -> str:
+        """Переменные контекста в виде 'имя=значение, ...'."""
+        names = self.names.get(function, ())
+        items = ['{}={!r}'.format(names[slot] if slot < len(names) else '#{}'.format(slot), value)
+                 for slot, value in enumerate(slots)]
+        if named:
+            items.extend('{}={!r}'.format(name, value) for name, value in named.items())
+        return ', '.join(items)
+
+    def dump(self, file: TextIO):
+        for address, cmd, value, top, function, slots, named in self.records:
+            operand = '' if value is None else ' ' + repr(value)
+            file.write('{:6}. {}{} | вершина стека: {!r} | переменные: {}\n'.format(
+                address, cmd, operand, top, self.variables(function, slots, named)))
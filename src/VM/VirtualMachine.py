@@ -1,66 +1,267 @@
-from typing import List
+import asyncio
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional, Union
 from Instructions import *
 from Context import Context
+from Bytecode import Bytecode
+from Profiler import Profiler
+from Tracer import Tracer
+from Limits import Limits
+from FunctionCompiler import FunctionCompiler
 from code_generator import CodeLine
-import custom_builtins
-import inspect
+from custom_builtins import BUILTINS
+import Operations as operations
 
 
 class VirtualMachine:
-    def __init__(self, code: List[CodeLine]):
+    # Таблицы диспетчеризации: команда -> имя метода-обработчика.
+    # Обработчики связываются с командами один раз, при загрузке программы.
+    _opcode = {
+        HALT: 'halt',
+        POP: 'pop',
+        DUP: 'dup',
+        ADD: 'add',
+        SUB: 'sub',
+        MUL: 'mul',
+        PWR: 'pwr',
+        DIV: 'div',
+        MOD: 'mod',
+        NOT: '_not',
+        AND: '_and',
+        OR: '_or',
+        EQ: 'eq',
+        NEQ: 'neq',
+        GT: 'gt',
+        LT: 'lt',
+        GE: 'ge',
+        LE: 'le',
+        RET: 'ret'
+    }
+    _opcode_with_val = {
+        PUSH: 'push',
+        JMP: 'jmp',
+        JNZ: 'jnz',
+        JZ: 'jz',
+        LOAD: 'load',
+        STORE: 'store',
+        CALL: 'call',
+        CBLTN: 'call_builtin',
+        LOAD_FAST: 'load_fast',
+        STORE_FAST: 'store_fast',
+        INC_FAST: 'inc_fast',
+        DEC_FAST: 'dec_fast'
+    }
+    # Суперинструкции с общим обработчиком для нескольких операций: команда -> (имя метода, операция).
+    _fused = {
+        **{cmd: ('op_const', op) for op, cmd in WITH_CONST.items()},
+        **{cmd: ('jz_compare', op) for op, cmd in COMPARE_JZ.items()}
+    }
+
+    def __init__(self, code: Union[List[CodeLine], Bytecode], profiler: Optional[Profiler] = None,
+                 tracer: Optional[Tracer] = None, limits: Optional[Limits] = None,
+                 compiler: Optional[FunctionCompiler] = None):
         self._code = code
         self._cur_line_id = 0
         self._stack = []
-        self._contexts = [Context(0)]
         self._halted = False
-        self.__run()
+        # Выполнение приостановлено: командой HALT или вызовом асинхронной встроенной функции.
+        self._stopped = False
+        # Результат асинхронной встроенной функции, который ожидает планировщик (см. call_async_builtin).
+        self.waiting = None
+        self._tracer = tracer
+        self._program = self._link(code)
+        if profiler is not None:
+            # Замер времени добавляется только в обработчики профилируемой программы, основной цикл не меняется.
+            self._program = profiler.instrument(self, code, self._program)
+        if limits is not None:
+            # Проверки добавляются только в обработчики переходов назад, вызовов и возвратов.
+            self._program = limits.instrument(self, code, self._program)
+        if compiler is not None:
+            if profiler is not None or tracer is not None or limits is not None:
+                # Скомпилированные функции выполняются без обработчиков команд, в которые встроены проверки.
+                raise ValueError("Компиляция функций несовместима с профилировщиком, трассировщиком и ограничениями")
+            self._program = compiler.instrument(self, code, self._program)
+        # Размер кадра каждой функции: контекст вызова содержит только ячейки переменных вызванной функции.
+        self._frame_sizes = self.frame_sizes(code)
+        self._contexts = [Context(0, self._frame_sizes[0])]
+        # Ячейки переменных текущего контекста.
+        self._slots = self._contexts[0].slots
+
+    @property
+    def finished(self) -> bool:
+        """Программа завершена командой HALT или переходом за её конец."""
+        return self._halted or self._cur_line_id >= len(self._program)
+
+    def run(self):
+        """
+        Выполняет программу до завершения. Асинхронные встроенные функции ожидаются через asyncio.run, поэтому
+        внутри цикла событий машины выполняются планировщиком (см. Scheduler).
+        """
+        while True:
+            if self._tracer is None:
+                self.__run()
+            else:
+                self.__run_traced(self._tracer)
+            if self.waiting is None:
+                return
+            self.resume(asyncio.run(self.__wait(self.waiting)))
+
+    @staticmethod
+    async def __wait(awaitable):
+        return await awaitable
+
+    def step(self, n: int = 1) -> bool:
+        """
+        Выполняет не более n команд и возвращает True, если программа не завершена. Выполнение прерывается раньше
+        при вызове асинхронной встроенной функции: её результат нужно дождаться и передать в resume.
+        """
+        if self._tracer is not None:
+            self.__run_traced(self._tracer, n)
+            return not self.finished
+        program = self._program
+        size = len(program)
+        for _ in range(n):
+            if self._cur_line_id >= size or self._stopped:
+                break
+            handler = program[self._cur_line_id]
+            self._cur_line_id += 1
+            handler()
+        return not self.finished
+
+    def resume(self, value=None):
+        """Продолжает выполнение после асинхронной встроенной функции, value - её результат."""
+        self.waiting = None
+        self._stopped = self._halted
+        if value is not None:
+            self._stack.append(value)
 
     def __run(self):
-        while self._cur_line_id < len(self._code) and not self._halted:
-            instruction = self.get_code("Ожидалась команда")
-            self.execute_operation(instruction)
+        program = self._program
+        size = len(program)
+        while self._cur_line_id < size and not self._stopped:
+            handler = program[self._cur_line_id]
+            self._cur_line_id += 1
+            handler()
+
+    def __run_traced(self, tracer: Tracer, limit: Optional[int] = None):
+        """Цикл выполнения с вызовом трассировщика перед каждой командой. limit - наибольшее количество команд."""
+        program = self._program
+        size = len(program)
+        executed = 0
+        try:
+            while self._cur_line_id < size and not self._stopped and (limit is None or executed < limit):
+                executed += 1
+                address = self._cur_line_id
+                tracer.trace(address, self._code[address], self._stack, self.get_current_context())
+                handler = program[address]
+                self._cur_line_id += 1
+                handler()
+        except Exception as error:
+            # Ошибки операций (например, ZeroDivisionError при делении на ноль) тоже сопровождаются записью.
+            tracer.error(error)
+            raise
+
+    def _link(self, code: Union[List[CodeLine], Bytecode]) -> List[Callable[[], None]]:
+        """Возвращает список обработчиков, в котором каждой команде программы соответствует готовый вызов."""
+        if isinstance(code, Bytecode):
+            return self._link_bytecode(code)
+        return [self.resolve(instruction) for instruction in code]
+
+    def _link_bytecode(self, bytecode: Bytecode) -> List[Callable[[], None]]:
+        """Связывает программу в компактном представлении, выбирая обработчики по целочисленному коду команды."""
+        # Для каждого кода команды: метод-обработчик и таблица, из которой берётся операнд.
+        methods, tables = [], []
+        for cmd in OPCODES:
+            if cmd in self._opcode:
+                methods.append(getattr(self, self._opcode[cmd]))
+            else:
+                methods.append(self._method(cmd))
+            tables.append(bytecode.consts if cmd in CONST_ARG else bytecode.names if cmd in NAME_ARG else None)
+        program = []
+        for op, arg in zip(bytecode.code, bytecode.args):
+            cmd = OPCODES[op]
+            if cmd in self._opcode:
+                program.append(methods[op])
+            elif cmd == CBLTN:
+                program.append(self.link_builtin(tables[op][arg]))
+            elif tables[op] is not None:
+                program.append(partial(methods[op], tables[op][arg]))
+            else:
+                program.append(partial(methods[op], arg))
+        return program
+
+    @staticmethod
+    def frame_sizes(code: Union[List[CodeLine], Bytecode], entries: Optional[Iterable[int]] = None) -> Dict[int, int]:
+        """
+        Возвращает количество ячеек переменных для каждой функции программы: адрес начала функции (0 - основная
+        программа) -> наибольший номер ячейки в командах, достижимых из начала функции до возврата, плюс один.
+        Номера ячеек назначаются каждой функции отдельно, поэтому вызываемые функции не учитываются.
+        entries - адреса функций; по умолчанию основная программа и все адреса команд CALL.
+        """
+        if isinstance(code, Bytecode):
+            cmds, values = [OPCODES[op] for op in code.code], code.args
+        else:
+            cmds, values = [line.cmd for line in code], [line.value for line in code]
+        if entries is None:
+            entries = {0} | {values[i] for i, cmd in enumerate(cmds) if cmd == CALL}
+        sizes = {}
+        for entry in entries:
+            size, reached, work = 0, set(), [entry]
+            while work:
+                index = work.pop()
+                if index in reached or not 0 <= index < len(cmds):
+                    continue
+                reached.add(index)
+                cmd = cmds[index]
+                if cmd in SLOT_ARG:
+                    size = max(size, values[index] + 1)
+                if cmd in (RET, HALT):
+                    continue
+                if cmd in JUMPS:
+                    work.append(values[index])
+                if cmd != JMP:
+                    work.append(index + 1)
+            sizes[entry] = size
+        return sizes
+
+    def resolve(self, instruction: CodeLine) -> Callable[[], None]:
+        """Находит обработчик команды и связывает его с операндом."""
+        if instruction.cmd in self._opcode:
+            return getattr(self, self._opcode[instruction.cmd])
+        elif instruction.cmd == CBLTN:
+            return self.link_builtin(instruction.value)
+        elif instruction.cmd in self._opcode_with_val or instruction.cmd in self._fused:
+            return partial(self._method(instruction.cmd), instruction.value)
+        else:
+            # Ошибка возникает только при попытке выполнить неизвестную команду, как и раньше.
+            return partial(self.unknown, instruction)
+
+    def _method(self, cmd) -> Callable:
+        """Обработчик команды с операндом. Обработчик суперинструкции уже связан со своей операцией."""
+        if cmd in self._fused:
+            name, op = self._fused[cmd]
+            return partial(getattr(self, name), op, operations.BINARY[op])
+        return getattr(self, self._opcode_with_val[cmd])
+
+    def link_builtin(self, func_name) -> Callable[[], None]:
+        """Связывает вызов встроенной функции с функцией и количеством её параметров из реестра BUILTINS."""
+        if func_name not in BUILTINS:
+            # Как и для неизвестной команды, ошибка возникает только при выполнении вызова.
+            return partial(self.unknown_builtin, func_name)
+        func, argc = BUILTINS[func_name]
+        if asyncio.iscoroutinefunction(func):
+            return partial(self.call_async_builtin, func, argc)
+        return partial(self.call_builtin, func, argc)
 
     def execute_operation(self, instruction):
-        opcode = {
-            HALT: self.halt,
-            POP: self.pop,
-            DUP: self.dup,
-            ADD: self.add,
-            SUB: self.sub,
-            MUL: self.mul,
-            PWR: self.pwr,
-            DIV: self.div,
-            MOD: self.mod,
-            NOT: self._not,
-            AND: self._and,
-            OR: self._or,
-            EQ: self.eq,
-            NEQ: self.neq,
-            GT: self.gt,
-            LT: self.lt,
-            GE: self.ge,
-            LE: self.le,
-            RET: self.ret
-        }
-        opcode_with_val = {
-            PUSH: self.push,
-            JMP: self.jmp,
-            JNZ: self.jnz,
-            LOAD: self.load,
-            STORE: self.store,
-            CALL: self.call,
-            CBLTN: self.call_builtin
-        }
-
-        if instruction.cmd in opcode:
-            opcode[instruction.cmd]()
-        elif instruction.cmd in opcode_with_val:
-            opcode_with_val[instruction.cmd](instruction.value)
-        else:
-            raise RuntimeError("Неизвестная команда: " + str(instruction))
+        self.resolve(instruction)()
+
+    def unknown(self, instruction):
+        raise RuntimeError("Неизвестная команда: " + str(instruction))
 
     def halt(self):
         self._halted = True
+        self._stopped = True
 
     def push(self, value):
         self._stack.append(value)
@@ -78,142 +279,89 @@ class VirtualMachine:
         self.check_stack("ADD")
         right = self.pop()
         left = self.pop()
-        if isinstance(right, str) or isinstance(left, str):
-            left = str(left)
-            right = str(right)
-        if left is None or right is None:
-            self._stack.append('NaN')
-        else:
-            self._stack.append(left + right)
+        self._stack.append(operations.add(left, right))
 
     def sub(self):
         self.check_stack("SUB")
         right = self.pop()
         left = self.pop()
-        if not self.is_none_or_str(left, right):
-            self._stack.append(left - right)
+        self._stack.append(operations.sub(left, right))
 
     def mul(self):
         self.check_stack("MUL")
         right = self.pop()
         left = self.pop()
-        if not self.is_none_or_str(left, right):
-            self._stack.append(left * right)
+        self._stack.append(operations.mul(left, right))
 
     def pwr(self):
         self.check_stack("PWR")
         right = self.pop()
         left = self.pop()
-        if not self.is_none_or_str(left, right):
-            self._stack.append(left ** right)
+        self._stack.append(operations.pwr(left, right))
 
     def div(self):
         self.check_stack("DIV")
         right = self.pop()
         left = self.pop()
-        if not self.is_none_or_str(left, right):
-            self._stack.append(left / right)
+        self._stack.append(operations.div(left, right))
 
     def mod(self):
         self.check_stack("MOD")
         right = self.pop()
         left = self.pop()
-        if not self.is_none_or_str(left, right):
-            self._stack.append(right % left)
+        self._stack.append(operations.mod(left, right))
 
     def _not(self):
         self.is_stack_empty()
-        left = self.pop()
-        if isinstance(left, str):
-            self._stack.append(False)
-        else:
-            self._stack.append(int(not left))
+        self._stack.append(operations.not_(self.pop()))
 
     def _and(self):
         self.check_stack("AND")
         right = self.pop()
         left = self.pop()
-        if isinstance(left, bool) and isinstance(right, bool):
-            self._stack.append(left and right)
-        elif isinstance(left, bool):
-            self._stack.append(left)
-        else:
-            self._stack.append(right)
+        self._stack.append(operations.and_(left, right))
 
     def _or(self):
         self.check_stack("OR")
         right = self.pop()
         left = self.pop()
-        if isinstance(left, bool) and isinstance(right, bool):
-            self._stack.append(left or right)
-        elif isinstance(left, bool):
-            self._stack.append(right)
-        else:
-            self._stack.append(left)
+        self._stack.append(operations.or_(left, right))
 
     def eq(self):
         self.check_stack("EQ")
         right = self.pop()
         left = self.pop()
-        if (isinstance(right, str) and not isinstance(left, str)) \
-                or (not isinstance(right, str) and isinstance(left, str)):
-            self._stack.append(False)
-        else:
-            self._stack.append(left == right)
+        self._stack.append(operations.eq(left, right))
 
     def neq(self):
         self.check_stack("NEQ")
-        self.eq()
-        self._stack.append(not self.pop())
+        right = self.pop()
+        left = self.pop()
+        self._stack.append(operations.neq(left, right))
 
     def gt(self):
         self.check_stack("GT")
         right = self.pop()
         left = self.pop()
-        if (isinstance(right, str) and not isinstance(left, str)) \
-                or (not isinstance(right, str) and isinstance(left, str)):
-            self._stack.append(False)
-        else:
-            self._stack.append(left > right)
+        self._stack.append(operations.gt(left, right))
 
     def lt(self):
         self.check_stack("LT")
         right = self.pop()
         left = self.pop()
-        if (isinstance(right, str) and not isinstance(left, str)) \
-                or (not isinstance(right, str) and isinstance(left, str)):
-            self._stack.append(False)
-        else:
-            self._stack.append(left < right)
+        self._stack.append(operations.lt(left, right))
 
     def ge(self):
         self.check_stack("GE")
         right = self.pop()
         left = self.pop()
-        if (isinstance(right, str) and not isinstance(left, str)) \
-                or (not isinstance(right, str) and isinstance(left, str)):
-            self._stack.append(False)
-        else:
-            self._stack.append(left >= right)
+        self._stack.append(operations.ge(left, right))
 
     def le(self):
         self.check_stack("LE")
         right = self.pop()
         left = self.pop()
-        if (isinstance(right, str) and not isinstance(left, str)) \
-                or (not isinstance(right, str) and isinstance(left, str)):
-            self._stack.append(False)
-        else:
-            self._stack.append(left <= right)
-
-    def pwr(self):
-        self.check_stack("PWR")
-        right = self.pop()
-        left = self.pop()
-        if isinstance(right, str) or isinstance(left, str):
-            self._stack.append('NaN')
-        else:
-            self._stack.append(left ** right)
+        self._stack.append(operations.le(left, right))
 
     def jmp(self, address):
         self.check_address(address)
@@ -225,6 +373,13 @@ class VirtualMachine:
         if self.pop():
             self._cur_line_id = address
 
+    def jz(self, address):
+        self.check_address(address)
+        self.is_stack_empty()
+        # Переход выполняется в тех же случаях, что и у пары команд NOT, JNZ.
+        if operations.not_(self.pop()):
+            self._cur_line_id = address
+
     def load(self, var_name):
         self._stack.append(self.get_current_context().get_variable(var_name))
 
@@ -232,26 +387,69 @@ class VirtualMachine:
         self.is_stack_empty()
         self.get_current_context().set_variable(var_name, self.pop())
 
+    def load_fast(self, slot):
+        self._stack.append(self._slots[slot])
+
+    def store_fast(self, slot):
+        self.is_stack_empty()
+        self._slots[slot] = self._stack.pop()
+
+    def inc_fast(self, slot):
+        # То же, что PUSH 1, LOAD_FAST slot, ADD, STORE_FAST slot.
+        self._slots[slot] = operations.add(1, self._slots[slot])
+
+    def dec_fast(self, slot):
+        # То же, что LOAD_FAST slot, PUSH 1, SUB, STORE_FAST slot.
+        self._slots[slot] = operations.sub(self._slots[slot], 1)
+
+    def op_const(self, name, operation, value):
+        # То же, что PUSH value, <операция>.
+        self.is_stack_empty()
+        self._stack.append(operation(self._stack.pop(), value))
+
+    def jz_compare(self, name, compare, address):
+        # То же, что <сравнение>, JZ address. Сравнение возвращает bool, поэтому not совпадает с operations.not_.
+        self.check_address(address)
+        self.check_stack(name)
+        right = self._stack.pop()
+        left = self._stack.pop()
+        if not compare(left, right):
+            self._cur_line_id = address
+
     def call(self, address):
         self.check_address(address)
-        self._contexts.append(Context(self._cur_line_id))
+        size = self._frame_sizes.get(address)
+        if size is None:
+            # Вызов по адресу, которого нет среди операндов команд CALL программы (см. execute_operation).
+            size = self._frame_sizes[address] = self.frame_sizes(self._code, [address])[address]
+        context = Context(self._cur_line_id, size, address)
+        self._contexts.append(context)
+        self._slots = context.slots
         self._cur_line_id = address
 
-    def call_builtin(self, func_name):
-        method_to_call = getattr(custom_builtins, func_name)
-        args = []
-        for param in inspect.signature(method_to_call).parameters:
-            args.append(self._stack.pop())
-        res = method_to_call(*args)
+    def call_builtin(self, func, argc):
+        # Первый параметр снимается с вершины стека.
+        args = [self._stack.pop() for _ in range(argc)]
+        res = func(*args)
         if res is not None:
             self._stack.append(res)
 
+    def call_async_builtin(self, func, argc):
+        # Выполнение приостанавливается до получения результата корутины (см. run, step и resume).
+        args = [self._stack.pop() for _ in range(argc)]
+        self.waiting = func(*args)
+        self._stopped = True
+
+    def unknown_builtin(self, func_name):
+        raise RuntimeError("Неизвестная встроенная функция: " + func_name)
+
     def ret(self):
         if len(self._contexts) == 1:
             raise RuntimeError("Недопустимая команда RET")
         else:
             ret_address = self.get_current_context().get_return_address()
             self._contexts.pop()
+            self._slots = self.get_current_context().slots
             self._cur_line_id = ret_address
 
     def get_code(self, error_message):
@@ -274,10 +472,5 @@ class VirtualMachine:
         return self._contexts[len(self._contexts) - 1]
 
     def check_address(self, address):
-        if address < 0 or address >= len(self._code):
+        if address < 0 or address >= len(self._program):
             raise RuntimeError("Неверный адрес в команде JUMP")
-
-    def is_none_or_str(self, left, right):
-        if isinstance(right, str) or isinstance(left, str) or left is None or right is None:
-            self._stack.append('NaN')
-            return True
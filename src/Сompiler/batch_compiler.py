@@ -0,0 +1,161 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from contextlib import suppress
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+from pyparsing import ParseException
+from Parser import Parser
+from pipeline import Pipeline
+from bytecode_cache import dump, source_hash
+
+# Расширение файлов исходного кода и файлов байткода.
+SOURCE_EXT = '.js'
+BYTECODE_EXT = '.jsbc'
+
+# Pipeline процесса-исполнителя, создаётся один раз при запуске процесса (см. _init_worker).
+_pipeline: Optional[Pipeline] = None
+
+
+def find_sources(paths: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    Возвращает пары (путь к файлу, путь файла байткода относительно выходного каталога). Каталоги обходятся
+    рекурсивно, и в выходном каталоге повторяется их структура; для файлов используется только имя. Файлы, для которых
+    пути байткода совпадают, compile_files не компилирует и сообщает об ошибке.
+    """
+    sources = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                for name in sorted(names):
+                    if name.endswith(SOURCE_EXT):
+                        file = os.path.join(directory, name)
+                        sources.append((file, os.path.relpath(file, path)[:-len(SOURCE_EXT)] + BYTECODE_EXT))
+        else:
+            name = os.path.basename(path)
+            if name.endswith(SOURCE_EXT):
+                name = name[:-len(SOURCE_EXT)]
+            sources.append((path, name + BYTECODE_EXT))
+    return sources
+
+
+def _init_worker(options: Dict):
+    global _pipeline
+    _pipeline = Pipeline(**options)
+
+
+def _write(path: str, data: bytes):
+    """Атомарная запись файла, как в BytecodeCache.put."""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Ошибка удаления временного файла не должна скрывать исходную ошибку.
+        with suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+def compile_one(source: str, output: str) -> Dict:
+    """
+    Компилирует файл source и записывает байткод в output. Выполняется в процессе-исполнителе.
+    Возвращает словарь: source, output (None при ошибках), diagnostics - сообщения об ошибках чтения файла,
+    разбора и семантических ошибках, time - время компиляции в секундах, size - размер исходного кода в байтах.
+    """
+    start = time.perf_counter()
+    code = ''
+    diagnostics = []
+    try:
+        with open(source, encoding='utf-8') as f:
+            code = f.read()
+        bytecode = _pipeline.compile(code)
+        if bytecode is None:
+            diagnostics.extend(error.message for error in _pipeline.errors)
+            output = None
+        else:
+            _write(output, dump(bytecode, source_hash(code, _pipeline.options)))
+    except ParseException as e:
+        diagnostics.append('{} (строка: {}, символ: {})'.format(e.msg, e.lineno, e.col))
+    except RecursionError:
+        diagnostics.append('Слишком большая вложенность конструкций')
+    except (OSError, UnicodeDecodeError) as e:
+        # Ошибка одного файла не должна прерывать компиляцию остальных.
+        diagnostics.append('Не удалось обработать файл: {}'.format(e))
+    if diagnostics:
+        output = None
+    return {'source': source, 'output': output, 'diagnostics': diagnostics,
+            'time': time.perf_counter() - start, 'size': len(code.encode('utf-8'))}
+
+
+def compile_files(paths: Iterable[str], output_dir: str, workers: Optional[int] = None,
+                  **options) -> Iterable[Dict]:
+    """
+    Компилирует файлы и каталоги paths в процессах ProcessPoolExecutor и возвращает результаты compile_one
+    по мере готовности. options передаются в Pipeline каждого процесса. Самые большие файлы отправляются первыми,
+    чтобы в конце работы процессы не простаивали в ожидании одного большого файла.
+    """
+    sizes, outputs = [], {}
+    for source, output in find_sources(paths):
+        output = os.path.normpath(os.path.join(output_dir, output))
+        if output in outputs:
+            # Файлы с одинаковыми именами из разных мест записали бы байткод в один файл.
+            yield _failed(source, 'Файл байткода {} уже создаётся для {}'.format(output, outputs[output]))
+            continue
+        try:
+            size = os.path.getsize(source)
+        except OSError as e:
+            yield _failed(source, 'Не удалось обработать файл: {}'.format(e))
+            continue
+        outputs[output] = source
+        sizes.append((size, source, output))
+    sizes.sort(key=lambda item: item[0], reverse=True)
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(options,)) as executor:
+        futures = [executor.submit(compile_one, source, output) for _, source, output in sizes]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def _failed(source: str, message: str) -> Dict:
+    """Результат compile_one для файла, который не передаётся на компиляцию."""
+    return {'source': source, 'output': None, 'diagnostics': [message], 'time': 0.0, 'size': 0}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Командная строка пакетной компиляции. Возвращает 1, если хотя бы один файл содержит ошибки."""
+    arguments = argparse.ArgumentParser(description='Пакетная компиляция файлов в байткод.')
+    arguments.add_argument('paths', nargs='+', help='файлы и каталоги с файлами ' + SOURCE_EXT)
+    arguments.add_argument('-o', '--output', default='build', help='каталог для файлов байткода')
+    arguments.add_argument('-j', '--jobs', type=int, default=None, help='количество процессов; по умолчанию все ядра')
+    arguments.add_argument('--optimize', action='store_true', help='оконная оптимизация байткода')
+    arguments.add_argument('--fold-constants', action='store_true', help='вычисление константных выражений')
+    arguments.add_argument('--superinstructions', action='store_true', help='суперинструкции')
+    arguments.add_argument('--backend', default='pyparsing', choices=Parser.BACKENDS,
+                           help='способ разбора (см. Parser)')
+    args = arguments.parse_args(argv)
+
+    start = time.perf_counter()
+    failed, total, busy = 0, 0, 0.0
+    for result in compile_files(args.paths, args.output, args.jobs, optimize=args.optimize,
+                                fold_constants=args.fold_constants, superinstructions=args.superinstructions,
+                                backend=args.backend):
+        total += 1
+        busy += result['time']
+        status = 'ошибки' if result['diagnostics'] else 'ok'
+        print('{}: {}, {:.3f} с, {} байт'.format(result['source'], status, result['time'], result['size']))
+        for message in result['diagnostics']:
+            print('    Ошибка: {}'.format(message))
+        failed += bool(result['diagnostics'])
+    elapsed = time.perf_counter() - start
+    print('файлов: {}, с ошибками: {}, время {:.2f} с, суммарное время компиляции {:.2f} с, ускорение {:.1f}'
+          .format(total, failed, elapsed, busy, busy / elapsed if elapsed else 0.0))
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
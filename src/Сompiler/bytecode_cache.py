@@ -0,0 +1,76 @@
+import hashlib
+import os
+import struct
+import tempfile
+from contextlib import suppress
+from typing import Optional
+from Bytecode import Bytecode
+from code_generator import COMPILER_VERSION
+
+# Заголовок файла кэша: сигнатура, версия компилятора, SHA-256 исходного кода.
+MAGIC = b'JSBC'
+HEADER = struct.Struct('<4sI32s')
+
+
+def source_hash(code: str, options: str = '') -> bytes:
+    """Возвращает SHA-256 исходного кода и параметров компиляции, влияющих на результат."""
+    return hashlib.sha256(options.encode('utf-8') + b'\0' + code.encode('utf-8')).digest()
+
+
+def dump(bytecode: Bytecode, digest: bytes) -> bytes:
+    """Возвращает содержимое файла с байткодом: заголовок и сериализованную программу."""
+    return HEADER.pack(MAGIC, COMPILER_VERSION, digest) + bytecode.to_bytes()
+
+
+def load(data: bytes, digest: Optional[bytes] = None) -> Optional[Bytecode]:
+    """
+    Восстанавливает байткод из содержимого файла.
+    Возвращает None, если файл создан другой версией компилятора, повреждён или (при заданном digest)
+    получен из другого исходного кода.
+    """
+    if len(data) < HEADER.size:
+        return None
+    magic, version, file_digest = HEADER.unpack_from(data)
+    if magic != MAGIC or version != COMPILER_VERSION or (digest is not None and file_digest != digest):
+        return None
+    try:
+        return Bytecode.from_bytes(data[HEADER.size:])
+    except ValueError:
+        return None
+
+
+class BytecodeCache:
+    """
+    Кэш скомпилированного байткода на диске. Файлы именуются по хэшу исходного кода.
+    options - строка с параметрами компиляции; программы, скомпилированные с разными параметрами, хранятся отдельно.
+    """
+    def __init__(self, cache_dir: str, options: str = ''):
+        self.cache_dir = cache_dir
+        self.options = options
+
+    def path(self, digest: bytes) -> str:
+        return os.path.join(self.cache_dir, digest.hex() + '.jsbc')
+
+    def get(self, code: str) -> Optional[Bytecode]:
+        """Возвращает байткод для исходного кода code или None, если в кэше его нет."""
+        digest = source_hash(code, self.options)
+        try:
+            with open(self.path(digest), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        return load(data, digest)
+
+    def put(self, code: str, bytecode: Bytecode):
+        """Сохраняет байткод. Файл записывается атомарно, поэтому параллельные процессы не видят его частично."""
+        digest = source_hash(code, self.options)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(dump(bytecode, digest))
+            os.replace(tmp_path, self.path(digest))
+        except OSError:
+            # Кэш не обязателен: при ошибке записи программа просто будет скомпилирована заново в следующий раз.
+            with suppress(OSError):
+                os.remove(tmp_path)
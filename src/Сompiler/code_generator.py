@@ -1,8 +1,9 @@
-import inspect
-from typing import List
+from typing import List, Dict, Tuple
 from pyparsing import ParseResults
 from Nodes import *
-import custom_builtins
+from Visitor import NodeVisitor
+from Bytecode import Bytecode
+from custom_builtins import BUILTINS
 op_cmd = {
     '+': 'ADD',
     '-': 'SUB',
@@ -19,136 +20,235 @@ op_cmd = {
     '||': 'OR',
     '**': 'PWR'
 }
-builtin_funcs = [f for f in dir(custom_builtins) if inspect.isfunction(getattr(custom_builtins, f))]
+# Версия компилятора. Увеличивается при любом изменении генерируемого кода, чтобы сбросить кэш байткода.
+COMPILER_VERSION = 3
 
 
-class CodeGenerator:
-    def __init__(self, ast: BlockStatementNode):
+class CodeGenerator(NodeVisitor):
+    """
+    Генерация байткода. Если ast задан, программа компилируется целиком: сначала функции, затем основная
+    программа. Без ast программа компилируется по одной инструкции верхнего уровня методами add_statement и finish.
+    """
+    def __init__(self, ast: Optional[BlockStatementNode] = None):
         self.__ast = ast
         self.lines: List[CodeLine] = []
+        # Адрес первой команды в lines. При компиляции по инструкциям в lines остаются только команды
+        # текущей инструкции.
+        self.__base = 0
+        # Метки: номер метки -> адрес команды, которая следует за ней (None, пока метка не поставлена).
+        self.__labels: List[Optional[int]] = []
+        # Команды перехода, адрес которых ещё не известен: (номер команды, номер метки).
+        self.__fixups: List[Tuple[int, int]] = []
+        # Функции: имя функции -> номер метки её первой команды.
         self.__funcs = {}
+        # Номера ячеек переменных в кадре, который компилируется в данный момент: имя -> номер.
+        self.__slots = {}
+        # Имена переменных скомпилированных функций: имя функции -> имена в порядке номеров ячеек.
+        self.__slot_names: Dict[str, List[str]] = {}
+        if ast is None:
+            return
         self.__compile_functions()
-        self.__generate_code(self.__ast)
+        self.visit(self.__ast)
         self.__add_line(CodeLine('HALT'))
+        self.__resolve_labels()
+
+    def add_statement(self, node: TreeNode) -> List['CodeLine']:
+        """
+        Компилирует очередную инструкцию верхнего уровня и возвращает её команды. Функция размещается там, где
+        объявлена, и обходится переходом. Адреса в командах - адреса в программе целиком, а вызвать можно
+        только уже скомпилированную функцию, поэтому все адреса известны сразу.
+        """
+        if isinstance(node, FuncDeclarationNode):
+            end = self.__new_label()
+            self.__add_jump('JMP', end)
+            self.__funcs[node.ident.name] = self.__new_label()
+            self.__compile_function(node)
+            self.__mark(end)
+        else:
+            self.visit(node)
+        return self.__flush()
+
+    def finish(self) -> List['CodeLine']:
+        """Завершает программу, скомпилированную методом add_statement, и возвращает последние команды."""
+        self.__add_line(CodeLine('HALT'))
+        return self.__flush()
+
+    def __flush(self) -> List['CodeLine']:
+        self.__resolve_labels()
+        lines, self.lines = self.lines, []
+        self.__base += len(lines)
+        return lines
 
     def __compile_functions(self):
-        for child in self.__ast.children:
-            if child.__class__.__name__ in ["FuncDeclarationNode"]:
-                self.__funcs[child.ident.name] = len(self.lines) + 1
-                if not isinstance(child.params.params[0], ParseResults):
-                    for param in child.params.params[::-1]:
-                        self.__add_line(CodeLine('STORE', param.name))
-                self.__generate_code(child.block)
-                if self.lines[len(self.lines) - 1].cmd not in ['RET']:
-                    self.__add_line(CodeLine('RET'))
-        if len(self.__funcs) != 0:
-            self.__add_line_at(CodeLine('JMP', len(self.lines) + 1), 0, len(self.lines))
-
-    def __generate_code(self, node: TreeNode):
-        if node.__class__.__name__ in ["BinExprNode"]:
-            self.__compile_binexpr(node)
-        elif node.__class__.__name__ in ["UnaryExprNode"]:
-            self.__compile_unexpr(node)
-        elif node.__class__.__name__ in ["LiteralNode"]:
-            self.__add_line(CodeLine('PUSH', node.value))
-        elif node.__class__.__name__ in ["IdentNode"]:
-            self.__add_line(CodeLine('LOAD', node.name))
-        elif node.__class__.__name__ in ["ReturnNode"]:
-            self.__generate_code(node.argument)
+        funcs = [child for child in self.__ast.children if child.__class__.__name__ in ["FuncDeclarationNode"]]
+        if len(funcs) == 0:
+            return
+        # Метки всех функций создаются заранее, поэтому функция может вызывать функции, объявленные после неё.
+        for func in funcs:
+            self.__funcs[func.ident.name] = self.__new_label()
+        main = self.__new_label()
+        self.__add_jump('JMP', main)
+        for func in funcs:
+            self.__compile_function(func)
+        self.__mark(main)
+
+    def __compile_function(self, func: FuncDeclarationNode):
+        self.__mark(self.__funcs[func.ident.name])
+        # Каждая функция выполняется в собственном контексте, поэтому нумерация ячеек начинается заново.
+        main_slots, self.__slots = self.__slots, {}
+        if not isinstance(func.params.params[0], ParseResults):
+            for param in func.params.params[::-1]:
+                self.__add_line(self.__store(param.name))
+        self.visit(func.block)
+        if self.lines[len(self.lines) - 1].cmd not in ['RET']:
             self.__add_line(CodeLine('RET'))
-        elif node.__class__.__name__ in ["DeclaratorNode"]:
-            if node.init is not None:
-                self.__generate_code(node.init)
-                self.__add_line(CodeLine('STORE', node.ident.name))
-        elif node.__class__.__name__ in ["CallNode"]:
-            for param in node.args:
-                self.__generate_code(param)
-            if node.ident.name in builtin_funcs:
-                self.__add_line(CodeLine('CBLTN', node.ident.name))
-            else:
-                self.__add_line(CodeLine('CALL', self.__funcs[node.ident.name]))
-        elif node.__class__.__name__ in ["BlockStatementNode", "VarDeclarationNode"]:
-            for child in node.children:
-                self.__generate_code(child)
-        elif node.__class__.__name__ in ["IfNode"]:
-            self.__compile_if(node)
-        elif node.__class__.__name__ in ["WhileNode"]:
-            self.__compile_while(node)
-        elif node.__class__.__name__ in ["DoWhileNode"]:
-            self.__compile_dowhile(node)
-        elif node.__class__.__name__ in ["ForNode"]:
-            self.__compile_for(node)
-
-    def __compile_binexpr(self, node: BinExprNode):
+        self.__slot_names[func.ident.name] = list(self.__slots)
+        self.__slots = main_slots
+
+    def visit_BinExprNode(self, node: BinExprNode):
         if node.op.value == '=':
-            self.__generate_code(node.right)
-            self.__add_line(CodeLine('STORE', node.left.name))
+            self.visit(node.right)
+            self.__add_line(self.__store(node.left.name))
         else:
-            self.__generate_code(node.left)
-            self.__generate_code(node.right)
+            self.visit(node.left)
+            self.visit(node.right)
             self.__add_line(CodeLine(op_cmd[node.op.value]))
 
-    def __compile_unexpr(self, node: UnaryExprNode):
+    def visit_UnaryExprNode(self, node: UnaryExprNode):
         if node.op.value == '++':
             self.__add_line(CodeLine('PUSH', 1))
-            self.__add_line(CodeLine('LOAD', node.argument.name))
+            self.__add_line(self.__load(node.argument.name))
             self.__add_line(CodeLine('ADD'))
-            self.__add_line(CodeLine('STORE', node.argument.name))
+            self.__add_line(self.__store(node.argument.name))
         elif node.op.value == '--':
-            self.__add_line(CodeLine('LOAD', node.argument.name))
+            self.__add_line(self.__load(node.argument.name))
             self.__add_line(CodeLine('PUSH', 1))
             self.__add_line(CodeLine('SUB'))
-            self.__add_line(CodeLine('STORE', node.argument.name))
+            self.__add_line(self.__store(node.argument.name))
         elif node.op.value == '!':
-            self.__add_line(CodeLine('LOAD', node.argument.name))
+            # Для переменной - та же команда LOAD, что и раньше; аргументом может быть и любое выражение.
+            self.visit(node.argument)
             self.__add_line(CodeLine('NOT'))
 
-    def __compile_if(self, node: IfNode):
-        self.__generate_code(node.test)
-        start_false = len(self.lines)
-        self.__generate_code(node.alternate)
-        start_true = len(self.lines)
-        self.__generate_code(node.consequent)
-        self.__add_line_at(CodeLine('JNZ', start_true + 2), start_false, len(self.lines))
-        self.__add_line_at(CodeLine('JMP', len(self.lines) + 1), start_true + 1, len(self.lines))
-
-    def __compile_while(self, node: WhileNode):
-        start_test = len(self.lines)
-        self.__generate_code(node.test)
+    def visit_LiteralNode(self, node: LiteralNode):
+        self.__add_line(CodeLine('PUSH', node.value))
+
+    def visit_IdentNode(self, node: IdentNode):
+        self.__add_line(self.__load(node.name))
+
+    def visit_ReturnNode(self, node: ReturnNode):
+        self.visit(node.argument)
+        self.__add_line(CodeLine('RET'))
+
+    def visit_DeclaratorNode(self, node: DeclaratorNode):
+        if node.init is not None:
+            self.visit(node.init)
+            self.__add_line(self.__store(node.ident.name))
+
+    def visit_CallNode(self, node: CallNode):
+        for param in node.args:
+            self.visit(param)
+        if node.ident.name in BUILTINS:
+            self.__add_line(CodeLine('CBLTN', node.ident.name))
+        else:
+            self.__add_jump('CALL', self.__funcs[node.ident.name])
+
+    def visit_BlockStatementNode(self, node: BlockStatementNode):
+        for child in node.children:
+            self.visit(child)
+
+    visit_VarDeclarationNode = visit_BlockStatementNode
+
+    def visit_IfNode(self, node: IfNode):
+        true_label, end_label = self.__new_label(), self.__new_label()
+        self.visit(node.test)
+        self.__add_jump('JNZ', true_label)
+        self.visit(node.alternate)
+        self.__add_jump('JMP', end_label)
+        self.__mark(true_label)
+        self.visit(node.consequent)
+        self.__mark(end_label)
+
+    def visit_WhileNode(self, node: WhileNode):
+        test_label, end_label = self.__new_label(), self.__new_label()
+        self.__mark(test_label)
+        self.visit(node.test)
         self.__add_line(CodeLine('NOT'))
-        start_true = len(self.lines)
-        self.__generate_code(node.block)
-        self.__add_line_at(CodeLine('JNZ', len(self.lines) + 2), start_true, len(self.lines))
-        self.__add_line(CodeLine('JMP', start_test))
-
-    def __compile_dowhile(self, node: DoWhileNode):
-        start_block = len(self.lines)
-        self.__generate_code(node.block)
-        self.__generate_code(node.test)
-        self.__add_line(CodeLine('JNZ', start_block))
-
-    def __compile_for(self, node: ForNode):
-        self.__generate_code(node.init)
-        start_test = len(self.lines)
+        self.__add_jump('JNZ', end_label)
+        self.visit(node.block)
+        self.__add_jump('JMP', test_label)
+        self.__mark(end_label)
+
+    def visit_DoWhileNode(self, node: DoWhileNode):
+        block_label = self.__new_label()
+        self.__mark(block_label)
+        self.visit(node.block)
+        self.visit(node.test)
+        self.__add_jump('JNZ', block_label)
+
+    def visit_ForNode(self, node: ForNode):
+        test_label, end_label = self.__new_label(), self.__new_label()
+        self.visit(node.init)
+        self.__mark(test_label)
         if node.test.__class__.__name__ not in ["BinExprNode"]:
             self.__add_line(CodeLine('PUSH', 1))
         else:
-            self.__generate_code(node.test)
+            self.visit(node.test)
         self.__add_line(CodeLine('NOT'))
-        start_block = len(self.lines)
-        self.__generate_code(node.block)
-        self.__generate_code(node.update)
-        self.__add_line(CodeLine('JMP', start_test))
-        self.__add_line_at(CodeLine('JNZ', len(self.lines) + 1), start_block, len(self.lines))
+        self.__add_jump('JNZ', end_label)
+        self.visit(node.block)
+        self.visit(node.update)
+        self.__add_jump('JMP', test_label)
+        self.__mark(end_label)
+
+    def __slot(self, name: str) -> int:
+        """Возвращает номер ячейки переменной в текущем кадре, назначая его при первом обращении."""
+        if name not in self.__slots:
+            self.__slots[name] = len(self.__slots)
+        return self.__slots[name]
+
+    def __load(self, name: str) -> 'CodeLine':
+        return CodeLine('LOAD_FAST', self.__slot(name))
+
+    def __store(self, name: str) -> 'CodeLine':
+        return CodeLine('STORE_FAST', self.__slot(name))
 
     def __add_line(self, line):
         self.lines.append(line)
 
-    def __add_line_at(self, line, index, cur_len):
-        self.lines.insert(index, line)
-        for i in range(index + 1, cur_len):
-            if self.lines[i].cmd in ['JMP', 'JNZ']:
-                self.lines[i].value += 1
+    def __new_label(self) -> int:
+        """Создаёт метку, адрес которой станет известен после вызова __mark."""
+        self.__labels.append(None)
+        return len(self.__labels) - 1
+
+    def __mark(self, label: int):
+        """Ставит метку перед следующей добавляемой командой."""
+        self.__labels[label] = self.__base + len(self.lines)
+
+    def __add_jump(self, cmd: str, label: int):
+        """Добавляет команду перехода или вызова, адрес которой будет подставлен в __resolve_labels."""
+        self.__fixups.append((len(self.lines), label))
+        self.__add_line(CodeLine(cmd))
+
+    def __resolve_labels(self):
+        """Подставляет адреса меток в команды перехода за один проход."""
+        for index, label in self.__fixups:
+            self.lines[index].value = self.__labels[label]
+        self.__fixups = []
+
+    @property
+    def funcs(self) -> Dict[str, int]:
+        """Таблица функций: имя функции -> адрес её первой команды."""
+        return {name: self.__labels[label] for name, label in self.__funcs.items()}
+
+    @property
+    def slot_names(self) -> Dict[str, List[str]]:
+        """Имена переменных: имя функции ('' - основная программа) -> имена в порядке номеров ячеек."""
+        return {**self.__slot_names, '': list(self.__slots)}
+
+    def bytecode(self) -> Bytecode:
+        """Возвращает сгенерированную программу в компактном представлении."""
+        return Bytecode.from_lines(self.lines, self.funcs)
 
     def print_bytecode(self):
         id = 0
@@ -0,0 +1,130 @@
+from Nodes import *
+from Visitor import NodeVisitor
+from code_generator import op_cmd
+from Instructions import NOT
+import Operations as operations
+
+
+class ConstantFolder(NodeVisitor):
+    """
+    Преобразование абстрактного синтаксического дерева после семантического анализа:
+    - выражения из литералов (бинарные и отрицание) вычисляются по тем же правилам, что и в виртуальной машине;
+    - ветви if, циклы while, do while и for с константным условием удаляются или заменяются
+      той частью, которая будет выполнена.
+    Дерево изменяется на месте, результат сохраняется в root. Методы visit_ возвращают узел,
+    которым нужно заменить исходный, или None, если узел нужно удалить.
+    folded - количество вычисленных выражений, pruned - количество удалённых ветвей и циклов.
+    """
+    def __init__(self, root: BlockStatementNode):
+        self.folded = 0
+        self.pruned = 0
+        self.root = self.visit(root)
+
+    def generic_visit(self, node):
+        # Узел, который не нужно изменять, остаётся на своём месте.
+        return node
+
+    def visit_BlockStatementNode(self, node: BlockStatementNode):
+        node.nodes = self.__fold_all(node.nodes)
+        return node
+
+    def visit_VarDeclarationNode(self, node: VarDeclarationNode):
+        node.declarations = self.__fold_all(node.declarations)
+        return node
+
+    def visit_DeclaratorNode(self, node: DeclaratorNode):
+        if node.init is not None:
+            node.init = self.visit(node.init)
+        return node
+
+    def visit_CallNode(self, node: CallNode):
+        node.args = self.__fold_all(node.args)
+        return node
+
+    def visit_ReturnNode(self, node: ReturnNode):
+        node.argument = self.visit(node.argument)
+        return node
+
+    def visit_FuncDeclarationNode(self, node: FuncDeclarationNode):
+        node.block = self.visit(node.block)
+        return node
+
+    def __fold_all(self, nodes) -> tuple:
+        folded = (self.visit(child) for child in nodes)
+        return tuple(child for child in folded if child is not None)
+
+    def __fold_stmt(self, node, parent: TreeNode):
+        """Свёртка вложенной инструкции. Удалённая инструкция заменяется пустым блоком."""
+        node = self.visit(node)
+        return node if node is not None else BlockStatementNode(parent.row, parent.col)
+
+    def visit_BinExprNode(self, node: BinExprNode):
+        if node.op.value == '=':
+            node.right = self.visit(node.right)
+            return node
+        node.left = self.visit(node.left)
+        node.right = self.visit(node.right)
+        if isinstance(node.left, LiteralNode) and isinstance(node.right, LiteralNode):
+            try:
+                value = operations.BINARY[op_cmd[node.op.value]](node.left.value, node.right.value)
+            except Exception:
+                # Ошибка останется ошибкой времени выполнения, как и без свёртки.
+                return node
+            self.folded += 1
+            return LiteralNode(node.row, node.col, value)
+        return node
+
+    def visit_UnaryExprNode(self, node: UnaryExprNode):
+        # Инкремент и декремент изменяют переменную и не вычисляются. Парсеры создают отрицание только
+        # для переменной (!x), литерал в аргументе появляется только в дереве, построенном без парсера.
+        if node.op.value != '!':
+            return node
+        node.argument = self.visit(node.argument)
+        if isinstance(node.argument, LiteralNode):
+            self.folded += 1
+            return LiteralNode(node.row, node.col, operations.UNARY[NOT](node.argument.value))
+        return node
+
+    def visit_IfNode(self, node: IfNode):
+        node.test = self.visit(node.test)
+        if isinstance(node.test, LiteralNode):
+            # Команда JNZ проверяет условие if по правилам истинности Python.
+            self.pruned += 1
+            branch = node.consequent if node.test.value else node.alternate
+            return self.visit(branch) if branch is not None else None
+        node.consequent = self.__fold_stmt(node.consequent, node)
+        if node.alternate is not None:
+            node.alternate = self.visit(node.alternate)
+        return node
+
+    def visit_WhileNode(self, node: WhileNode):
+        node.test = self.visit(node.test)
+        # Условие цикла проверяется командами NOT, JNZ, поэтому строка, в том числе пустая, считается истинной.
+        if isinstance(node.test, LiteralNode) and operations.not_(node.test.value):
+            self.pruned += 1
+            return None
+        node.block = self.__fold_stmt(node.block, node)
+        return node
+
+    def visit_DoWhileNode(self, node: DoWhileNode):
+        node.test = self.visit(node.test)
+        node.block = self.__fold_stmt(node.block, node)
+        if isinstance(node.test, LiteralNode) and not node.test.value:
+            # Тело выполняется ровно один раз.
+            self.pruned += 1
+            return node.block
+        return node
+
+    def visit_ForNode(self, node: ForNode):
+        node.init = self.visit(node.init)
+        node.update = self.visit(node.update)
+        # Генератор кода проверяет только условие-выражение, любое другое условие (в том числе литерал)
+        # считается истинным.
+        if isinstance(node.test, BinExprNode):
+            node.test = self.visit(node.test)
+            if isinstance(node.test, LiteralNode) and operations.not_(node.test.value):
+                # Выполняется только инициализация.
+                self.pruned += 1
+                return node.init
+        node.block = self.__fold_stmt(node.block, node)
+        return node
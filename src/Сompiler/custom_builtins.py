@@ -1,14 +1,39 @@
 import math
 from random import random
+from typing import Callable, Dict, Tuple
 
+# Реестр встроенных функций: имя -> (функция, количество параметров). Количество параметров указывается
+# при регистрации, поэтому ни анализатору, ни виртуальной машине не нужно исследовать сигнатуру функции.
+BUILTINS: Dict[str, Tuple[Callable, int]] = {}
 
+
+def register(name: str, func: Callable, argc: int):
+    """
+    Регистрирует встроенную функцию name, которая принимает argc параметров. Функция может быть асинхронной
+    (async def): машина приостанавливается до получения её результата, а планировщик (см. Scheduler) тем временем
+    выполняет другие машины.
+    """
+    BUILTINS[name] = (func, argc)
+
+
+def builtin(argc: int):
+    """Декоратор, регистрирующий функцию под её собственным именем."""
+    def decorator(func):
+        register(func.__name__, func, argc)
+        return func
+    return decorator
+
+
+@builtin(1)
 def logprint(to_print):
     print(to_print)
 
 
+@builtin(1)
 def sqrt(val):
     return math.sqrt(val)
 
 
+@builtin(0)
 def rnd():
     return random()
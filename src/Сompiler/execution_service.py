@@ -0,0 +1,297 @@
+import argparse
+import base64
+import binascii
+import io
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stdout
+from typing import Dict, Optional, Tuple
+# Компилятор и виртуальная машина импортируются при загрузке модуля, поэтому процессы-исполнители получают их
+# готовыми и не тратят время на импорт при первом запросе.
+from pipeline import Pipeline
+from Bytecode import Bytecode
+from VirtualMachine import VirtualMachine
+from Limits import Limits
+
+# Pipeline процесса-исполнителя для запросов с исходным кодом, создаётся при первом таком запросе.
+_pipeline: Optional[Pipeline] = None
+
+# Сообщение: длина данных (4 байта, little-endian) и словарь в JSON (UTF-8).
+FRAME = struct.Struct('<I')
+# Наибольшая длина сообщения в байтах: соединение с более длинным сообщением закрывается, не читая его.
+MAX_MESSAGE = 16 * 1024 * 1024
+# Ограничение времени выполнения программы в секундах, если ограничения сервиса не заданы.
+DEFAULT_TIMEOUT = 10.0
+
+
+class ProtocolError(ValueError):
+    """Сообщение не соответствует протоколу сервиса выполнения."""
+
+
+def send_message(sock: socket.socket, message: Dict):
+    data = json.dumps(message).encode()
+    if len(data) > MAX_MESSAGE:
+        raise ProtocolError('Сообщение длиной {} байт больше {}'.format(len(data), MAX_MESSAGE))
+    sock.sendall(FRAME.pack(len(data)) + data)
+
+
+def _receive_exactly(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def receive_message(sock: socket.socket) -> Optional[Dict]:
+    """
+    Возвращает следующее сообщение или None, если соединение закрыто. Вызывает ProtocolError, если сообщение
+    длиннее MAX_MESSAGE или не является словарём в JSON.
+    """
+    header = _receive_exactly(sock, FRAME.size)
+    if header is None:
+        return None
+    size = FRAME.unpack(header)[0]
+    if size > MAX_MESSAGE:
+        raise ProtocolError('Сообщение длиной {} байт больше {}'.format(size, MAX_MESSAGE))
+    data = _receive_exactly(sock, size)
+    if data is None:
+        return None
+    try:
+        message = json.loads(data.decode())
+    except ValueError as e:
+        raise ProtocolError('Сообщение не в формате JSON: {}'.format(e))
+    if not isinstance(message, dict):
+        raise ProtocolError('Сообщение должно быть словарём')
+    return message
+
+
+def _parse_request(request: Dict) -> Tuple[Optional[bytes], Optional[str]]:
+    """Возвращает байткод и исходный код запроса (задано ровно одно из них)."""
+    bytecode, code = request.get('bytecode'), request.get('code')
+    if (bytecode is None) == (code is None):
+        raise ProtocolError('В запросе должно быть ровно одно из полей bytecode и code')
+    if code is not None:
+        if not isinstance(code, str):
+            raise ProtocolError('Поле code должно быть строкой')
+        return None, code
+    if not isinstance(bytecode, str):
+        raise ProtocolError('Поле bytecode должно быть строкой base64')
+    try:
+        return base64.b64decode(bytecode, validate=True), None
+    except binascii.Error as e:
+        raise ProtocolError('Поле bytecode должно быть строкой base64: {}'.format(e))
+
+
+def run_program(data: Optional[bytes], code: Optional[str] = None, limits: Optional[Limits] = None) -> Dict:
+    """
+    Выполняет программу, сериализованную Bytecode.to_bytes(), или, если data не задана, компилирует и выполняет
+    исходный код code, с ограничениями ресурсов limits. Выполняется в процессе-исполнителе.
+    Возвращает словарь: output - вывод программы (logprint), error - ошибка компиляции или выполнения или None,
+    time - время компиляции и выполнения в секундах.
+    """
+    global _pipeline
+    output = io.StringIO()
+    start = time.perf_counter()
+    error = None
+    try:
+        if data is not None:
+            bytecode = Bytecode.from_bytes(data)
+        else:
+            if _pipeline is None:
+                _pipeline = Pipeline()
+            bytecode = _pipeline.compile(code)
+            if bytecode is None:
+                raise ValueError('; '.join(e.message for e in _pipeline.errors))
+        with redirect_stdout(output):
+            VirtualMachine(bytecode, limits=limits).run()
+    except Exception as e:
+        # Ошибка программы не должна завершать процесс-исполнитель.
+        error = '{}: {}'.format(type(e).__name__, e)
+    return {'output': output.getvalue(), 'error': error, 'time': time.perf_counter() - start}
+
+
+def _error(e: Exception) -> Dict:
+    return {'output': '', 'error': '{}: {}'.format(type(e).__name__, e), 'time': 0.0}
+
+
+def _create_pool(workers: int, context=None) -> ProcessPoolExecutor:
+    executor = ProcessPoolExecutor(workers, mp_context=context)
+    # Процессы создаются заранее: первые запросы не ждут их запуска.
+    for future in [executor.submit(os.getpid) for _ in range(workers)]:
+        future.result()
+    return executor
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """
+    Обрабатывает запросы одного соединения по очереди. Запрос: {'id': любое значение, 'bytecode': байты программы
+    в base64} или {'id': ..., 'code': исходный код}. Ответ - результат run_program с тем же id. После сообщения,
+    нарушающего протокол, отправляется ответ с ошибкой и соединение закрывается.
+    """
+    def handle(self):
+        while True:
+            try:
+                request = receive_message(self.request)
+            except ProtocolError as e:
+                send_message(self.request, dict(_error(e), id=None))
+                return
+            if request is None:
+                return
+            try:
+                result = self.server.execute(*_parse_request(request))
+            except Exception as e:
+                result = _error(e)
+            result['id'] = request.get('id')
+            send_message(self.request, result)
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, executor: ProcessPoolExecutor, workers: int, limits: Limits):
+        super().__init__(socket_path, _Handler)
+        self.executor = executor
+        self.workers = workers
+        self.limits = limits
+        self.__lock = threading.Lock()
+
+    def execute(self, data: Optional[bytes], code: Optional[str]) -> Dict:
+        executor = self.executor
+        try:
+            return executor.submit(run_program, data, code, self.limits).result()
+        except BrokenProcessPool:
+            # Процесс-исполнитель аварийно завершился (например, нехватка памяти), и пул больше не принимает
+            # задачи: заменяем его, чтобы следующие запросы выполнялись. Запросы, выполнявшиеся в сломанном
+            # пуле, завершаются с ошибкой.
+            self.__replace_pool(executor)
+            raise
+
+    def __replace_pool(self, broken: ProcessPoolExecutor):
+        with self.__lock:
+            # Пул мог уже заменить другой поток, получивший ту же ошибку.
+            if self.executor is not broken:
+                return
+            # Сервер уже многопоточный, а fork из многопоточной программы небезопасен, поэтому новые процессы
+            # запускаются через spawn.
+            self.executor = _create_pool(self.workers, multiprocessing.get_context('spawn'))
+        broken.shutdown(wait=False)
+
+
+class ExecutionService:
+    """
+    Локальный сервис выполнения программ. Принимает скомпилированные программы через Unix-сокет socket_path
+    и выполняет их в пуле из workers процессов (по умолчанию - по количеству ядер), поэтому независимые программы
+    выполняются параллельно. Каждое соединение обслуживается отдельным потоком, запросы одного соединения
+    выполняются по очереди. Клиент - ExecutionClient.
+    limits - ограничения ресурсов каждой программы (см. Limits), чтобы бесконечный цикл или рекурсия не занимали
+    процесс-исполнитель навсегда. По умолчанию время выполнения ограничено DEFAULT_TIMEOUT секундами; Limits()
+    снимает все ограничения. Если процесс-исполнитель аварийно завершается, пул процессов создаётся заново.
+    """
+    def __init__(self, socket_path: str, workers: Optional[int] = None, limits: Optional[Limits] = None):
+        self.socket_path = socket_path
+        workers = workers or os.cpu_count() or 1
+        # Процессы создаются до запуска потоков сервера: создание процесса из многопоточной программы небезопасно.
+        executor = _create_pool(workers)
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        self.server = _Server(socket_path, executor, workers, limits if limits is not None else
+                              Limits(time=DEFAULT_TIMEOUT))
+        self.__thread = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        return self.server.executor
+
+    def serve_forever(self):
+        self.server.serve_forever()
+
+    def start(self):
+        """Запускает обработку соединений в фоновом потоке."""
+        self.__thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.__thread.start()
+
+    def close(self):
+        if self.__thread is not None:
+            self.server.shutdown()
+            self.__thread.join()
+        self.server.server_close()
+        self.executor.shutdown()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ExecutionClient:
+    """Соединение с ExecutionService. Один клиент не должен использоваться несколькими потоками одновременно."""
+    def __init__(self, socket_path: str):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_path)
+        self.__next_id = 0
+
+    def run(self, bytecode: Bytecode) -> Dict:
+        """Выполняет программу и возвращает результат run_program."""
+        return self.run_bytes(bytecode.to_bytes())
+
+    def run_bytes(self, data: bytes) -> Dict:
+        return self.__request({'bytecode': base64.b64encode(data).decode('ascii')})
+
+    def run_source(self, code: str) -> Dict:
+        """Компилирует исходный код в процессе-исполнителе и выполняет его."""
+        return self.__request({'code': code})
+
+    def __request(self, request: Dict) -> Dict:
+        self.__next_id += 1
+        request['id'] = self.__next_id
+        send_message(self.sock, request)
+        result = receive_message(self.sock)
+        if result is None:
+            raise ConnectionError('Сервис выполнения закрыл соединение')
+        return result
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    arguments = argparse.ArgumentParser(description='Сервис выполнения скомпилированных программ.')
+    arguments.add_argument('socket', help='путь к Unix-сокету')
+    arguments.add_argument('-j', '--jobs', type=int, default=None, help='количество процессов; по умолчанию все ядра')
+    arguments.add_argument('--max-instructions', type=int, default=None, help='наибольшее количество команд')
+    arguments.add_argument('--max-depth', type=int, default=None, help='наибольшая глубина вызовов')
+    arguments.add_argument('--max-stack', type=int, default=None, help='наибольший размер стека')
+    arguments.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                           help='наибольшее время выполнения в секундах, 0 - без ограничения; по умолчанию {}'
+                           .format(DEFAULT_TIMEOUT))
+    args = arguments.parse_args()
+    limits = Limits(args.max_instructions, args.max_depth, args.max_stack, args.timeout or None)
+    service = ExecutionService(args.socket, args.jobs, limits)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
@@ -0,0 +1,158 @@
+from typing import List, Dict, Tuple
+from code_generator import CodeLine
+from Instructions import *
+import Operations as operations
+
+# Команды, после которых управление не переходит к следующей команде.
+TERMINATORS = {JMP, RET, HALT}
+
+
+def jump_targets(lines: List[CodeLine], funcs: Dict[str, int]) -> set:
+    """Адреса, на которые может быть передано управление не с предыдущей команды."""
+    targets = {line.value for line in lines if line.cmd in ADDRESS_ARG}
+    targets.update(funcs.values())
+    return targets
+
+
+def rebuild(lines: List[CodeLine], funcs: Dict[str, int],
+            out: List[Tuple[int, CodeLine]]) -> Tuple[List[CodeLine], Dict[str, int]]:
+    """
+    Возвращает код из списка out из пар (исходный адрес в lines, команда) и таблицу функций с пересчитанными
+    адресами. Адрес удалённой команды переходит к следующей сохранённой команде.
+    """
+    remap = [0] * (len(lines) + 1)
+    position = len(out)
+    remap[len(lines)] = position
+    kept = {index for index, _ in out}
+    for index in range(len(lines) - 1, -1, -1):
+        if index in kept:
+            position -= 1
+        remap[index] = position
+    lines = [line for _, line in out]
+    for line in lines:
+        if line.cmd in ADDRESS_ARG:
+            line.value = remap[line.value]
+    return lines, {name: remap[address] for name, address in funcs.items()}
+
+
+class Optimizer:
+    """
+    Оконный (peephole) оптимизатор байткода. Выполняет до тех пор, пока код меняется:
+    - вычисление констант: PUSH a, PUSH b, <операция> -> PUSH результат; PUSH a, NOT -> PUSH результат;
+      условный переход по константе заменяется на JMP или удаляется;
+    - замену пары NOT, JNZ на JZ;
+    - сокращение цепочек переходов: переход на JMP заменяется переходом сразу на его адрес;
+    - удаление недостижимых команд.
+    После каждого преобразования адреса переходов, вызовов и таблица функций пересчитываются.
+    saved - количество удалённых команд.
+    """
+    def __init__(self, lines: List[CodeLine], funcs: Dict[str, int] = None):
+        self.lines = [CodeLine(line.cmd, line.value) for line in lines]
+        self.funcs = dict(funcs) if funcs else {}
+        size = len(self.lines)
+        changed = True
+        while changed:
+            changed = self.__fold()
+            changed = self.__thread_jumps() or changed
+            changed = self.__remove_unreachable() or changed
+        self.saved = size - len(self.lines)
+
+    def __targets(self) -> set:
+        return jump_targets(self.lines, self.funcs)
+
+    def __fold(self) -> bool:
+        """Вычисление констант и замена NOT, JNZ на JZ за один проход по коду."""
+        targets = self.__targets()
+        # Список пар (исходный адрес, команда). Свёртка выполняется в конце списка после добавления каждой команды.
+        out: List[Tuple[int, CodeLine]] = []
+        changed = False
+        for index, line in enumerate(self.lines):
+            out.append((index, line))
+            while self.__fold_tail(out, targets):
+                changed = True
+        if changed:
+            self.__rebuild(out)
+        return changed
+
+    @staticmethod
+    def __fold_tail(out: List[Tuple[int, CodeLine]], targets: set) -> bool:
+        """Свёртка последних команд списка out. Команды, кроме первой, не должны быть адресами переходов."""
+        def window(n):
+            if len(out) < n or any(index in targets for index, _ in out[-n + 1:]):
+                return None
+            return [line for _, line in out[-n:]]
+
+        def replace(n, *lines):
+            first = out[-n][0]
+            del out[-n:]
+            out.extend((first, line) for line in lines)
+
+        tail = window(3)
+        if tail and tail[0].cmd == PUSH and tail[1].cmd == PUSH and tail[2].cmd in operations.BINARY:
+            try:
+                value = operations.BINARY[tail[2].cmd](tail[0].value, tail[1].value)
+            except Exception:
+                # Ошибка останется ошибкой времени выполнения, как и без оптимизации.
+                return False
+            replace(3, CodeLine(PUSH, value))
+            return True
+        tail = window(2)
+        if not tail:
+            return False
+        if tail[0].cmd == PUSH and tail[1].cmd in operations.UNARY:
+            replace(2, CodeLine(PUSH, operations.UNARY[tail[1].cmd](tail[0].value)))
+            return True
+        if tail[0].cmd == NOT and tail[1].cmd == JNZ:
+            replace(2, CodeLine(JZ, tail[1].value))
+            return True
+        if tail[0].cmd == PUSH and tail[1].cmd in (JNZ, JZ):
+            taken = operations.not_(tail[0].value) if tail[1].cmd == JZ else tail[0].value
+            if taken:
+                replace(2, CodeLine(JMP, tail[1].value))
+            else:
+                replace(2)
+            return True
+        return False
+
+    def __thread_jumps(self) -> bool:
+        """Переход на команду JMP заменяется переходом на её адрес."""
+        changed = False
+        for line in self.lines:
+            if line.cmd not in (JMP, JNZ, JZ):
+                continue
+            target, visited = line.value, set()
+            while target < len(self.lines) and self.lines[target].cmd == JMP and target not in visited:
+                visited.add(target)
+                target = self.lines[target].value
+            if target != line.value:
+                line.value = target
+                changed = True
+        # JMP на следующую команду не нужен.
+        out = [(index, line) for index, line in enumerate(self.lines)
+               if not (line.cmd == JMP and line.value == index + 1)]
+        if len(out) != len(self.lines):
+            self.__rebuild(out)
+            changed = True
+        return changed
+
+    def __remove_unreachable(self) -> bool:
+        """Удаляет команды, недостижимые ни из начала программы, ни из начала какой-либо функции."""
+        reachable = set()
+        pending = [0] + list(self.funcs.values())
+        while pending:
+            index = pending.pop()
+            while index < len(self.lines) and index not in reachable:
+                reachable.add(index)
+                line = self.lines[index]
+                if line.cmd in ADDRESS_ARG:
+                    pending.append(line.value)
+                if line.cmd in TERMINATORS:
+                    break
+                index += 1
+        if len(reachable) == len(self.lines):
+            return False
+        self.__rebuild([(index, line) for index, line in enumerate(self.lines) if index in reachable])
+        return True
+
+    def __rebuild(self, out: List[Tuple[int, CodeLine]]):
+        self.lines, self.funcs = rebuild(self.lines, self.funcs, out)
@@ -0,0 +1,139 @@
+from typing import Iterable, Iterator, List, Optional
+from Parser import Parser
+from SourceReader import read_file, read_mmap
+from semantic_analyzer import Analyzer
+from code_generator import CodeGenerator, CodeLine
+from constant_folder import ConstantFolder
+from optimizer import Optimizer
+from superinstructions import SuperinstructionSelector
+from bytecode_cache import BytecodeCache
+from Bytecode import Bytecode
+
+
+class Pipeline:
+    """
+    Полный цикл компиляции: разбор исходного кода, семантический анализ и генерация байткода.
+    Если задан cache_dir, результат компиляции сохраняется на диск, и повторная компиляция того же
+    исходного кода пропускает все этапы.
+    fold_constants - включает вычисление константных выражений и удаление ветвей с константным условием
+    в синтаксическом дереве (см. ConstantFolder),
+    optimize - включает оконную оптимизацию байткода (см. Optimizer), количество удалённых ею команд
+    сохраняется в saved,
+    superinstructions - включает замену частых последовательностей команд суперинструкциями
+    (см. SuperinstructionSelector), количество удалённых при этом команд сохраняется в fused.
+    backend - способ разбора исходного кода (см. Parser). Деревья не зависят от него, поэтому он не входит
+    в ключ кэша.
+    slot_names - имена переменных последней скомпилированной программы для трассировщика (см. RingBufferTracer):
+    адрес начала функции (0 - основная программа) -> имена в порядке номеров ячеек. Программа из кэша имён
+    не содержит.
+    """
+    def __init__(self, cache_dir: Optional[str] = None, optimize: bool = False, fold_constants: bool = False,
+                 backend: str = 'pyparsing', superinstructions: bool = False):
+        self.optimize = optimize
+        self.superinstructions = superinstructions
+        self.backend = backend
+        self.fold_constants = fold_constants
+        self.cache = BytecodeCache(cache_dir, self.options) if cache_dir else None
+        self.errors = []
+        self.saved = 0
+        self.fused = 0
+        self.funcs = {}
+        self.slot_names = {}
+        self.__parser = None
+
+    @property
+    def options(self) -> str:
+        """Параметры, влияющие на результат компиляции. Используются как часть ключа кэша."""
+        return 'optimize={:d};fold_constants={:d};superinstructions={:d}'.format(
+            self.optimize, self.fold_constants, self.superinstructions)
+
+    def compile(self, code: str) -> Optional[Bytecode]:
+        """Компилирует исходный код. При семантических ошибках возвращает None, а ошибки сохраняет в errors."""
+        self.errors = []
+        self.saved = 0
+        self.fused = 0
+        self.slot_names = {}
+        if self.cache is not None:
+            bytecode = self.cache.get(code)
+            if bytecode is not None:
+                return bytecode
+        # Парсер создаётся только при промахе кэша.
+        if self.__parser is None:
+            self.__parser = Parser(backend=self.backend)
+        root = self.__parser.parse(code)
+        analyzer = Analyzer()
+        analyzer.analyze(root)
+        if len(analyzer.errors) > 0:
+            self.errors = analyzer.errors
+            return None
+        if self.fold_constants:
+            root = ConstantFolder(root).root
+        generator = CodeGenerator(root)
+        lines, funcs = generator.lines, generator.funcs
+        if self.optimize:
+            optimizer = Optimizer(lines, funcs)
+            lines, funcs, self.saved = optimizer.lines, optimizer.funcs, optimizer.saved
+        if self.superinstructions:
+            selector = SuperinstructionSelector(lines, funcs)
+            lines, funcs, self.fused = selector.lines, selector.funcs, selector.fused
+        self.slot_names = self.__addresses(generator.slot_names, funcs)
+        bytecode = Bytecode.from_lines(lines, funcs)
+        if self.cache is not None:
+            self.cache.put(code, bytecode)
+        return bytecode
+
+    def compile_stream(self, blocks: Iterable[str]) -> Iterator[List[CodeLine]]:
+        """
+        Потоковая компиляция кода, который поступает фрагментами blocks (см. SourceReader). Код разбирается,
+        проверяется и компилируется по одной инструкции верхнего уровня, и команды каждой инструкции возвращаются
+        сразу, поэтому в памяти находится только одна инструкция, а не вся программа и её дерево.
+        Функции размещаются там же, где объявлены (см. CodeGenerator.add_statement), по окончании их таблица
+        сохраняется в funcs. Разбор выполняется RecursiveParser независимо от backend (см. Parser.parse_stream).
+        Кэш, оптимизация байткода и суперинструкции не используются: им нужна программа целиком.
+        После первой семантической ошибки команды больше не возвращаются, но анализ продолжается до конца кода,
+        и все ошибки сохраняются в errors.
+        """
+        self.errors = []
+        self.saved = 0
+        self.fused = 0
+        self.funcs = {}
+        self.slot_names = {}
+        if self.__parser is None:
+            self.__parser = Parser(backend=self.backend)
+        analyzer = Analyzer()
+        generator = CodeGenerator()
+        for node in self.__parser.parse_stream(blocks):
+            analyzer.analyze_node(node)
+            # Разрешённые имена хранят ссылки на узлы, а узлы уже скомпилированных инструкций больше не нужны.
+            analyzer.symbols.clear()
+            if len(analyzer.errors) > 0:
+                continue
+            if self.fold_constants:
+                node = ConstantFolder(node).root
+                if node is None:
+                    continue
+            yield generator.add_statement(node)
+        self.errors = analyzer.errors
+        if len(self.errors) == 0:
+            yield generator.finish()
+            self.funcs = generator.funcs
+            self.slot_names = self.__addresses(generator.slot_names, self.funcs)
+
+    @staticmethod
+    def __addresses(slot_names, funcs):
+        """Заменяет имена функций в slot_names генератора кода адресами их первых команд."""
+        # Функции, удалённые оптимизацией как недостижимые, в таблице функций отсутствуют.
+        return {funcs[name] if name else 0: names for name, names in slot_names.items() if not name or name in funcs}
+
+    def compile_file(self, path: str, use_mmap: bool = False) -> Optional[Bytecode]:
+        """
+        Компилирует файл потоково (см. compile_stream) и собирает байткод по частям. Если use_mmap, файл
+        отображается в память. При семантических ошибках возвращает None, а ошибки сохраняет в errors.
+        """
+        bytecode = Bytecode.from_lines([])
+        for lines in self.compile_stream(read_mmap(path) if use_mmap else read_file(path)):
+            bytecode.extend(lines)
+        if len(self.errors) > 0:
+            return None
+        bytecode.funcs = self.funcs
+        return bytecode
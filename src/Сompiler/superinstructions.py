@@ -0,0 +1,74 @@
+from typing import List, Dict, Tuple
+from code_generator import CodeLine
+from optimizer import jump_targets, rebuild
+from Instructions import *
+
+
+def is_one(value) -> bool:
+    """Константа 1 именно целого типа: с 1.0 или True операции дают другой результат."""
+    return type(value) is int and value == 1
+
+
+class SuperinstructionSelector:
+    """
+    Замена частых последовательностей команд суперинструкциями (см. Instructions.py), которые виртуальная машина
+    выполняет за одну диспетчеризацию:
+    - PUSH 1, LOAD_FAST n, ADD, STORE_FAST n -> INC_FAST n (инкремент ++);
+    - LOAD_FAST n, PUSH 1, SUB, STORE_FAST n -> DEC_FAST n (декремент --);
+    - PUSH c, <операция> -> <операция>_CONST c для арифметических операций;
+    - <сравнение>, JZ a и <сравнение>, NOT, JNZ a -> JZ_<сравнение> a (условие цикла).
+    Последовательность заменяется, только если на её команды, кроме первой, нет переходов. Выполняется после
+    Optimizer: суперинструкции не участвуют в вычислении констант.
+    fused - количество удалённых команд.
+    """
+    def __init__(self, lines: List[CodeLine], funcs: Dict[str, int] = None):
+        self.lines = [CodeLine(line.cmd, line.value) for line in lines]
+        self.funcs = dict(funcs) if funcs else {}
+        targets = jump_targets(self.lines, self.funcs)
+        out: List[Tuple[int, CodeLine]] = []
+        for index, line in enumerate(self.lines):
+            out.append((index, line))
+            while self.__select_tail(out, targets):
+                pass
+        size = len(self.lines)
+        if len(out) != size:
+            self.lines, self.funcs = rebuild(self.lines, self.funcs, out)
+        self.fused = size - len(self.lines)
+
+    @staticmethod
+    def __select_tail(out: List[Tuple[int, CodeLine]], targets: set) -> bool:
+        """Замена последних команд списка out. Команды, кроме первой, не должны быть адресами переходов."""
+        def window(n):
+            if len(out) < n or any(index in targets for index, _ in out[-n + 1:]):
+                return None
+            return [line for _, line in out[-n:]]
+
+        def replace(n, line):
+            first = out[-n][0]
+            del out[-n:]
+            out.append((first, line))
+
+        tail = window(4)
+        if tail and tail[0].cmd == PUSH and is_one(tail[0].value) and tail[1].cmd == LOAD_FAST \
+                and tail[2].cmd == ADD and tail[3].cmd == STORE_FAST and tail[1].value == tail[3].value:
+            replace(4, CodeLine(INC_FAST, tail[3].value))
+            return True
+        tail = window(3)
+        # PUSH 1, SUB к этому моменту уже заменены на SUB_CONST 1.
+        if tail and tail[0].cmd == LOAD_FAST and tail[1].cmd == SUB_CONST and is_one(tail[1].value) \
+                and tail[2].cmd == STORE_FAST and tail[0].value == tail[2].value:
+            replace(3, CodeLine(DEC_FAST, tail[2].value))
+            return True
+        if tail and tail[0].cmd in COMPARE_JZ and tail[1].cmd == NOT and tail[2].cmd == JNZ:
+            replace(3, CodeLine(COMPARE_JZ[tail[0].cmd], tail[2].value))
+            return True
+        tail = window(2)
+        if not tail:
+            return False
+        if tail[0].cmd == PUSH and tail[1].cmd in WITH_CONST:
+            replace(2, CodeLine(WITH_CONST[tail[1].cmd], tail[0].value))
+            return True
+        if tail[0].cmd in COMPARE_JZ and tail[1].cmd == JZ:
+            replace(2, CodeLine(COMPARE_JZ[tail[0].cmd], tail[1].value))
+            return True
+        return False
@@ -0,0 +1,14 @@
+"""
+Тесты компилятора и виртуальной машины.
+Запуск из корня репозитория: python -m unittest (или python -m pytest tests). При запуске discover из каталога tests
+модули тестов загружаются вне пакета tests и пути к модулям проекта не добавляются.
+"""
+import os
+import sys
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Модули проекта импортируются без пакетов, поэтому добавляем их каталоги в sys.path. Корень репозитория нужен
+# для импорта tests.fixtures.
+for _path in [os.path.join(_ROOT, 'src', _dir) for _dir in ('AST', 'Semantics', 'VM', 'Сompiler')] + [_ROOT]:
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
@@ -0,0 +1,185 @@
+"""
+Общие данные тестов: программы из tests/programs и benchmarks/corpus, а также примеры и генератор случайных
+программ для сравнения способов разбора Parser (их использует и python -m benchmarks.parser_diff).
+"""
+import os
+import random
+from enum import Enum
+
+from pyparsing import ParseException, ParseResults
+from Nodes import TreeNode
+from Parser import Parser
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROGRAMS = os.path.join(_ROOT, 'tests', 'programs')
+CORPUS = os.path.join(_ROOT, 'benchmarks', 'corpus')
+
+
+def programs():
+    """Имя программы (каталог/файл) -> (путь к файлу, исходный код)."""
+    result = {}
+    for directory in (PROGRAMS, CORPUS):
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.js'):
+                path = os.path.join(directory, name)
+                with open(path, encoding='utf-8') as file:
+                    result[os.path.join(os.path.basename(directory), name)] = path, file.read()
+    return result
+
+
+SAMPLES = [
+    '',
+    '   \n  ',
+    'var a = 1, b, c = "s";',
+    'x = a + b * c - d;',
+    'x = a / 2; y = a *  "s"; z = a %  (b); w = a ** -1.5 * .5;',
+    'x = -1.5 + .5; y = +1.5; z = 1.5;',
+    'x = a ++1.5 * 3; y = a --.5; z = a+-1; w = a - -1.5;',
+    'x = a <= b >= c < d > e == f != g && h || i;',
+    'if (x) y = 1; else { y = 2; }',
+    'if (x) ; else y = 1;',
+    'if (x); if (y) x = 1; else ;',
+    'for (;;) ;',
+    'for (i = 0, j = 1; i < 3; i++, j--) { logprint(i); }',
+    'for (var i = 0, j; i; ) x = 1;',
+    'for (var; x; ) ;',
+    'while (x < 3) x++; do { x--; } while (x)',
+    'function f( a , b ) { return a *\n  2; }\nfunction g(  ) {}\nfunction h(a + 1) {}',
+    'return (x); return x + 1;',
+    'var$x = 1; if$ = 2; do$(1);',
+    'x = "a\\\\b\\"c\\nd"; y = "//"; // comment\n/* comment */ z = 1;',
+    'f(); f(1, 2, (3 + 4) * 5); f(1, );',
+    'x = f(a b); x = a === b; x = a &&& b; x = !a;',
+    'var a = 1\nvar b = 2;',
+    '{ { x = 1; } ;;; }',
+    '\tvar a = "\t";\n\tif (a)\t{ b = a *\t2; }\r\nc = 1;\rd = 2;',
+    'x = é; é = 1; привет = 1;',
+]
+
+_IDENTS = ['a', 'b', 'x', 'i', 'n', 'f', 'g', 'logprint', 'var', 'if', 'do', 'while', 'return', 'for', 'else',
+           'function', '_t1']
+_BINARY = ['+', '-', '*', '/', '%', '**', '<', '>', '<=', '>=', '==', '!=', '&&', '||']
+_SPACES = ['', ' ', ' ', '  ', '\n', ' \n ', '\r\n', '\t', ' \t ']
+
+
+class Generator:
+    """Случайные программы по грамматике языка со случайными пробелами между лексемами."""
+    def __init__(self, rnd: random.Random):
+        self.rnd = rnd
+
+    def sp(self) -> str:
+        return self.rnd.choice(_SPACES)
+
+    def join(self, *parts) -> str:
+        return ''.join(part + self.sp() for part in parts)
+
+    def literal(self) -> str:
+        choice = self.rnd.randrange(5)
+        if choice == 0:
+            return '"' + self.rnd.choice(['', 's', 'a b', '\\"q\\"', '\\\\', '//x']) + '"'
+        if choice == 1:
+            return self.rnd.choice(['-1.5', '.5', '+2.', '1.5', '-.25'])
+        return str(self.rnd.randrange(1000))
+
+    def expr(self, depth: int = 0) -> str:
+        choice = self.rnd.randrange(6 if depth < 4 else 3)
+        if choice == 0:
+            return self.literal()
+        if choice in (1, 2):
+            return self.rnd.choice(_IDENTS)
+        if choice == 3:
+            return self.join('(', self.expr(depth + 1), ')')
+        if choice == 4:
+            args = [self.expr(depth + 1) for _ in range(self.rnd.randrange(3))]
+            return self.join(self.rnd.choice(_IDENTS), '(', (',' + self.sp()).join(args), ')')
+        return self.join(self.expr(depth + 1), self.rnd.choice(_BINARY), self.expr(depth + 1))
+
+    def simple(self) -> str:
+        ident = self.rnd.choice(_IDENTS)
+        choice = self.rnd.randrange(4)
+        if choice == 0:
+            return self.join(ident, '=', self.expr())
+        if choice == 1:
+            return self.join(ident, self.rnd.choice(['++', '--']))
+        return self.join(ident, '(', (',' + self.sp()).join(self.expr() for _ in range(self.rnd.randrange(3))), ')')
+
+    def var(self) -> str:
+        items = [self.join(self.rnd.choice(_IDENTS), '=', self.expr()) if self.rnd.random() < 0.5
+                 else self.rnd.choice(_IDENTS) for _ in range(1 + self.rnd.randrange(3))]
+        return self.join('var', (',' + self.sp()).join(items))
+
+    def stmt(self, depth: int = 0) -> str:
+        choice = self.rnd.randrange(10 if depth < 3 else 3)
+        if choice == 0:
+            return self.join(self.var(), ';')
+        if choice in (1, 2):
+            return self.join(self.simple(), ';')
+        if choice == 3:
+            alternate = self.join('else', self.stmt(depth + 1)) if self.rnd.random() < 0.5 else ''
+            return self.join('if', '(', self.expr(), ')', self.stmt(depth + 1), alternate)
+        if choice == 4:
+            return self.join('while', '(', self.expr(), ')', self.stmt(depth + 1))
+        if choice == 5:
+            return self.join('do', self.stmt(depth + 1), 'while', '(', self.expr(), ')')
+        if choice == 6:
+            init = self.var() if self.rnd.random() < 0.3 else \
+                (',' + self.sp()).join(self.simple() for _ in range(self.rnd.randrange(3)))
+            test = self.expr() if self.rnd.random() < 0.7 else ''
+            update = (',' + self.sp()).join(self.simple() for _ in range(self.rnd.randrange(3)))
+            body = self.stmt(depth + 1) if self.rnd.random() < 0.8 else ';'
+            return self.join('for', '(', init, ';', test, ';', update, ')', body)
+        if choice == 7:
+            return self.join('{', self.block(depth + 1), '}')
+        if choice == 8:
+            params = (',' + self.sp()).join(self.rnd.choice(_IDENTS) for _ in range(self.rnd.randrange(3)))
+            return self.join('function', self.rnd.choice(_IDENTS), '(', params, ')', '{', self.block(depth + 1), '}')
+        return self.join('return', self.expr())
+
+    def block(self, depth: int = 0) -> str:
+        return ''.join(self.stmt(depth) + self.rnd.choice(['', ';']) for _ in range(self.rnd.randrange(4)))
+
+    def program(self) -> str:
+        return self.sp() + self.block()
+
+    def mutate(self, code: str) -> str:
+        """Удаляет, дублирует или заменяет случайный фрагмент программы."""
+        if not code:
+            return code
+        i = self.rnd.randrange(len(code))
+        j = min(len(code), i + self.rnd.randrange(1, 4))
+        choice = self.rnd.randrange(3)
+        if choice == 0:
+            return code[:i] + code[j:]
+        if choice == 1:
+            return code[:j] + code[i:]
+        return code[:i] + self.rnd.choice(['(', ')', ';', '+', '=', '"', '.', '1', 'a', '{', ' ']) + code[j:]
+
+
+def fields(node: TreeNode):
+    """Открытые атрибуты узла из __slots__ его класса и родительских классов."""
+    return [name for cls in type(node).__mro__ for name in getattr(cls, '__slots__', ())
+            if not name.startswith('_')]
+
+
+def dump(value):
+    """Представление дерева, в котором учитываются все атрибуты узлов и типы значений."""
+    if isinstance(value, TreeNode):
+        attrs = sorted((name, getattr(value, name)) for name in fields(value))
+        return type(value).__name__, value.row, value.col, tuple((name, dump(attr)) for name, attr in attrs)
+    if isinstance(value, ParseResults):
+        return 'ParseResults', tuple(dump(item) for item in value)
+    if isinstance(value, (tuple, list)):
+        return tuple(dump(item) for item in value)
+    if isinstance(value, Enum):
+        return value.value
+    return type(value).__name__, value
+
+
+def parse(parser: Parser, code: str):
+    try:
+        return dump(parser.parse(code))
+    except ParseException as error:
+        return 'ошибка', error.loc
+
+
+PARSERS = {backend: Parser(backend=backend) for backend in Parser.BACKENDS}
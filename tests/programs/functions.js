@@ -0,0 +1,40 @@
+function fib(n) {
+    if (n < 2) { return n; }
+    return fib(n - 1) + fib(n - 2);
+}
+function dive(n) {
+    if (n == 0) { return 0; }
+    return 1 + dive(n - 1);
+}
+function mix(a, b) {
+    var r = a + b;
+    logprint(r);
+    logprint(a - b);
+    logprint(a < b);
+    logprint(a == b);
+    logprint(a && b);
+    logprint(a || b);
+    var c = 0;
+    while (c < b) { c++; if (c > 50) { c = b; } }
+    return c * 2 + r;
+}
+function show(x) { logprint(x); }
+function work(n) {
+    var s = 0;
+    for (var i = 0; i < n; i++) { s = s + i * 3 - 1; if (s > 1000) { s = s - 1000; } }
+    return s;
+}
+var i = 0;
+while (i < 6) {
+    logprint(mix(i, 3));
+    logprint(mix("s", i));
+    logprint(mix(i, "2"));
+    show(i);
+    logprint(dive(i * 150));
+    logprint(work(i * 40));
+    i++;
+}
+for (var j = 0; j < 3; j++) {
+    logprint(fib(j + 10));
+}
+logprint(dive(900));
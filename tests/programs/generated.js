@@ -0,0 +1,91 @@
+var acc = 0;
+function f0(a, b) { var t = a * 0 + b; if (t > 0) { t = t - b; } return t; }
+function f1(a, b) { var t = a * 1 + b; if (t > 1) { t = t - b; } return t; }
+function f2(a, b) { var t = a * 2 + b; if (t > 2) { t = t - b; } return t; }
+function f3(a, b) { var t = a * 3 + b; if (t > 3) { t = t - b; } return t; }
+function f4(a, b) { var t = a * 4 + b; if (t > 4) { t = t - b; } return t; }
+function f5(a, b) { var t = a * 5 + b; if (t > 5) { t = t - b; } return t; }
+function f6(a, b) { var t = a * 6 + b; if (t > 6) { t = t - b; } return t; }
+function f7(a, b) { var t = a * 7 + b; if (t > 7) { t = t - b; } return t; }
+function f8(a, b) { var t = a * 8 + b; if (t > 8) { t = t - b; } return t; }
+function f9(a, b) { var t = a * 9 + b; if (t > 9) { t = t - b; } return t; }
+function f10(a, b) { var t = a * 10 + b; if (t > 10) { t = t - b; } return t; }
+function f11(a, b) { var t = a * 11 + b; if (t > 11) { t = t - b; } return t; }
+function f12(a, b) { var t = a * 12 + b; if (t > 12) { t = t - b; } return t; }
+function f13(a, b) { var t = a * 13 + b; if (t > 13) { t = t - b; } return t; }
+function f14(a, b) { var t = a * 14 + b; if (t > 14) { t = t - b; } return t; }
+function f15(a, b) { var t = a * 15 + b; if (t > 15) { t = t - b; } return t; }
+function f16(a, b) { var t = a * 16 + b; if (t > 16) { t = t - b; } return t; }
+function f17(a, b) { var t = a * 17 + b; if (t > 17) { t = t - b; } return t; }
+function f18(a, b) { var t = a * 18 + b; if (t > 18) { t = t - b; } return t; }
+function f19(a, b) { var t = a * 19 + b; if (t > 19) { t = t - b; } return t; }
+function f20(a, b) { var t = a * 20 + b; if (t > 20) { t = t - b; } return t; }
+function f21(a, b) { var t = a * 21 + b; if (t > 21) { t = t - b; } return t; }
+function f22(a, b) { var t = a * 22 + b; if (t > 22) { t = t - b; } return t; }
+function f23(a, b) { var t = a * 23 + b; if (t > 23) { t = t - b; } return t; }
+function f24(a, b) { var t = a * 24 + b; if (t > 24) { t = t - b; } return t; }
+function f25(a, b) { var t = a * 25 + b; if (t > 25) { t = t - b; } return t; }
+function f26(a, b) { var t = a * 26 + b; if (t > 26) { t = t - b; } return t; }
+function f27(a, b) { var t = a * 27 + b; if (t > 27) { t = t - b; } return t; }
+function f28(a, b) { var t = a * 28 + b; if (t > 28) { t = t - b; } return t; }
+function f29(a, b) { var t = a * 29 + b; if (t > 29) { t = t - b; } return t; }
+acc = acc + f0(acc, 0);
+if (acc > 100000) { acc = acc - 100000 + 0; } else { acc = acc + 1; }
+acc = acc + f1(acc, 1);
+if (acc > 100000) { acc = acc - 100000 + 1; } else { acc = acc + 1; }
+acc = acc + f2(acc, 2);
+if (acc > 100000) { acc = acc - 100000 + 2; } else { acc = acc + 1; }
+acc = acc + f3(acc, 3);
+if (acc > 100000) { acc = acc - 100000 + 3; } else { acc = acc + 1; }
+acc = acc + f4(acc, 4);
+if (acc > 100000) { acc = acc - 100000 + 4; } else { acc = acc + 1; }
+acc = acc + f5(acc, 5);
+if (acc > 100000) { acc = acc - 100000 + 5; } else { acc = acc + 1; }
+acc = acc + f6(acc, 6);
+if (acc > 100000) { acc = acc - 100000 + 6; } else { acc = acc + 1; }
+acc = acc + f7(acc, 7);
+if (acc > 100000) { acc = acc - 100000 + 7; } else { acc = acc + 1; }
+acc = acc + f8(acc, 8);
+if (acc > 100000) { acc = acc - 100000 + 8; } else { acc = acc + 1; }
+acc = acc + f9(acc, 9);
+if (acc > 100000) { acc = acc - 100000 + 9; } else { acc = acc + 1; }
+acc = acc + f10(acc, 10);
+if (acc > 100000) { acc = acc - 100000 + 10; } else { acc = acc + 1; }
+acc = acc + f11(acc, 11);
+if (acc > 100000) { acc = acc - 100000 + 11; } else { acc = acc + 1; }
+acc = acc + f12(acc, 12);
+if (acc > 100000) { acc = acc - 100000 + 12; } else { acc = acc + 1; }
+acc = acc + f13(acc, 13);
+if (acc > 100000) { acc = acc - 100000 + 13; } else { acc = acc + 1; }
+acc = acc + f14(acc, 14);
+if (acc > 100000) { acc = acc - 100000 + 14; } else { acc = acc + 1; }
+acc = acc + f15(acc, 15);
+if (acc > 100000) { acc = acc - 100000 + 15; } else { acc = acc + 1; }
+acc = acc + f16(acc, 16);
+if (acc > 100000) { acc = acc - 100000 + 16; } else { acc = acc + 1; }
+acc = acc + f17(acc, 17);
+if (acc > 100000) { acc = acc - 100000 + 17; } else { acc = acc + 1; }
+acc = acc + f18(acc, 18);
+if (acc > 100000) { acc = acc - 100000 + 18; } else { acc = acc + 1; }
+acc = acc + f19(acc, 19);
+if (acc > 100000) { acc = acc - 100000 + 19; } else { acc = acc + 1; }
+acc = acc + f20(acc, 20);
+if (acc > 100000) { acc = acc - 100000 + 20; } else { acc = acc + 1; }
+acc = acc + f21(acc, 21);
+if (acc > 100000) { acc = acc - 100000 + 21; } else { acc = acc + 1; }
+acc = acc + f22(acc, 22);
+if (acc > 100000) { acc = acc - 100000 + 22; } else { acc = acc + 1; }
+acc = acc + f23(acc, 23);
+if (acc > 100000) { acc = acc - 100000 + 23; } else { acc = acc + 1; }
+acc = acc + f24(acc, 24);
+if (acc > 100000) { acc = acc - 100000 + 24; } else { acc = acc + 1; }
+acc = acc + f25(acc, 25);
+if (acc > 100000) { acc = acc - 100000 + 25; } else { acc = acc + 1; }
+acc = acc + f26(acc, 26);
+if (acc > 100000) { acc = acc - 100000 + 26; } else { acc = acc + 1; }
+acc = acc + f27(acc, 27);
+if (acc > 100000) { acc = acc - 100000 + 27; } else { acc = acc + 1; }
+acc = acc + f28(acc, 28);
+if (acc > 100000) { acc = acc - 100000 + 28; } else { acc = acc + 1; }
+acc = acc + f29(acc, 29);
+if (acc > 100000) { acc = acc - 100000 + 29; } else { acc = acc + 1; }
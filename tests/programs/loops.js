@@ -0,0 +1,31 @@
+var i = 0;
+var s = "a";
+while (i < 5) {
+    s = s + i;
+    i++;
+}
+logprint(s);
+var k = 10;
+do { k--; } while (k > 7)
+logprint(k);
+var total = 0;
+for (var a = 0; a < 30; a++) {
+    var b = 0;
+    while (b < 4) {
+        total = total + a * b - b;
+        b++;
+    }
+    if (total > 500) { total = total - 500; } else { total = total + 1; }
+}
+logprint(total);
+var c = 0;
+while (c < "5") { c++; }
+logprint(c);
+var m = 7;
+while (m != 0) { m = m - 1; if (m == 3) { c = c * 2; } }
+logprint(c);
+var z = "q";
+z++;
+logprint(z);
+for (var j = 10; j >= 0; j--) { c = c + j * 2 - 1 / 4; }
+logprint(c);
@@ -0,0 +1,28 @@
+var s = "a";
+var n = 7;
+var u;
+logprint(s + n);
+logprint(n + s);
+logprint(s - n);
+logprint(s * 2);
+logprint(u + 1);
+logprint(u - 1);
+logprint(n / 2);
+logprint(10 % 3);
+logprint(2 ** 10);
+logprint(1 == "1");
+logprint(1 != "1");
+logprint("b" > "a");
+logprint("b" > 1);
+logprint(3 >= 3 && 2 < 1);
+logprint(0 || "x");
+logprint(2 * 60 * 60 + 1);
+logprint("x" + 2 * 3);
+if (0) { logprint("dead"); } else { logprint("alive"); }
+if ("") { logprint("never"); }
+while (0) { logprint("never"); }
+while ("" == "x") { logprint("never"); }
+for (var i = 0; 1 > 2; i++) { logprint("never"); }
+do { logprint("once"); } while (0)
+var t = 3 > 2 && 2 > 1;
+logprint(t);
@@ -0,0 +1,56 @@
+"""Ограничения ресурсов виртуальной машины (Limits)."""
+import unittest
+
+from pipeline import Pipeline
+from VirtualMachine import VirtualMachine
+from Profiler import Profiler
+from Limits import Limits, InstructionLimitExceeded, CallDepthExceeded, StackLimitExceeded, \
+    TimeLimitExceeded
+
+INFINITE_LOOP = 'var i = 0; while (i < 1) { i = i + 0; }'
+# Бесконечная рекурсия: стек операндов растёт на значение n в каждом вызове.
+INFINITE_RECURSION = 'function f(n) { return n + f(n); } var x = f(1);'
+RECURSION = 'function f(n) { if (n < 1) { return 0; } return 1 + f(n - 1); } var x = f(10);'
+LOOP = 'var s = 0; for (var i = 0; i < 100; i++) { s = s + i; }'
+
+
+def run(code, limits):
+    vm = VirtualMachine(Pipeline().compile(code), limits=limits)
+    vm.run()
+    return vm
+
+
+class LimitsTest(unittest.TestCase):
+    def test_instructions(self):
+        with self.assertRaises(InstructionLimitExceeded):
+            run(INFINITE_LOOP, Limits(instructions=10000))
+        # Программа, которая выполняет ровно столько команд, сколько разрешено, завершается.
+        profiler = Profiler()
+        VirtualMachine(Pipeline().compile(LOOP), profiler=profiler).run()
+        executed = sum(profiler.counts)
+        self.assertEqual(run(LOOP, Limits(instructions=executed)).get_current_context().snapshot()[1], [4950, 100])
+        with self.assertRaises(InstructionLimitExceeded):
+            run(LOOP, Limits(instructions=executed // 2))
+
+    def test_call_depth(self):
+        with self.assertRaises(CallDepthExceeded):
+            run(INFINITE_RECURSION, Limits(call_depth=50))
+        run(RECURSION, Limits(call_depth=11))
+        with self.assertRaises(CallDepthExceeded):
+            run(RECURSION, Limits(call_depth=10))
+
+    def test_stack_size(self):
+        with self.assertRaises(StackLimitExceeded):
+            run(INFINITE_RECURSION, Limits(stack_size=100))
+
+    def test_time(self):
+        with self.assertRaises(TimeLimitExceeded):
+            run(INFINITE_LOOP, Limits(time=0.05))
+
+    def test_within_limits(self):
+        vm = run(RECURSION, Limits(instructions=10 ** 6, call_depth=100, stack_size=100, time=10))
+        self.assertEqual(vm.get_current_context().snapshot()[1], [10])
+
+
+if __name__ == '__main__':
+    unittest.main()
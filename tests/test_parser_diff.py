@@ -0,0 +1,48 @@
+"""
+Способ разбора 'recursive' строит те же деревья, что и 'pyparsing', включая позиции узлов, и отвергает те же
+программы с той же позицией ошибки. Для случайного поиска расхождений - python -m benchmarks.parser_diff.
+"""
+import random
+import unittest
+
+from tests.fixtures import Generator, SAMPLES, PARSERS, parse, programs
+
+# Количество случайных программ и seed: набор одинаков при каждом запуске.
+RANDOM_PROGRAMS = 200
+SEED = 1
+
+
+class ParserDiffTest(unittest.TestCase):
+    def assertSameParse(self, code):
+        expected = parse(PARSERS['pyparsing'], code)
+        actual = parse(PARSERS['recursive'], code)
+        self.assertEqual(expected, actual, msg=repr(code))
+
+    def test_corpus(self):
+        for name, (path, code) in programs().items():
+            with self.subTest(name):
+                self.assertNotEqual(parse(PARSERS['recursive'], code)[0], 'ошибка')
+                self.assertSameParse(code)
+
+    def test_samples(self):
+        for code in SAMPLES:
+            with self.subTest(code):
+                self.assertSameParse(code)
+
+    def test_random_programs(self):
+        gen = Generator(random.Random(SEED))
+        for i in range(RANDOM_PROGRAMS):
+            code = gen.program()
+            with self.subTest(i):
+                self.assertSameParse(code)
+                self.assertSameParse(gen.mutate(code))
+
+    def test_error_position(self):
+        # Ошибка указывает на начало первой инструкции, которую не удалось разобрать.
+        code = 'var a = 1;\nx = f(a b);'
+        self.assertEqual(parse(PARSERS['pyparsing'], code), ('ошибка', code.index('x')))
+        self.assertSameParse(code)
+
+
+if __name__ == '__main__':
+    unittest.main()
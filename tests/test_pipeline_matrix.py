@@ -0,0 +1,84 @@
+"""
+Все режимы компиляции и выполнения дают тот же результат, что и компиляция без оптимизаций: тот же вывод программы,
+то же содержимое стека и те же переменные основной программы. Проверяются программы из tests/programs
+и каталога benchmarks/corpus.
+"""
+import io
+import random
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from pipeline import Pipeline
+from Bytecode import Bytecode
+from VirtualMachine import VirtualMachine
+from FunctionCompiler import FunctionCompiler
+from Limits import Limits
+from tests.fixtures import programs
+
+# Параметры Pipeline, с которыми компилируется каждая программа.
+OPTIONS = {
+    'optimize': dict(optimize=True),
+    'fold_constants': dict(fold_constants=True),
+    'optimize+fold_constants': dict(optimize=True, fold_constants=True),
+    'recursive': dict(backend='recursive'),
+    'superinstructions': dict(superinstructions=True),
+    'optimize+superinstructions': dict(optimize=True, superinstructions=True),
+    'all': dict(optimize=True, fold_constants=True, superinstructions=True, backend='recursive'),
+}
+
+
+def execute(code, **vm_options):
+    """Вывод программы, стек и переменные основной программы после выполнения."""
+    output = io.StringIO()
+    # Встроенная функция rnd должна возвращать одни и те же значения при каждом выполнении.
+    random.seed(0)
+    with redirect_stdout(output):
+        vm = VirtualMachine(code, **vm_options)
+        vm.run()
+    return output.getvalue(), list(vm._stack), vm.get_current_context().snapshot()
+
+
+def builds(path, code):
+    """Название режима компиляции -> байткод программы."""
+    result = {name: Pipeline(**options).compile(code) for name, options in OPTIONS.items()}
+    bytecode = Pipeline().compile(code)
+    result['to_bytes'] = Bytecode.from_bytes(bytecode.to_bytes())
+    result['to_lines'] = bytecode.to_lines()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        Pipeline(cache_dir).compile(code)
+        result['cache'] = Pipeline(cache_dir).compile(code)
+    result['stream'] = Pipeline().compile_file(path)
+    result['stream+fold_constants'] = Pipeline(fold_constants=True).compile_file(path)
+    result['stream+mmap'] = Pipeline().compile_file(path, use_mmap=True)
+    return result
+
+
+class PipelineMatrixTest(unittest.TestCase):
+    # Режимы выполнения: параметры VirtualMachine.
+    # FunctionCompiler(1) компилирует функции при первом вызове, порог по умолчанию оставляет часть вызовов
+    # интерпретатору.
+    VM_MODES = {
+        'interpreter': {},
+        'compiler': dict(compiler=FunctionCompiler(1)),
+        'compiler+threshold': dict(compiler=FunctionCompiler()),
+    }
+
+    def test_same_result(self):
+        for name, (path, code) in programs().items():
+            expected = execute(Pipeline().compile(code))
+            for build, bytecode in builds(path, code).items():
+                self.assertIsNotNone(bytecode, msg='{} {}'.format(name, build))
+                for mode, vm_options in self.VM_MODES.items():
+                    with self.subTest(program=name, build=build, vm=mode):
+                        self.assertEqual(execute(bytecode, **vm_options), expected)
+
+    def test_compiler_with_limits(self):
+        # Скомпилированные функции выполняются без проверок ограничений.
+        bytecode = Pipeline().compile('var a = 1;')
+        with self.assertRaises(ValueError):
+            VirtualMachine(bytecode, limits=Limits(instructions=10), compiler=FunctionCompiler())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""Отчёт профилировщика виртуальной машины (Profiler)."""
+import io
+import json
+import unittest
+
+from pipeline import Pipeline
+from VirtualMachine import VirtualMachine
+from Profiler import Profiler
+from Instructions import *
+
+PROGRAM = """
+var i = 0, s = 0;
+function f(x) { return x + 1; }
+function fact(n) { if (n < 2) { return 1; } return n * fact(n - 1); }
+while (i < 3) { s = s + f(i); i++; }
+s = s + fact(4);
+"""
+
+
+class ProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.bytecode = Pipeline().compile(PROGRAM)
+        self.profiler = Profiler()
+        self.vm = VirtualMachine(self.bytecode, profiler=self.profiler)
+        self.vm.run()
+
+    def test_result(self):
+        # Профилировщик не меняет результат программы.
+        self.assertEqual(self.vm.get_current_context().snapshot(), ({}, [3, 30]))
+
+    def test_instruction_counts(self):
+        funcs = self.bytecode.funcs
+        self.assertEqual(self.profiler.counts[0], 1)
+        self.assertEqual(self.profiler.counts[funcs['f']], 3)
+        self.assertEqual(self.profiler.counts[funcs['fact']], 4)
+        opcodes = self.profiler.opcodes()
+        self.assertEqual(opcodes[CALL]['count'], 7)
+        self.assertEqual(opcodes[RET]['count'], 7)
+        self.assertEqual(opcodes[HALT]['count'], 1)
+        self.assertEqual(sum(stats['count'] for stats in opcodes.values()), sum(self.profiler.counts))
+
+    def test_functions(self):
+        functions = self.profiler.functions()
+        self.assertEqual(set(functions), {'f', 'fact'})
+        self.assertEqual(functions['f']['calls'], 3)
+        self.assertEqual(functions['fact']['calls'], 4)
+        for stats in functions.values():
+            # Время рекурсивной функции учитывается один раз, поэтому оно не меньше собственного времени.
+            self.assertGreater(stats['self_time'], 0)
+            self.assertGreaterEqual(stats['time'], stats['self_time'])
+
+    def test_hot_loops(self):
+        loops = self.profiler.hot_loops()
+        self.assertEqual(len(loops), 1)
+        loop = loops[0]
+        self.assertEqual(loop['iterations'], 3)
+        self.assertEqual(self.profiler.code[loop['end']], (JMP, loop['start']))
+        # Условие цикла проверяется перед каждой итерацией и ещё раз перед выходом.
+        self.assertEqual(self.profiler.counts[loop['start']], 4)
+
+    def test_report(self):
+        report = json.loads(json.dumps(self.profiler.report()))
+        self.assertEqual(report['functions']['fact']['calls'], 4)
+        self.assertTrue(all(entry['count'] for entry in report['addresses']))
+        self.assertEqual(len(report['addresses']), sum(1 for count in self.profiler.counts if count))
+
+    def test_collapsed_stacks(self):
+        output = io.StringIO()
+        self.profiler.dump_collapsed(output)
+        stacks = [line.rsplit(' ', 1)[0] for line in output.getvalue().splitlines()]
+        self.assertEqual(stacks, ['main', 'main;f', 'main;fact', 'main;fact;fact', 'main;fact;fact;fact',
+                                  'main;fact;fact;fact;fact'])
+
+
+if __name__ == '__main__':
+    unittest.main()
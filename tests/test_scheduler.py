@@ -0,0 +1,108 @@
+"""Пошаговое выполнение (VirtualMachine.step и resume), асинхронные встроенные функции и планировщик Scheduler."""
+import asyncio
+import io
+import unittest
+from contextlib import redirect_stdout
+
+import custom_builtins
+from pipeline import Pipeline
+from VirtualMachine import VirtualMachine
+from Scheduler import Scheduler
+
+LOOP = 'var s = 0; for (var i = 0; i < 100; i++) { s = s + i; }'
+
+
+class StepTest(unittest.TestCase):
+    def test_pause(self):
+        vm = VirtualMachine(Pipeline().compile(LOOP))
+        self.assertTrue(vm.step(5))
+        self.assertEqual(vm._cur_line_id, 5)
+        self.assertFalse(vm.finished)
+
+    def test_same_result_as_run(self):
+        bytecode = Pipeline().compile(LOOP)
+        expected = VirtualMachine(bytecode)
+        expected.run()
+        for n in (1, 7, 1000):
+            with self.subTest(n=n):
+                vm = VirtualMachine(bytecode)
+                steps = 0
+                while vm.step(n):
+                    steps += 1
+                self.assertTrue(vm.finished)
+                self.assertFalse(vm.step(n))
+                self.assertEqual(vm.get_current_context().snapshot(), expected.get_current_context().snapshot())
+                if n == 1:
+                    # Каждая команда выполняется отдельным шагом.
+                    self.assertGreater(steps, 100)
+
+
+class AsyncBuiltinTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        async def double(value):
+            await asyncio.sleep(0)
+            self.calls.append(value)
+            return value * 2
+
+        custom_builtins.register('double', double, 1)
+        self.addCleanup(custom_builtins.BUILTINS.pop, 'double')
+
+    def test_step_and_resume(self):
+        vm = VirtualMachine(Pipeline().compile('var a = double(21) + 1; var b = a;'))
+        # Машина останавливается на вызове асинхронной функции и ждёт результат.
+        self.assertTrue(vm.step(1000))
+        self.assertIsNotNone(vm.waiting)
+        self.assertFalse(vm.finished)
+        self.assertTrue(vm.step(1000))
+        self.assertIsNotNone(vm.waiting)
+        vm.resume(asyncio.run(vm.waiting))
+        self.assertIsNone(vm.waiting)
+        self.assertFalse(vm.step(1000))
+        self.assertEqual(vm.get_current_context().snapshot(), ({}, [43, 43]))
+
+    def test_run(self):
+        vm = VirtualMachine(Pipeline().compile('var a = double(double(1)); logprint(a);'))
+        output = io.StringIO()
+        with redirect_stdout(output):
+            vm.run()
+        self.assertEqual(output.getvalue(), '4\n')
+        self.assertEqual(self.calls, [1, 2])
+
+
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.order = []
+
+        async def note(value):
+            await asyncio.sleep(0)
+            self.order.append(value)
+            return value
+
+        custom_builtins.register('note', note, 1)
+        self.addCleanup(custom_builtins.BUILTINS.pop, 'note')
+
+    def test_interleaving(self):
+        pipeline = Pipeline()
+        long = VirtualMachine(pipeline.compile('var s = 0; for (var i = 0; i < 20000; i++) { s = s + i; } note(1);'))
+        short = VirtualMachine(pipeline.compile('var r = note(2) + 1; note(3);'))
+        self.assertEqual(Scheduler(100).run([long, short]), [long, short])
+        # Пока первая машина выполняет цикл, вторая дожидается своих асинхронных функций.
+        self.assertEqual(self.order, [2, 3, 1])
+        self.assertEqual(long.get_current_context().snapshot()[1], [sum(range(20000)), 20000])
+        self.assertEqual(short.get_current_context().snapshot()[1], [3])
+
+    def test_exception(self):
+        pipeline = Pipeline()
+        good = VirtualMachine(pipeline.compile('var a = note(1);'))
+        bad = VirtualMachine(pipeline.compile('return 5;'))
+        result = Scheduler().run([bad, good])
+        # Ошибка одной машины не прерывает выполнение остальных.
+        self.assertIsInstance(result[0], RuntimeError)
+        self.assertIs(result[1], good)
+        self.assertEqual(self.order, [1])
+
+
+if __name__ == '__main__':
+    unittest.main()
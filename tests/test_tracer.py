@@ -0,0 +1,47 @@
+"""Запись последних выполненных команд при ошибке выполнения (RingBufferTracer)."""
+import io
+import unittest
+
+from pipeline import Pipeline
+from Tracer import RingBufferTracer
+from VirtualMachine import VirtualMachine
+
+DIVISION = 'var total = 0; function f(a, b) { var q = a / b; return q; } total = f(1, 2); total = f(3, 0);'
+
+
+class RingBufferTracerTest(unittest.TestCase):
+    def run_traced(self, code, size=5):
+        pipeline = Pipeline()
+        bytecode = pipeline.compile(code)
+        output = io.StringIO()
+        tracer = RingBufferTracer(size, file=output, names=pipeline.slot_names)
+        return VirtualMachine(bytecode, tracer=tracer), tracer, output
+
+    def test_operation_error(self):
+        # Деление на ноль - ошибка Python, а не RuntimeError машины, но записи тоже выводятся.
+        vm, tracer, output = self.run_traced(DIVISION)
+        with self.assertRaises(ZeroDivisionError):
+            vm.run()
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], 'Ошибка выполнения: ZeroDivisionError: division by zero')
+        self.assertEqual(len(lines), 2 + 5)
+        self.assertIn('DIV', lines[-1])
+        self.assertIn('a=3', lines[-1])
+        self.assertIn('b=0', lines[-1])
+
+    def test_runtime_error(self):
+        vm, tracer, output = self.run_traced('function v() { } var z = v();')
+        with self.assertRaises(RuntimeError):
+            vm.run()
+        self.assertIn('Стек пустой', output.getvalue())
+
+    def test_without_names(self):
+        bytecode = Pipeline().compile(DIVISION)
+        output = io.StringIO()
+        with self.assertRaises(ZeroDivisionError):
+            VirtualMachine(bytecode, tracer=RingBufferTracer(1, file=output)).run()
+        self.assertIn('#0=0, #1=3', output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
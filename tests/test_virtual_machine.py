@@ -0,0 +1,36 @@
+"""Выполнение программ виртуальной машиной."""
+import unittest
+
+from pipeline import Pipeline
+from VirtualMachine import VirtualMachine
+
+FUNCTIONS = """
+var a = 1, b = 2, c = 3, d = 4;
+function f(x) { var y = x + a; return y; }
+function g() { return 1; }
+a = f(g());
+"""
+
+
+class FrameSizeTest(unittest.TestCase):
+    def test_per_function(self):
+        # Переменные основной программы не занимают ячеек в контекстах вызовов функций. Переменная a внутри f -
+        # собственная переменная функции, как и x и y.
+        bytecode = Pipeline().compile(FUNCTIONS)
+        expected = {0: 4, bytecode.funcs['f']: 3, bytecode.funcs['g']: 0}
+        self.assertEqual(VirtualMachine.frame_sizes(bytecode), expected)
+        self.assertEqual(VirtualMachine.frame_sizes(bytecode.to_lines()), expected)
+
+    def test_call_context(self):
+        bytecode = Pipeline().compile(FUNCTIONS)
+        vm = VirtualMachine(bytecode)
+        sizes = []
+        while vm.step():
+            sizes.append(len(vm.get_current_context().slots))
+        # Основная программа, g, затем f.
+        self.assertEqual(sorted(set(sizes)), [0, 3, 4])
+        self.assertEqual(vm.get_current_context().slots[0], 'NaN')
+
+
+if __name__ == '__main__':
+    unittest.main()